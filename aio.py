@@ -0,0 +1,79 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import os
+import threading
+from functools import wraps
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Event loop for async views
+# ----------------------
+
+
+class BackgroundLoop:
+    """
+    Runs Flask's `async def` views on one long-lived event loop per process.
+
+    Flask's default runs every async view through asgiref, which spins up a new
+    event loop per request, so nothing async (connection pools, clients) can be
+    shared between requests. Here the WSGI thread hands the coroutine to a loop
+    running on a daemon thread and waits for the result. The coroutine runs in a
+    copy of the caller's context, so `request`, `g` and `current_app` work as
+    usual, including inside `asyncio.to_thread()`.
+    """
+
+    def __init__(self, app=None):
+        self._loop = None
+        self._loop_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Flask looks this up on the instance in ensure_sync()
+        app.async_to_sync = self.async_to_sync
+        app.extensions["background_loop"] = self
+
+    @property
+    def loop(self):
+        """This process's loop, started on first use (and again after a fork)"""
+        if self._loop is None or self._loop_pid != os.getpid():
+            with self._lock:
+                if self._loop is None or self._loop_pid != os.getpid():
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name="async-views", daemon=True)
+                    thread.start()
+                    self._loop, self._loop_pid = loop, os.getpid()
+                    logger.info("Async view event loop started in pid %s", self._loop_pid)
+        return self._loop
+
+    def run(self, coro):
+        """Run `coro` on the loop in the caller's context and block until it finishes"""
+        context = contextvars.copy_context()
+        future = concurrent.futures.Future()
+
+        def start():
+            # tasks copy the current context, which is `context` inside this callback
+            task = asyncio.ensure_future(coro)
+            task.add_done_callback(lambda task: _copy_result(task, future))
+
+        self.loop.call_soon_threadsafe(start, context=context)
+        return future.result()
+
+    def async_to_sync(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.run(func(*args, **kwargs))
+        return wrapper
+
+
+def _copy_result(task, future):
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
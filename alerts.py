@@ -0,0 +1,132 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+from html import escape
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Admin security alert digests
+# ----------------------
+
+
+class AdminAlertDigest:
+    """
+    Collects failed admin logins per (IP, name) and sends a single digest email
+    per ADMIN_ALERT_DIGEST_WINDOW seconds instead of one email per attempt.
+
+    The first failure in a quiet period starts a timer; everything that arrives
+    before it fires goes into the same digest. Digests are handed to the mail
+    outbox, so neither recording nor flushing waits on the mail provider.
+    Each worker process keeps its own window.
+    """
+
+    def __init__(self, outbox=None, app=None):
+        self.outbox = outbox
+        self._events = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self.counters = {
+            'failed_events': 0,       # failed logins recorded
+            'suppressed_events': 0,   # failed logins that did not get an email of their own
+            'digests_sent': 0,
+        }
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('ADMIN_ALERT_DIGEST_WINDOW', 5 * 60)
+        self.window = app.config['ADMIN_ALERT_DIGEST_WINDOW']
+        self.mail_to = app.config.get('MAIL_TO')
+        app.extensions['admin_alerts'] = self
+        # don't lose a pending digest when the worker shuts down
+        atexit.register(self.flush)
+
+    def record_failure(self, admin_name, ip_address, user_agent):
+        now = time.time()
+        with self._lock:
+            key = (ip_address, admin_name)
+            event = self._events.get(key)
+            if event is None:
+                event = self._events[key] = {'count': 0, 'first_seen': now, 'user_agents': set()}
+            event['count'] += 1
+            event['last_seen'] = now
+            event['user_agents'].add(user_agent)
+            self.counters['failed_events'] += 1
+
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Send the digest for everything recorded since the last flush"""
+        with self._lock:
+            events, self._events = self._events, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not events:
+            return
+
+        total = sum(event['count'] for event in events.values())
+        with self._lock:
+            self.counters['suppressed_events'] += total - 1
+            self.counters['digests_sent'] += 1
+
+        if not self.mail_to:
+            logger.warning("MAIL_TO is not set, dropping admin alert digest for %d failed logins", total)
+            return
+        try:
+            self.outbox.enqueue(
+                to=self.mail_to,
+                subject=f"Admin Login Alert - {total} FAILED attempt{'s' if total != 1 else ''} from {len({ip for ip, _ in events})} IP(s)",
+                html=self._digest_html(events, total),
+                reply_to_email="security@envisionprinceton.com",
+                reply_to_name="Envision Security System",
+            )
+            logger.info("Admin alert digest queued: %d failed logins from %d IP/name pairs", total, len(events))
+        except Exception as e:
+            logger.error(f"Failed to queue admin alert digest: {e}")
+
+    def _digest_html(self, events, total):
+        format_time = lambda ts: datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+        rows = "".join(
+            f"""
+                <tr>
+                    <td style="padding: 6px; border: 1px solid #ddd;">{escape(ip or '')}</td>
+                    <td style="padding: 6px; border: 1px solid #ddd;">{escape(name or '')}</td>
+                    <td style="padding: 6px; border: 1px solid #ddd;">{event['count']}</td>
+                    <td style="padding: 6px; border: 1px solid #ddd;">{format_time(event['first_seen'])}</td>
+                    <td style="padding: 6px; border: 1px solid #ddd;">{format_time(event['last_seen'])}</td>
+                    <td style="padding: 6px; border: 1px solid #ddd; word-break: break-all;">{'<br>'.join(escape(ua) for ua in sorted(event['user_agents']))}</td>
+                </tr>"""
+            for (ip, name), event in sorted(events.items(), key=lambda item: -item[1]['count'])
+        )
+        return f"""
+        <div style="font-family: Arial, sans-serif; max-width: 800px; margin: 0 auto;">
+            <h2 style="color: #dc3545;">Admin Login Alert - {total} FAILED</h2>
+            <p>{total} failed admin login attempt{'s' if total != 1 else ''} in the last {self.window // 60} minutes:</p>
+            <table style="border-collapse: collapse; width: 100%; font-size: 13px;">
+                <tr>
+                    <th style="padding: 6px; border: 1px solid #ddd; text-align: left;">IP Address</th>
+                    <th style="padding: 6px; border: 1px solid #ddd; text-align: left;">Admin Name</th>
+                    <th style="padding: 6px; border: 1px solid #ddd; text-align: left;">Attempts</th>
+                    <th style="padding: 6px; border: 1px solid #ddd; text-align: left;">First</th>
+                    <th style="padding: 6px; border: 1px solid #ddd; text-align: left;">Last</th>
+                    <th style="padding: 6px; border: 1px solid #ddd; text-align: left;">User Agents</th>
+                </tr>{rows}
+            </table>
+            <hr style="margin: 30px 0;">
+            <p style="color: #6c757d; font-size: 12px;">
+                This is an automated security alert from the Envision AI Website admin system.
+                If you did not make these login attempts, please review your security settings immediately.
+            </p>
+        </div>
+        """
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, pending_events=sum(event['count'] for event in self._events.values()))
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+import shutil
+
+from flask import request
+
+from compression import ENCODING_SUFFIXES
+from minify import minify_css
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Content-hashed static assets
+# ----------------------
+
+DIST_DIR = "dist"
+ASSET_MANIFEST = "dist/manifest.json"
+# build metadata that lives under static/ but is never referenced by pages
+ASSET_EXCLUDES = ("derived/images.json",)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def _hashed_name(logical_name, content):
+    stem, ext = posixpath.splitext(logical_name)
+    return f"{DIST_DIR}/{stem}.{hashlib.sha256(content).hexdigest()[:10]}{ext}"
+
+
+def _write_once(static_folder, hashed_name, content=None, source_path=None):
+    """Write a hashed copy unless it already exists; its name changes whenever its content does"""
+    output_path = os.path.join(static_folder, hashed_name)
+    if os.path.exists(output_path):
+        # earlier builds hard-linked copies to their sources, replace those with real copies
+        if content is not None or os.stat(output_path).st_nlink == 1:
+            return False
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = output_path + ".tmp"
+    if content is None:
+        # a copy, not a hard link: editing the source in place must not change a file served as immutable
+        shutil.copy2(source_path, tmp_path)
+    else:
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+    os.replace(tmp_path, output_path)
+    return True
+
+
+def _rewrite_css_urls(css, css_name, manifest):
+    """Point url(...) references inside a stylesheet at the hashed copies"""
+    css_dir = posixpath.dirname(css_name)
+
+    def replace(match):
+        quote, target = match.groups()
+        if target.startswith(("data:", "http:", "https:", "//", "#")):
+            return match.group(0)
+        path, _, suffix = target.partition("?")
+        logical = posixpath.normpath(posixpath.join(css_dir, path)) if not path.startswith("/") else path.lstrip("/")
+        hashed = manifest.get(logical)
+        if not hashed:
+            return match.group(0)
+        # dist/ mirrors static/, so the reference stays relative to the stylesheet
+        relative = posixpath.relpath(hashed, posixpath.dirname(_hashed_name(css_name, b"")))
+        return f"url({quote}{relative}{'?' + suffix if suffix else ''}{quote})"
+
+    return CSS_URL_RE.sub(replace, css)
+
+
+def build_asset_manifest(static_folder):
+    """
+    Write a content-hashed copy of every file under the static folder to
+    static/dist/ and a manifest mapping logical names to the hashed ones.
+    Stylesheets are processed last so their url(...) references can be rewritten
+    to hashed names before they are hashed themselves; their hashed copies are
+    minified, the sources stay readable.
+
+    Returns a (written, total) tuple.
+    """
+    logical_names = []
+    for root, dirs, files in os.walk(static_folder):
+        rel_root = os.path.relpath(root, static_folder).replace(os.sep, "/")
+        if rel_root == DIST_DIR or rel_root.startswith(DIST_DIR + "/"):
+            dirs[:] = []
+            continue
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for filename in files:
+            if filename.startswith(".") or filename.endswith(".tmp"):
+                continue
+            # .br/.gz siblings from `flask precompress` are served alongside their source, never linked
+            if filename.endswith(tuple(suffix for _, suffix in ENCODING_SUFFIXES)):
+                continue
+            logical = filename if rel_root == "." else f"{rel_root}/{filename}"
+            if logical not in ASSET_EXCLUDES:
+                logical_names.append(logical)
+
+    manifest = {}
+    written = 0
+    stylesheets = sorted(n for n in logical_names if n.endswith(".css"))
+    for logical in sorted(set(logical_names) - set(stylesheets)):
+        source_path = os.path.join(static_folder, logical)
+        with open(source_path, "rb") as f:
+            content = f.read()
+        manifest[logical] = _hashed_name(logical, content)
+        written += _write_once(static_folder, manifest[logical], source_path=source_path)
+
+    for logical in stylesheets:
+        with open(os.path.join(static_folder, logical), encoding="utf-8") as f:
+            css = _rewrite_css_urls(f.read(), logical, manifest)
+        content = minify_css(css).encode("utf-8")
+        manifest[logical] = _hashed_name(logical, content)
+        written += _write_once(static_folder, manifest[logical], content=content)
+
+    manifest_path = os.path.join(static_folder, ASSET_MANIFEST)
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    logger.info("Asset manifest: %d files, %d new hashed copies", len(manifest), written)
+    return written, len(manifest)
+
+
+class AssetManifest:
+    """
+    Resolves logical static filenames to their content-hashed copies.
+
+    Once registered, `url_for('static', filename='style.css')` returns the hashed
+    URL whenever the manifest has an entry for it, and hashed files are served with
+    a year-long immutable Cache-Control header.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        self.hashed_names = frozenset()
+        self.static_url_path = "/static"
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.static_url_path = app.static_url_path
+        self.load(app.static_folder)
+        app.url_defaults(self._hashed_static_filename)
+        app.after_request(self._immutable_cache_headers)
+
+    def load(self, static_folder):
+        """(Re)read the manifest, e.g. after `flask build-manifest` in the same process"""
+        manifest_path = os.path.join(static_folder, ASSET_MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+            self.hashed_names = frozenset(self.manifest.values())
+        except FileNotFoundError:
+            logger.warning("Asset manifest not found, run `flask build-manifest` to generate it")
+        except Exception as e:
+            logger.error(f"Error loading asset manifest: {e}")
+
+    def resolve(self, filename):
+        """Hashed name for `filename` (relative to the static folder), or the name itself"""
+        filename = filename.lstrip("/")
+        return self.manifest.get(filename, filename)
+
+    def static_url(self, filename):
+        """Like url_for('static', ...) but usable outside of a request"""
+        return f"{self.static_url_path}/{self.resolve(filename)}"
+
+    def _hashed_static_filename(self, endpoint, values):
+        if endpoint == "static" and "filename" in values:
+            values["filename"] = self.resolve(values["filename"])
+
+    def _immutable_cache_headers(self, response):
+        # only content-hashed copies; dist/ also holds build metadata (manifest.json,
+        # critical.json) that changes under the same name and keeps the default revalidation
+        if request.endpoint == "static" and response.status_code in (200, 206, 304):
+            filename = (request.view_args or {}).get("filename", "")
+            if filename in self.hashed_names:
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
@@ -0,0 +1,68 @@
+"""
+CPU cost against bytes saved for on-the-fly response compression.
+
+Renders the landing page through the app (uncompressed), reads the main
+stylesheet and a synthetic admin JSON payload, then times every codec and level
+the dynamic compressor can be configured with.
+
+    python benchmarks/bench_compression.py [--iterations 50]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def sample_payloads():
+    from flask_app import app
+
+    client = app.test_client()
+    index_html = client.get("/", headers={"Accept-Encoding": "identity"}).get_data()
+    with open(os.path.join(app.static_folder, "style.css"), "rb") as f:
+        style_css = f.read()
+    admin_json = json.dumps([
+        {"name": f"Person {i}", "email": f"person{i}@example.edu", "affiliation": "Princeton",
+         "role": "attendee", "message": "Looking forward to the conference! " * 4}
+        for i in range(500)
+    ]).encode()
+    return {"index.html": index_html, "style.css": style_css, "admin.json": admin_json}
+
+
+def codecs():
+    yield "gzip-1", lambda body: gzip.compress(body, compresslevel=1, mtime=0)
+    yield "gzip-6", lambda body: gzip.compress(body, compresslevel=6, mtime=0)
+    yield "gzip-9", lambda body: gzip.compress(body, compresslevel=9, mtime=0)
+    if brotli is not None:
+        for quality in (1, 4, 5, 8, 11):
+            yield f"br-{quality}", lambda body, q=quality: brotli.compress(body, quality=q)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'payload':<12} {'codec':<8} {'bytes':>9} {'saved':>7} {'ms/op':>8} {'MB/s':>8}")
+    for name, body in sample_payloads().items():
+        print(f"{name:<12} {'identity':<8} {len(body):>9} {'-':>7} {'-':>8} {'-':>8}")
+        for codec, compress in codecs():
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                compressed = compress(body)
+            elapsed = (time.perf_counter() - start) / args.iterations
+            saved = 1 - len(compressed) / len(body)
+            print(f"{'':<12} {codec:<8} {len(compressed):>9} {saved:>6.1%} {elapsed * 1000:>8.2f} {len(body) / elapsed / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
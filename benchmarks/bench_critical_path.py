@@ -0,0 +1,149 @@
+"""
+Critical rendering path of the landing page, before and after inlining the
+above-the-fold CSS and minifying the CSS, inline JS and HTML.
+
+"before" serves the page with MINIFY_HTML=0 and CRITICAL_CSS=0 and the source
+stylesheets as they are in static/; "after" is the current build (run
+`flask build-static` first). Each variant runs in a fresh process. Reported:
+
+- bytes of the HTML and of the render-blocking local CSS, raw and gzipped
+- the time to render the page into the cache, and the minification step alone
+- an estimate of the first render on a slow connection: one round trip plus
+  transfer for the HTML, and another for the blocking stylesheet if there is
+  one. Web fonts from Google Fonts are left out.
+
+    python benchmarks/bench_critical_path.py [--rtt-ms 150] [--kbps 1600] [--runs 5]
+"""
+import argparse
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, re, sys, time
+sys.path.insert(0, {root!r})
+import flask_app
+from minify import minify_html
+app = flask_app.create_app()
+with app.test_request_context("/"):
+    from flask import render_template
+    start = time.perf_counter()
+    html = render_template("index.html", **flask_app.index_context())
+    rendered = time.perf_counter()
+    if app.config["MINIFY_HTML"]:
+        html = minify_html(html)
+    minified = time.perf_counter()
+head = html[:html.index("<body")]
+# <noscript> links only apply without JavaScript
+head = re.sub(r"<noscript>.*?</noscript>", "", head, flags=re.S)
+blocking = re.findall(r'<link rel="stylesheet" type="text/css" href="{static}/([^"]+)"', head)
+print(json.dumps({{
+    "html": html,
+    "blocking": blocking,
+    "inline_css": sum(len(css) for css in re.findall(r"<style>(.*?)</style>", head, re.S)),
+    "render_ms": (rendered - start) * 1000,
+    "minify_ms": (minified - rendered) * 1000,
+}}))
+"""
+
+VARIANTS = {
+    "before": {"MINIFY_HTML": "0", "CRITICAL_CSS": "0"},
+    "after": {"MINIFY_HTML": "1", "CRITICAL_CSS": "1"},
+}
+
+
+def run_once(overrides):
+    env = dict(os.environ, SECRET_KEY="benchmark", ADMIN_PASSWORD="benchmark", TEMPLATE_WARMUP="0", **overrides)
+    env.pop("PYTHONPATH", None)
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD.format(root=ROOT, static="/static")],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def source_name(dist_name, manifest):
+    """static/style.css for static/dist/style.<hash>.css"""
+    for logical, hashed in manifest.items():
+        if hashed == dist_name:
+            return logical
+    return dist_name
+
+
+def sizes(data):
+    data = data.encode() if isinstance(data, str) else data
+    return (len(data), len(gzip.compress(data, 9))) if data else (0, 0)
+
+
+def measure(name, runs, manifest):
+    samples = [run_once(VARIANTS[name]) for _ in range(runs)]
+    last = samples[-1]
+    css = b""
+    for href in last["blocking"]:
+        # "before" is the stylesheet as it was served before minification
+        path = source_name(href, manifest) if name == "before" else href
+        with open(os.path.join(ROOT, "static", path), "rb") as f:
+            css += f.read()
+    return {
+        "html": sizes(last["html"]),
+        "blocking_css": sizes(css),
+        "blocking_count": len(last["blocking"]),
+        "inline_css": last["inline_css"],
+        "render_ms": statistics.median(s["render_ms"] for s in samples),
+        "minify_ms": statistics.median(s["minify_ms"] for s in samples),
+    }
+
+
+def first_render_ms(result, rtt_ms, kbps):
+    bytes_per_ms = kbps * 1000 / 8 / 1000
+    ms = rtt_ms + result["html"][1] / bytes_per_ms
+    if result["blocking_count"]:
+        ms += rtt_ms + result["blocking_css"][1] / bytes_per_ms
+    return ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--rtt-ms", type=float, default=150, help="round trip time of the simulated connection")
+    parser.add_argument("--kbps", type=float, default=1600, help="bandwidth of the simulated connection (1600 = slow 4G)")
+    args = parser.parse_args()
+
+    try:
+        with open(os.path.join(ROOT, "static", "dist", "manifest.json")) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+
+    results = {name: measure(name, args.runs, manifest) for name in VARIANTS}
+    before, after = results["before"], results["after"]
+
+    def row(label, b, a, unit="B"):
+        # a change against (next to) nothing says nothing
+        change = f"{(a - b) / b:+.0%}" if b >= 1 else ""
+        print(f"{label:<28} {b:>10.1f} {a:>10.1f} {unit:<3} {change:>6}" if unit == "ms"
+              else f"{label:<28} {b:>10} {a:>10} {unit:<3} {change:>6}")
+
+    print(f"landing page, median of {args.runs} fresh processes")
+    print(f"{'':<28} {'before':>10} {'after':>10}")
+    row("HTML", before["html"][0], after["html"][0])
+    row("HTML gzip", before["html"][1], after["html"][1])
+    row("  of which inline CSS", before["inline_css"], after["inline_css"])
+    row("render-blocking CSS", before["blocking_css"][0], after["blocking_css"][0])
+    row("render-blocking CSS gzip", before["blocking_css"][1], after["blocking_css"][1])
+    row("render-blocking requests", before["blocking_count"], after["blocking_count"], "")
+    row("render into cache", before["render_ms"], after["render_ms"] + after["minify_ms"], "ms")
+    row("  of which minify", before["minify_ms"], after["minify_ms"], "ms")
+    row(f"first render @{args.rtt_ms:g}ms/{args.kbps:g}kbps",
+        first_render_ms(before, args.rtt_ms, args.kbps), first_render_ms(after, args.rtt_ms, args.kbps), "ms")
+
+
+if __name__ == "__main__":
+    main()
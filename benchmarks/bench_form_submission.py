@@ -0,0 +1,101 @@
+"""
+Concurrent /get-involved submissions against one app process: the sync handler
+against the async one. A local stand-in answers reCAPTCHA after --latency ms,
+every submission uses a fresh name, email and IP so none is rate limited, and
+--threads plays the part of a gthread worker's thread count.
+
+    python benchmarks/bench_form_submission.py [--submissions 200] [--threads 8] [--latency 80]
+
+Runs in a temporary directory, so the tracking database, mail spool and
+responses.txt it writes are thrown away afterwards.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fakes import start_fake_recaptcha
+
+
+def load_app(verify_url):
+    os.environ.update(
+        SECRET_KEY="bench",
+        RECAPTCHA_SECRET_KEY="bench",
+        RECAPTCHA_VERIFY_URL=verify_url,
+        ASYNC_FORM_HANDLER="1",
+    )
+    import flask_app
+
+    app = flask_app.app
+    app.config["WTF_CSRF_ENABLED"] = False
+    # deliveries are not part of the request path, keep the outbox worker out of the timings
+    app.before_request_funcs[None].remove(flask_app.mail_outbox.ensure_worker)
+    app.add_url_rule("/get-involved-sync", "get_involved_sync", flask_app.get_involved, methods=["POST"])
+    logging.getLogger("envision").setLevel(logging.WARNING)
+    return app
+
+
+def run(app, path, label, submissions, threads):
+    client_local = threading.local()
+
+    def submit(i):
+        client = getattr(client_local, "client", None)
+        if client is None:
+            client = client_local.client = app.test_client()
+        start = time.perf_counter()
+        resp = client.post(
+            path,
+            data={
+                "name": f"Bench {label} {i}",
+                "email_id": f"bench-{label}-{i}@example.com",
+                "affiliation": "Benchmark",
+                "role": "attendee",
+                "message": "load test",
+                "g-recaptcha-response": f"token-{label}-{i}",
+            },
+            headers={"X-Forwarded-For": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"},
+        )
+        assert resp.status_code == 200, resp.get_data(as_text=True)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        latencies = sorted(pool.map(submit, range(submissions)))
+    elapsed = time.perf_counter() - start
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:<6} {submissions / elapsed:>8.1f} submissions/s"
+        f"   p50 {statistics.median(latencies) * 1000:>7.1f} ms   p95 {p95 * 1000:>7.1f} ms"
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=80, help="fake reCAPTCHA latency in ms")
+    args = parser.parse_args()
+
+    server = start_fake_recaptcha(args.latency / 1000)
+    os.chdir(tempfile.mkdtemp(prefix="envision-bench-"))
+    app = load_app(f"http://127.0.0.1:{server.server_port}/siteverify")
+
+    # warm up connections, the event loop and the database
+    run(app, "/get-involved", "warmup", args.threads, args.threads)
+    sync = run(app, "/get-involved-sync", "sync", args.submissions, args.threads)
+    async_ = run(app, "/get-involved", "async", args.submissions, args.threads)
+    print(f"speedup: {sync / async_:.2f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-request overhead of Flask-Limiter for each storage backend and strategy:
+a tiny app is called through the test client with and without a limit on the
+route, and the difference is the cost of checking and counting the hit.
+
+    python benchmarks/bench_rate_limiter.py [--requests 5000] [--redis redis://localhost:6379]
+
+memory:// is per process (what the site used before), sqlite:/// is shared by
+every worker on the host, redis is only run when a URI is given.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_limiter import Limiter
+
+import limiter_storage  # noqa: F401  registers sqlite:///
+
+STRATEGIES = ("fixed-window", "moving-window")
+
+
+def build_app(storage_uri, strategy):
+    app = Flask(__name__)
+    app.config["RATELIMIT_STORAGE_URI"] = storage_uri
+    app.config["RATELIMIT_STRATEGY"] = strategy
+    # one key per client address, like real_ip() in flask_app
+    limiter = Limiter(key_func=lambda: "203.0.113.7", app=app)
+
+    @app.route("/open")
+    def open_route():
+        return "ok"
+
+    @app.route("/limited")
+    @limiter.limit("1000000 per minute")
+    def limited_route():
+        return "ok"
+
+    return app, limiter
+
+
+def per_request_us(client, path, requests):
+    client.get(path)
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(path)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--redis", default=os.getenv("REDIS_URL"), help="also run against this Redis URI")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="envision-bench-")
+    backends = [("memory", "memory://"), ("sqlite", f"sqlite:///{os.path.join(tmp, 'rate_limits.db')}")]
+    if args.redis:
+        backends.append(("redis", args.redis))
+
+    try:
+        print(f"{'storage':>8} {'strategy':>14} {'no limit':>10} {'limited':>10} {'overhead':>10}   (us/request)")
+        for name, uri in backends:
+            for strategy in STRATEGIES:
+                app, limiter = build_app(uri, strategy)
+                client = app.test_client()
+                baseline = per_request_us(client, "/open", args.requests)
+                limited = per_request_us(client, "/limited", args.requests)
+                limiter.reset()
+                print(f"{name:>8} {strategy:>14} {baseline:>10.1f} {limited:>10.1f} {limited - baseline:>10.1f}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Cold start: how long a fresh worker takes to import the app, build it with
+create_app(), and answer its first (and second) request for the landing page.
+
+Every run is a new interpreter in a temporary directory, so nothing is cached
+between runs except the OS file cache. Runs are repeated with template warm-up
+on and off (TEMPLATE_WARMUP) and the medians are reported.
+
+    python benchmarks/bench_startup.py [--runs 7] [--record] [--importtime 15]
+
+--record appends the medians, with the commit and date, to
+benchmarks/startup_history.jsonl; every run prints the change against the last
+recorded entry, so regressions in startup time show up next to the commit that
+caused them. --importtime lists the slowest imports of one run (python -X importtime).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_PATH = os.path.join(ROOT, "benchmarks", "startup_history.jsonl")
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import flask_app
+imported = time.perf_counter()
+app = flask_app.create_app()
+created = time.perf_counter()
+client = app.test_client()
+assert client.get("/").status_code == 200
+first = time.perf_counter()
+assert client.get("/").status_code == 200
+second = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (first - created) * 1000,
+    "second_request_ms": (second - first) * 1000,
+    "ready_ms": (first - start) * 1000,
+}}))
+"""
+
+STAGES = ("import_ms", "create_app_ms", "first_request_ms", "second_request_ms", "ready_ms", "process_ms")
+
+
+def child_env(warmup):
+    env = dict(os.environ, SECRET_KEY="benchmark", ADMIN_PASSWORD="benchmark", TEMPLATE_WARMUP="1" if warmup else "0")
+    env.pop("PYTHONPATH", None)
+    return env
+
+
+def run_once(warmup):
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", CHILD.format(root=ROOT)],
+            cwd=workdir, env=child_env(warmup), capture_output=True, text=True, check=True,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_ms"] = elapsed
+    return timings
+
+
+def measure(runs, warmup):
+    samples = [run_once(warmup) for _ in range(runs)]
+    return {stage: round(statistics.median(s[stage] for s in samples), 1) for stage in STAGES}
+
+
+def slowest_imports(count):
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {ROOT!r}); import flask_app"],
+            cwd=workdir, env=child_env(False), capture_output=True, text=True, check=True,
+        )
+    # "import time: self [us] | cumulative | imported package", children are
+    # listed (indented) before the module that imported them
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == "flask_app":
+                return sorted(rows, reverse=True)[:count]
+            rows = []
+        elif depth == 1:
+            rows.append((int(cumulative), name.strip()))
+    return []
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def last_recorded(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        lines = [line for line in f if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--record", action="store_true", help="append these results to the history file")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list the N slowest imports")
+    args = parser.parse_args()
+
+    results = {"warmup": measure(args.runs, True), "no_warmup": measure(args.runs, False)}
+    previous = last_recorded(args.history)
+
+    print(f"median of {args.runs} fresh processes, ms")
+    print(f"{'stage':<20} {'warmup':>10} {'no warmup':>10}" + (f" {'last warmup':>12}" if previous else ""))
+    for stage in STAGES:
+        row = f"{stage:<20} {results['warmup'][stage]:>10.1f} {results['no_warmup'][stage]:>10.1f}"
+        if previous:
+            before = previous["warmup"].get(stage)
+            if before:
+                row += f" {before:>12.1f} ({(results['warmup'][stage] - before) / before:+.0%})"
+        print(row)
+    if previous:
+        print(f"last recorded: {previous['commit']} on {previous['date']}")
+
+    if args.importtime:
+        print("\nslowest imports of flask_app (cumulative)")
+        for cumulative, name in slowest_imports(args.importtime):
+            print(f"{cumulative / 1000:>8.1f} ms  {name}")
+
+    if args.record:
+        entry = {"date": datetime.now(timezone.utc).isoformat(timespec="seconds"), "commit": git_commit(),
+                 "python": sys.version.split()[0], "runs": args.runs, **results}
+        with open(args.history, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+        print(f"recorded in {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Microbenchmark of the submission limit check: the original list-of-dicts
+implementation (filter, min, copy and re-sort per identity) against
+SubmissionLimiter with TimeRing histories.
+
+    python benchmarks/bench_submission_limits.py [--identities 2000] [--rounds 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from submission_limits import COOLDOWN_PERIOD, LIMIT_WINDOW, MAX_SUBMISSIONS, submission_limiter
+
+
+def legacy_check(submissions, current_time):
+    """The per-identity block that check_duplicate_submission() used to repeat for name and email"""
+    recent_submissions = [s for s in submissions if current_time - s['timestamp'] < LIMIT_WINDOW]
+    if len(recent_submissions) >= MAX_SUBMISSIONS:
+        oldest_submission = min(recent_submissions, key=lambda x: x['timestamp'])
+        return False, LIMIT_WINDOW - (current_time - oldest_submission['timestamp'])
+    if len(recent_submissions) >= 2:
+        recent_submissions.sort(key=lambda x: x['timestamp'], reverse=True)
+        submission_pairs = len(recent_submissions) // 2
+        if submission_pairs > 0:
+            last_pair_start = recent_submissions[submission_pairs * 2 - 1]['timestamp']
+            time_since_last_pair = current_time - last_pair_start
+            if time_since_last_pair < COOLDOWN_PERIOD:
+                return False, COOLDOWN_PERIOD - time_since_last_pair
+    return True, 0
+
+
+def ring_check(ring, current_time):
+    decision = submission_limiter.check(ring, current_time)
+    return decision.allowed, decision.retry_after
+
+
+def make_histories(identities, now, seed=1):
+    """
+    Random histories of up to 30 days, like the tracking store keeps. Attempts
+    the limiter would have blocked are dropped, so the histories only hold
+    submissions that could really have been recorded.
+    """
+    rng = random.Random(seed)
+    histories = []
+    for _ in range(identities):
+        attempts = sorted(now - rng.uniform(0, 30 * 24 * 60 * 60) for _ in range(rng.choice((0, 1, 2, 3, 5, 8, 12))))
+        ring = submission_limiter.ring()
+        timestamps = []
+        for ts in attempts:
+            if submission_limiter.check(ring, ts).allowed:
+                ring.append(ts)
+                timestamps.append(ts)
+        histories.append(timestamps)
+    return histories
+
+
+def bench(label, check, states, now, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for state in states:
+            check(state, now)
+    elapsed = time.perf_counter() - start
+    checks = rounds * len(states)
+    print(f"{label:<22} {checks / elapsed:>12,.0f} checks/s {elapsed / checks * 1e6:>8.2f} us/check")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--identities", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    now = time.time()
+    histories = make_histories(args.identities, now)
+    dict_states = [
+        [{'timestamp': ts, 'ip': '127.0.0.1', 'name': 'n', 'email': 'e'} for ts in timestamps]
+        for timestamps in histories
+    ]
+    ring_states = [submission_limiter.ring(timestamps) for timestamps in histories]
+
+    # both implementations must agree before their speed means anything
+    for submissions, ring in zip(dict_states, ring_states):
+        legacy_allowed, legacy_retry = legacy_check(submissions, now)
+        allowed, retry = ring_check(ring, now)
+        assert legacy_allowed == allowed and abs(legacy_retry - retry) < 1e-6, (submissions, list(ring))
+
+    legacy = bench("legacy (dict lists)", legacy_check, dict_states, now, args.rounds)
+    ring = bench("SubmissionLimiter", ring_check, ring_states, now, args.rounds)
+    print(f"speedup: {legacy / ring:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Cost of one /admin/submissions page as the log grows: reading the whole log
+(what the view used to do with responses.txt) against SubmissionLog.page(),
+which reads from the tail through the offset index.
+
+    python benchmarks/bench_submission_pages.py [--sizes 100 10000 200000] [--limit 50]
+
+Logs are generated in a temporary directory.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from submission_log import SubmissionLog
+
+ROLES = ("speaker", "volunteer", "attendee", "partner-sponsor")
+
+
+def build_log(path, size):
+    log = SubmissionLog(path)
+    start = time.time() - size * 60
+    log.extend(
+        {
+            "ts": start + i * 60,
+            "ip": f"10.0.{i // 256 % 256}.{i % 256}",
+            "name": f"Person {i}",
+            "email": f"person{i}@example.com",
+            "affiliation": "Example University",
+            "role": ROLES[i % 7 % 4],
+            "message": "I would like to get involved with Envision. " * 3,
+            "source": "form",
+        }
+        for i in range(size)
+    )
+    return log, start
+
+
+def full_read(log, limit):
+    """Every record decoded, reversed and counted, then one page sliced off"""
+    submissions = list(log.records())
+    submissions.reverse()
+    role_counts = {}
+    for submission in submissions:
+        role_counts[submission["role"]] = role_counts.get(submission["role"], 0) + 1
+    return submissions[:limit]
+
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 200000])
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="envision-bench-")
+    try:
+        print(f"{'records':>8} {'full read':>11} {'page 1':>9} {'middle':>9} {'role':>9} {'1 day':>9}   (ms)")
+        for size in args.sizes:
+            log, start = build_log(os.path.join(tmp, f"log-{size}.jsonl"), size)
+            day = start + size * 30
+            row = [
+                timed(lambda: full_read(log, args.limit), repeat=1 if size > 50000 else 3),
+                timed(lambda: list(log.page(limit=args.limit))),
+                timed(lambda: list(log.page(before=size // 2, limit=args.limit))),
+                timed(lambda: list(log.page(limit=args.limit, role="partner-sponsor"))),
+                timed(lambda: list(log.page(limit=args.limit, since=day, until=day + 86400))),
+            ]
+            print(f"{size:>8} " + " ".join(f"{ms:>9.2f}" for ms in row[:1]) + "  " + " ".join(f"{ms:>9.2f}" for ms in row[1:]))
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Local stand-ins for the services the site calls out to, so benchmarks never
+touch Google or Resend. Each server runs on a daemon thread on a free port.
+
+    recaptcha = start_fake_recaptcha(latency=0.08)   # RECAPTCHA_VERIFY_URL=http://127.0.0.1:<port>/siteverify
+    resend = start_fake_resend(latency=0.05)         # RESEND_API_URL=http://127.0.0.1:<port>
+"""
+import json
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # the app server going away mid-request is expected when a run ends
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def _serve(respond, latency):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(latency)
+            body = json.dumps(respond(self.path)).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = _Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_fake_recaptcha(latency=0):
+    """Passes every token, like siteverify does for a solved challenge"""
+    return _serve(lambda path: {"success": True, "hostname": "localhost"}, latency)
+
+
+def start_fake_resend(latency=0):
+    """Accepts every POST /emails with a new message id"""
+    return _serve(lambda path: {"id": str(uuid.uuid4())}, latency)
+
+
+def server_url(server):
+    return f"http://127.0.0.1:{server.server_port}"
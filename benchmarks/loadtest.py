@@ -0,0 +1,306 @@
+"""
+HTTP load test of a real server process. The app is booted in a temporary
+directory against local stand-ins for reCAPTCHA and Resend (benchmarks/fakes.py),
+then each route is driven in turn at a fixed concurrency:
+
+    /                   home page
+    /get-involved       form submissions, each from a new name, email and IP
+    /schedule           schedule PDF
+    /admin/submissions  first page, logged in
+    /admin/rate-limit   first page, logged in
+
+Reports throughput and p50/p95/p99 latency per route, and exits with status 1
+when a route is slower than the stored baseline by more than --tolerance or
+returns errors.
+
+    python benchmarks/loadtest.py [--concurrency 16] [--duration 10] [--routes / /get-involved]
+    python benchmarks/loadtest.py --server gunicorn --workers 4 --threads 4
+    python benchmarks/loadtest.py --save-baseline      # record this machine's numbers
+
+Baselines are only comparable on the machine and settings they were recorded
+with, so record them on the box used for sizing. The form routes also write to
+the tracking database and the mail spool, which is part of what is measured.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from fakes import server_url, start_fake_recaptcha, start_fake_resend
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loadtest_baselines.json")
+
+ROUTES = ("/", "/get-involved", "/schedule", "/admin/submissions", "/admin/rate-limit")
+ADMIN_PASSWORD = "loadtest"
+
+CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+WERKZEUG_BOOT = """
+import sys
+sys.path.insert(0, {root!r})
+from werkzeug.serving import run_simple
+import flask_app
+run_simple("127.0.0.1", {port}, flask_app.app, threaded=True)
+"""
+
+
+# ----------------------
+# Server
+# ----------------------
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def boot_server(args, workdir, env):
+    port = free_port()
+    if args.server == "gunicorn":
+        command = [
+            sys.executable, "-m", "gunicorn", "flask_app:app",
+            "--pythonpath", ROOT, "--bind", f"127.0.0.1:{port}",
+            "--workers", str(args.workers), "--threads", str(args.threads),
+        ]
+    else:
+        command = [sys.executable, "-c", WERKZEUG_BOOT.format(root=ROOT, port=port)]
+
+    log = open(os.path.join(workdir, "server.log"), "wb")
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            httpx.get(base_url + "/", timeout=1)
+            return process, base_url
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.kill()
+    log.close()
+    with open(log.name, errors="replace") as f:
+        sys.exit(f"server did not start:\n{f.read()[-4000:]}")
+
+
+def server_env(recaptcha, resend):
+    env = dict(os.environ)
+    env.update(
+        SECRET_KEY="loadtest",
+        ADMIN_PASSWORD=ADMIN_PASSWORD,
+        RECAPTCHA_SECRET_KEY="loadtest",
+        RECAPTCHA_SITE_KEY="loadtest",
+        RECAPTCHA_VERIFY_URL=server_url(recaptcha) + "/siteverify",
+        RESEND_API_KEY="re_loadtest",
+        RESEND_API_URL=server_url(resend),
+        MAIL_TO="team@example.com",
+        MAIL_FROM="no-reply@example.com",
+    )
+    return env
+
+
+# ----------------------
+# Requests
+# ----------------------
+
+async def login(client):
+    """An admin session cookie and a CSRF token that is valid for the form too"""
+    page = await client.get("/admin/login", headers={"X-Forwarded-For": "192.0.2.1"})
+    csrf_token = CSRF_RE.search(page.text).group(1)
+    resp = await client.post(
+        "/admin/login",
+        data={"name": "Load Test", "password": ADMIN_PASSWORD, "csrf_token": csrf_token},
+        headers={"X-Forwarded-For": "192.0.2.1"},
+    )
+    if resp.headers.get("location") != "/admin/submissions":
+        sys.exit(f"admin login failed: {resp.status_code} {resp.headers.get('location')}")
+    return csrf_token
+
+
+def request_for(route, i, csrf_token):
+    """(method, path, kwargs) for the i-th request to a route"""
+    if route == "/get-involved":
+        return "POST", route, {
+            "data": {
+                "csrf_token": csrf_token,
+                "name": f"Load Test {i}",
+                "email_id": f"loadtest-{i}@example.com",
+                "affiliation": "Load Test University",
+                "role": "attendee",
+                "message": "Load test submission.",
+                "g-recaptcha-response": f"token-{i}",
+            },
+            # the per-minute limit is per client address, give every submission its own
+            "headers": {"X-Forwarded-For": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"},
+        }
+    return "GET", route, {}
+
+
+async def drive(client, route, csrf_token, concurrency, duration, requests, numbers):
+    """Run one route for `duration` seconds or `requests` requests, return (latencies, errors, elapsed)"""
+    latencies, errors = [], {}
+    sent = 0
+    deadline = time.perf_counter() + duration
+
+    async def user():
+        nonlocal sent
+        while (sent < requests) if requests else (time.perf_counter() < deadline):
+            sent += 1
+            method, path, kwargs = request_for(route, next(numbers), csrf_token)
+            start = time.perf_counter()
+            try:
+                resp = await client.request(method, path, **kwargs)
+                status = resp.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors[status] = errors.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered) + sum(errors.values()),
+        "errors": sum(errors.values()),
+        "rps": len(ordered) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+    }
+
+
+async def run_routes(base_url, args):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        csrf_token = await login(client)
+        results = {}
+        # one numbering for the whole run, so form submissions never repeat a name or IP
+        numbers = itertools.count(int(time.time()))
+        for route in args.routes:
+            method, path, kwargs = request_for(route, next(numbers), csrf_token)
+            probe = await client.request(method, path, **kwargs)
+            if probe.status_code != 200:
+                print(f"{route:<20} skipped, probe returned {probe.status_code}")
+                results[route] = {"skipped": probe.status_code}
+                continue
+            latencies, errors, elapsed = await drive(
+                client, route, csrf_token, args.concurrency, args.duration, args.requests, numbers
+            )
+            results[route] = result = summarize(latencies, errors, elapsed)
+            print(
+                f"{route:<20} {result['requests']:>7} {result['rps']:>9.1f}"
+                f" {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+                + (f"   errors {errors}" if errors else "")
+            )
+        return results
+
+
+# ----------------------
+# Baselines
+# ----------------------
+
+def baseline_key(args):
+    if args.server == "gunicorn":
+        return f"gunicorn-w{args.workers}-t{args.threads}-c{args.concurrency}"
+    return f"werkzeug-c{args.concurrency}"
+
+
+def compare(results, baseline, tolerance):
+    """Regressions as human readable strings"""
+    failures = []
+    for route, result in results.items():
+        if "skipped" in result:
+            continue
+        if result["errors"]:
+            failures.append(f"{route}: {result['errors']} failed requests")
+        expected = baseline.get(route)
+        if not expected:
+            continue
+        if result["rps"] < expected["rps"] * (1 - tolerance):
+            failures.append(f"{route}: {result['rps']:.1f} req/s, baseline {expected['rps']:.1f}")
+        for key in ("p95_ms", "p99_ms"):
+            if result[key] > expected[key] * (1 + tolerance):
+                failures.append(f"{route}: {key} {result[key]:.1f}, baseline {expected[key]:.1f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routes", nargs="+", default=list(ROUTES), choices=ROUTES)
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per route")
+    parser.add_argument("--requests", type=int, default=0, help="requests per route instead of --duration")
+    parser.add_argument("--server", choices=("werkzeug", "gunicorn"), default="werkzeug")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--recaptcha-latency", type=float, default=80, help="fake reCAPTCHA latency in ms")
+    parser.add_argument("--resend-latency", type=float, default=100, help="fake Resend latency in ms")
+    parser.add_argument("--baselines", default=BASELINES_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    recaptcha = start_fake_recaptcha(args.recaptcha_latency / 1000)
+    resend = start_fake_resend(args.resend_latency / 1000)
+    workdir = tempfile.mkdtemp(prefix="envision-loadtest-")
+    process, base_url = boot_server(args, workdir, server_env(recaptcha, resend))
+    try:
+        print(f"{args.server} at {base_url}, concurrency {args.concurrency}")
+        print(f"{'route':<20} {'requests':>7} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        results = asyncio.run(run_routes(base_url, args))
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        recaptcha.shutdown()
+        resend.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+    key = baseline_key(args)
+
+    if args.save_baseline:
+        baselines[key] = {route: result for route, result in results.items() if "skipped" not in result}
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline {key} saved to {args.baselines}")
+        return
+
+    if key not in baselines:
+        print(f"no baseline for {key} in {args.baselines}, run with --save-baseline to record one")
+    failures = compare(results, baselines.get(key, {}), args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import zlib
+
+from flask import Response, request, send_from_directory
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Precompressed static assets
+# ----------------------
+
+PRECOMPRESS_EXTENSIONS = (".css", ".js", ".svg", ".html", ".json", ".txt", ".xml", ".map", ".webmanifest")
+# file suffix for each content-coding, in order of preference
+ENCODING_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _compress_file(path, content, suffix):
+    output_path = path + suffix
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(path):
+        return False
+    if suffix == ".br":
+        compressed = brotli.compress(content, quality=11)
+    else:
+        # mtime=0 keeps the output byte-identical across builds
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    if len(compressed) >= len(content):
+        return False
+    with open(output_path + ".tmp", "wb") as f:
+        f.write(compressed)
+    os.replace(output_path + ".tmp", output_path)
+    return True
+
+
+def precompress_static(static_folder, extensions=PRECOMPRESS_EXTENSIONS):
+    """
+    Write .br and .gz siblings for every text asset under the static folder.
+    Siblings newer than their source are left alone, and siblings that would not
+    be smaller than the source are not written.
+
+    Returns the number of files written.
+    """
+    suffixes = [suffix for coding, suffix in ENCODING_SUFFIXES if coding != "br" or brotli is not None]
+    if brotli is None:
+        logger.warning("brotli is not installed, only writing .gz files")
+
+    written = 0
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for filename in files:
+            if not filename.lower().endswith(extensions):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, "rb") as f:
+                content = f.read()
+            for suffix in suffixes:
+                written += _compress_file(path, content, suffix)
+
+    logger.info("Precompressed static assets: %d files written", written)
+    return written
+
+
+# ----------------------
+# Response compression
+# ----------------------
+
+COMPRESSIBLE_MIMETYPES = {
+    "text/html", "text/css", "text/plain", "text/csv", "text/xml", "text/javascript",
+    "application/json", "application/javascript", "application/xml", "application/x-ndjson",
+    "image/svg+xml",
+}
+
+
+class Compression:
+    """
+    Serves precompressed .br/.gz siblings of static files when the client accepts
+    them, and compresses dynamic text responses on the fly.
+
+    Buffered responses below COMPRESSION_MIN_SIZE are sent as-is. Streamed
+    responses are compressed chunk by chunk, flushing after every chunk so the
+    client still receives data as it is produced. Responses that already carry an
+    ETag are skipped, since the validator describes the uncompressed body.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("COMPRESSION_MIN_SIZE", 1024)
+        app.config.setdefault("COMPRESSION_GZIP_LEVEL", 6)
+        app.config.setdefault("COMPRESSION_BROTLI_QUALITY", 4)
+        self.app = app
+        app.view_functions["static"] = self.send_static_file
+        app.after_request(self.compress_response)
+
+    def _accepted_encodings(self):
+        offered = [coding for coding, _ in ENCODING_SUFFIXES if coding != "br" or brotli is not None]
+        return [coding for coding in offered if request.accept_encodings[coding]]
+
+    def _has_fresh_sibling(self, filename, suffix):
+        """
+        Whether `filename` exists and its precompressed sibling is at least as new,
+        the same check `flask precompress` makes. An orphaned or stale sibling
+        would otherwise answer for a missing or replaced file, but only for
+        clients that accept its encoding.
+        """
+        path = safe_join(self.app.static_folder, filename)
+        if path is None:
+            return False
+        try:
+            return os.path.getmtime(path + suffix) >= os.path.getmtime(path)
+        except OSError:
+            return False
+
+    def send_static_file(self, filename):
+        """Drop-in replacement for the `static` view that prefers precompressed siblings"""
+        static_folder = self.app.static_folder
+        # byte ranges refer to the identity encoding, so let send_file handle those
+        if "Range" not in request.headers:
+            accepted = self._accepted_encodings()
+            for coding, suffix in ENCODING_SUFFIXES:
+                if coding not in accepted or not self._has_fresh_sibling(filename, suffix):
+                    continue
+                try:
+                    response = send_from_directory(static_folder, filename + suffix)
+                except NotFound:
+                    continue
+                mimetype, _ = mimetypes.guess_type(filename)
+                mimetype = mimetype or "application/octet-stream"
+                response.content_type = f"{mimetype}; charset=utf-8" if mimetype.startswith("text/") else mimetype
+                response.headers["Content-Encoding"] = coding
+                response.vary.add("Accept-Encoding")
+                return response
+
+        response = send_from_directory(static_folder, filename)
+        if filename.lower().endswith(PRECOMPRESS_EXTENSIONS):
+            response.vary.add("Accept-Encoding")
+        # tells e.g. PDF viewers they can fetch the rest in ranges
+        if response.status_code == 200:
+            response.accept_ranges = "bytes"
+        return response
+
+    def compress_response(self, response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or "ETag" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        accepted = self._accepted_encodings()
+        if not accepted:
+            response.vary.add("Accept-Encoding")
+            return response
+        coding = accepted[0]
+
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, coding)
+            response.headers.pop("Content-Length", None)
+        else:
+            body = response.get_data()
+            if len(body) < self.app.config["COMPRESSION_MIN_SIZE"]:
+                return response
+            response.set_data(self._compress(body, coding))
+
+        response.headers["Content-Encoding"] = coding
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def _compress(self, body, coding):
+        if coding == "br":
+            return brotli.compress(body, quality=self.app.config["COMPRESSION_BROTLI_QUALITY"])
+        return gzip.compress(body, compresslevel=self.app.config["COMPRESSION_GZIP_LEVEL"], mtime=0)
+
+    def _compress_stream(self, chunks, coding):
+        if coding == "br":
+            compressor = brotli.Compressor(quality=self.app.config["COMPRESSION_BROTLI_QUALITY"])
+            compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            # wbits=31 writes a gzip header and trailer around the deflate stream
+            compressor = zlib.compressobj(self.app.config["COMPRESSION_GZIP_LEVEL"], zlib.DEFLATED, 31)
+            compress, finish = compressor.compress, compressor.flush
+            flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                data = compress(chunk) + flush()
+                if data:
+                    yield data
+            yield finish()
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+
+
+# ----------------------
+# Pre-encoded response bodies
+# ----------------------
+
+class EncodedBody:
+    """
+    A response body that only changes with the data behind it (API documents,
+    page fragments), encoded once: the bytes, their .br/.gz variants at the
+    highest settings, and a strong ETag per variant.
+
+    `response()` picks the best variant the client accepts and answers a
+    matching If-None-Match with 304, so revalidation costs no body and no
+    compression work.
+    """
+
+    def __init__(self, body, mimetype):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.mimetype = mimetype
+        # identifies the content, e.g. to version a URL that serves it
+        self.digest = digest = hashlib.sha1(body).hexdigest()[:20]
+        self.variants = {"identity": (body, digest)}
+        for coding, _ in ENCODING_SUFFIXES:
+            if coding == "br" and brotli is None:
+                continue
+            if coding == "br":
+                encoded = brotli.compress(body, quality=11)
+            else:
+                encoded = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(encoded) < len(body):
+                # each coding is a different representation, so it needs its own validator
+                self.variants[coding] = (encoded, f"{digest}-{coding}")
+
+    def response(self, max_age=0, immutable=False):
+        accepted = [coding for coding, _ in ENCODING_SUFFIXES if coding in self.variants and request.accept_encodings[coding]]
+        coding = accepted[0] if accepted else "identity"
+        body, etag = self.variants[coding]
+
+        response = Response(body, mimetype=self.mimetype)
+        if coding != "identity":
+            response.headers["Content-Encoding"] = coding
+        if len(self.variants) > 1:
+            response.vary.add("Accept-Encoding")
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = immutable
+        return response.make_conditional(request)
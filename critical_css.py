@@ -0,0 +1,249 @@
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+from html.parser import HTMLParser
+
+from markupsafe import Markup
+
+from minify import minify_css
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Critical (above-the-fold) CSS
+# ----------------------
+
+CRITICAL_CSS_FILE = "dist/critical.json"
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+# classes the page's own scripts add later, e.g. classList.add('inView')
+CLASSLIST_RE = re.compile(r"classList\.(?:add|toggle|replace)\(([^)]*)\)")
+QUOTED_RE = re.compile(r"""['"]([\w-]+)['"]""")
+PSEUDO_RE = re.compile(r"::?[\w-]+(?:\([^)]*\))?")
+ATTRIBUTE_RE = re.compile(r"\[[^\]]*\]")
+COMBINATOR_RE = re.compile(r"\s*[>+~]\s*|\s+")
+
+
+class _FoldScanner(HTMLParser):
+    """Tags, ids, classes and stylesheet links of a page, split at the fold"""
+
+    def __init__(self):
+        super().__init__()
+        self.below_fold = False
+        self.tags, self.ids, self.classes = {"html", "body"}, set(), set()
+        self.stylesheets = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        rel = (attrs.get("rel") or "").lower()
+        if tag == "link" and (rel == "stylesheet" or (rel == "preload" and attrs.get("as") == "style")):
+            # the <noscript> fallback repeats the preloaded stylesheet
+            if attrs.get("href") and attrs["href"] not in self.stylesheets:
+                self.stylesheets.append(attrs["href"])
+        # everything before the first <section> is the first screen
+        if tag == "section":
+            self.below_fold = True
+        if self.below_fold:
+            return
+        self.tags.add(tag)
+        if attrs.get("id"):
+            self.ids.add(attrs["id"])
+        self.classes.update((attrs.get("class") or "").split())
+
+
+def _blocks(css):
+    """Top-level (prelude, body) pairs of a stylesheet; body is None for @import and the like"""
+    blocks, i, start, depth, quote = [], 0, 0, 0, None
+    body_start = None
+    while i < len(css):
+        c = css[i]
+        if quote:
+            if c == "\\":
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == "{":
+            if depth == 0:
+                body_start = i
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                blocks.append((css[start:body_start].strip(), css[body_start + 1:i]))
+                start = i + 1
+        elif c == ";" and depth == 0:
+            blocks.append((css[start:i].strip(), None))
+            start = i + 1
+        i += 1
+    return blocks
+
+
+def _split_selectors(prelude):
+    selectors, depth, current = [], 0, []
+    for c in prelude:
+        if c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        if c == "," and depth == 0:
+            selectors.append("".join(current))
+            current = []
+        else:
+            current.append(c)
+    selectors.append("".join(current))
+    return [s.strip() for s in selectors if s.strip()]
+
+
+def _may_match(selector, fold):
+    """Whether every part of `selector` names something present above the fold"""
+    selector = ATTRIBUTE_RE.sub("", PSEUDO_RE.sub("", selector))
+    for compound in COMBINATOR_RE.split(selector.strip()):
+        if not compound or compound == "*":
+            continue
+        tag = re.match(r"[a-zA-Z][\w-]*", compound)
+        if tag and tag.group(0).lower() not in fold.tags:
+            return False
+        if any(name not in fold.classes for name in re.findall(r"\.([\w-]+)", compound)):
+            return False
+        if any(name not in fold.ids for name in re.findall(r"#([\w-]+)", compound)):
+            return False
+    return True
+
+
+def _critical_rules(blocks, fold, keyframes):
+    kept = []
+    for prelude, body in blocks:
+        at_rule = prelude.split(None, 1)[0].lower() if prelude.startswith("@") else None
+        if body is None:
+            if at_rule in ("@import", "@charset"):
+                kept.append(prelude + ";")
+        elif at_rule in ("@media", "@supports"):
+            inner = _critical_rules(_blocks(body), fold, keyframes)
+            if inner:
+                kept.append(f"{prelude}{{{inner}}}")
+        elif at_rule and at_rule.endswith("keyframes"):
+            keyframes.append((prelude.split(None, 1)[1].strip(), f"{prelude}{{{body}}}"))
+        elif at_rule == "@font-face":
+            kept.append(f"{prelude}{{{body}}}")
+        elif at_rule is None and any(_may_match(s, fold) for s in _split_selectors(prelude)):
+            kept.append(f"{prelude}{{{body}}}")
+    return "".join(kept)
+
+
+def _absolute_urls(css, stylesheet_url):
+    """Inlined CSS resolves url(...) against the page, so make them absolute"""
+    base = posixpath.dirname(stylesheet_url)
+
+    def replace(match):
+        quote, target = match.groups()
+        if target.startswith(("data:", "http:", "https:", "//", "/", "#")):
+            return match.group(0)
+        return f"url({quote}{posixpath.normpath(posixpath.join(base, target))}{quote})"
+
+    return CSS_URL_RE.sub(replace, css)
+
+
+def extract_critical_css(html, stylesheets):
+    """
+    The rules of `stylesheets` (a list of (url, css) pairs) that can apply to
+    the first screen of `html`, i.e. everything before its first <section>.
+    Classes the page's scripts add with classList are treated as present, so
+    first-screen state changes (fade-ins, menus) are not left to the
+    deferred stylesheet. Keyframes are kept when a kept rule uses them.
+    """
+    fold = _FoldScanner()
+    fold.feed(html)
+    for args in CLASSLIST_RE.findall(html):
+        fold.classes.update(QUOTED_RE.findall(args))
+
+    parts, keyframes = [], []
+    for url, css in stylesheets:
+        parts.append(_absolute_urls(_critical_rules(_blocks(minify_css(css)), fold, keyframes), url))
+    critical = "".join(parts)
+    used = [rule for name, rule in keyframes if re.search(r"animation(?:-name)?:[^;}]*\b" + re.escape(name) + r"\b", critical)]
+    return critical + "".join(used)
+
+
+def build_critical_css(app, pages):
+    """
+    Render each page in `pages` ({name: (render, path)}), extract its
+    critical CSS from the local stylesheets it links and store the result in
+    static/dist/critical.json. Run after `flask build-manifest`, since the
+    result is tied to the hashed stylesheet URLs.
+
+    Returns {name: (critical bytes, linked stylesheet bytes)}.
+    """
+    static_url = app.static_url_path.rstrip("/") + "/"
+    results, report = {}, {}
+    for name, (render, path) in pages.items():
+        with app.test_request_context(path):
+            html = render()
+        scanner = _FoldScanner()
+        scanner.feed(html)
+        stylesheets = []
+        for href in scanner.stylesheets:
+            if not href.startswith(static_url):
+                continue  # e.g. web fonts, those stay as they are
+            with open(os.path.join(app.static_folder, href[len(static_url):].split("?")[0]), encoding="utf-8") as f:
+                stylesheets.append((href, f.read()))
+        critical = extract_critical_css(html, stylesheets)
+        results[name] = {
+            "css": critical,
+            # the critical CSS only describes these exact stylesheets
+            "stylesheets": [href for href, _ in stylesheets],
+            "hash": hashlib.sha256(critical.encode()).hexdigest()[:10],
+        }
+        report[name] = (len(critical.encode()), sum(len(css.encode()) for _, css in stylesheets))
+        logger.info("Critical CSS for %s: %d of %d bytes", name, *report[name])
+
+    output_path = os.path.join(app.static_folder, CRITICAL_CSS_FILE)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path + ".tmp", "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    os.replace(output_path + ".tmp", output_path)
+    return report
+
+
+class CriticalCSS:
+    """
+    Inlines the build output of `flask build-critical` into pages.
+
+    `critical_css(page)` in a template returns the page's critical rules, or
+    an empty string when there are none or they were extracted from other
+    stylesheets than the ones the page links now (rebuild after changing
+    CSS). The template then falls back to a render-blocking <link>.
+    """
+
+    def __init__(self, app=None):
+        self.pages = {}
+        self.enabled = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("CRITICAL_CSS", True)
+        self.enabled = app.config["CRITICAL_CSS"]
+        try:
+            with open(os.path.join(app.static_folder, CRITICAL_CSS_FILE)) as f:
+                self.pages = json.load(f)
+        except FileNotFoundError:
+            logger.warning("Critical CSS not found, run `flask build-critical` to generate it")
+        except Exception as e:
+            logger.error(f"Error loading critical CSS: {e}")
+        app.extensions["critical_css"] = self
+        app.jinja_env.globals["critical_css"] = self.render
+
+    def render(self, page, stylesheets=()):
+        """Critical CSS of `page`, if it was built for exactly these stylesheet URLs"""
+        entry = self.pages.get(page)
+        if not self.enabled or not entry:
+            return ""
+        if list(stylesheets) != entry["stylesheets"]:
+            logger.warning("Critical CSS for %s is stale, run `flask build-critical`", page)
+            return ""
+        return Markup(entry["css"])
@@ -0,0 +1,91 @@
+import csv
+import json
+import zlib
+
+from flask import Response
+
+# ----------------------
+# Streaming CSV / JSONL exports
+# ----------------------
+
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+# rows serialized per yielded chunk, small enough to keep memory flat
+EXPORT_BATCH = 500
+
+# spreadsheet apps run cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class _Line:
+    """File-like target for csv.writer that hands back each written row"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_chunks(rows, fieldnames):
+    writer = csv.writer(_Line())
+    batch = [writer.writerow(fieldnames)]
+    for row in rows:
+        batch.append(writer.writerow([_csv_cell(row.get(field)) for field in fieldnames]))
+        if len(batch) >= EXPORT_BATCH:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def jsonl_chunks(rows, fieldnames):
+    batch = []
+    for row in rows:
+        batch.append(json.dumps({field: row.get(field) for field in fieldnames}, ensure_ascii=False) + "\n")
+        if len(batch) >= EXPORT_BATCH:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def gzip_chunks(chunks, level=6):
+    # wbits=31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(rows, fieldnames, fmt, filename, gzip=False):
+    """
+    Stream `rows` (an iterator of dicts) as a CSV or JSONL download. Rows are
+    serialized in batches as the client reads, so memory use does not grow
+    with the size of the export. With `gzip` the download is a .gz file.
+    """
+    chunks = (csv_chunks if fmt == "csv" else jsonl_chunks)(rows, fieldnames)
+    filename = f"{filename}.{fmt}"
+    mimetype = EXPORT_MIMETYPES[fmt]
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        mimetype = "application/gzip"
+    return Response(
+        chunks,
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+        },
+    )
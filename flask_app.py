@@ -1,13 +1,13 @@
 # standard library imports
 import os
 import logging
-import requests
 import json
 import time
+import asyncio
 from datetime import datetime, timedelta
 
 # third-party imports
-from flask import Flask, render_template, url_for, redirect, request, send_file, jsonify, flash, session
+from flask import Flask, Blueprint, current_app, render_template, stream_template, url_for, redirect, request, send_file, send_from_directory, jsonify, flash, session
 from flask_wtf import FlaskForm
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
@@ -17,62 +17,79 @@ from wtforms.widgets import TextArea
 # from flask_mail import Mail, Message
 from flask_wtf.csrf import CSRFProtect, CSRFError
 from dotenv import load_dotenv
-import resend
-from resend.exceptions import ResendError
-from requests.exceptions import RequestException
+import click
+from werkzeug.local import LocalProxy
 from html import escape
 import hashlib
+import hmac
 
 
 # local imports
-from speakers import speakers
-from team import team
+from render_cache import RenderCache
+from lineup import Lineup
+from images import ResponsiveImages, build_image_derivatives
+from assets import AssetManifest, build_asset_manifest
+from compression import Compression, EncodedBody, precompress_static
+from critical_css import CriticalCSS, build_critical_css
+from minify import minify_html
+from outbox import MailOutbox
+from alerts import AdminAlertDigest
+from aio import BackgroundLoop
+from recaptcha import RECAPTCHA_VERIFY_URL, RecaptchaClient
+from submission_limits import submission_limiter
+from submission_log import SubmissionLog, import_legacy_responses
+from rollups import SubmissionRollups
+from exports import export_response
+from metrics import Metrics
+from profiling import PROFILE_HEADER, PROFILE_QUERY_ARG, RequestProfiler
+from limiter_storage import SQLiteStorage  # registers the sqlite:/// storage scheme
+from tracking_store import IDENTITY_SORT_KEYS, SQLiteTrackingStore, create_tracking_store, migrate_json_tracking
 
 # ----------------------
 # App / Config
 # ----------------------
 
-from pathlib import Path
-env_path = Path(__file__).with_name(".env")
-load_dotenv(dotenv_path=env_path)
+logger = logging.getLogger("envision")
 
+# extensions are created unbound and attached to the app in create_app()
+csrf = CSRFProtect()
 
-# Initialize app and contact form
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
-app.config['RECAPTCHA_SECRET_KEY'] = os.getenv('RECAPTCHA_SECRET_KEY')
-app.config['RECAPTCHA_SITE_KEY'] = os.getenv('RECAPTCHA_SITE_KEY')
-app.config['ADMIN_PASSWORD'] = os.getenv('ADMIN_PASSWORD') 
+# landing page only varies per request by its CSRF token, so the body is rendered once per process
+page_cache = RenderCache()
 
+# speakers and team from data/*.json, reloaded when the files change
+lineup = Lineup()
 
-resend.api_key = os.getenv('RESEND_API_KEY')
-MAIL_TO = os.getenv('MAIL_TO')
-MAIL_FROM = os.getenv('MAIL_FROM')
+@lineup.on_reload
+def _drop_cached_pages(view):
+    # cached pages embed the previous lineup
+    page_cache.invalidate()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(levelname)s:%(name)s:%(message)s"
-)
-logger = logging.getLogger("envision")
+# <picture>/srcset markup for speaker and team photos, see `flask build-images`
+responsive_images = ResponsiveImages()
+
+# url_for('static', ...) resolves to content-hashed copies, see `flask build-manifest`
+asset_manifest = AssetManifest()
 
-if not resend.api_key:
-    logger.error("RESEND_API_KEY is not set")
-if not MAIL_FROM:
-    logger.error("MAIL_FROM is not set (e.g. 'Your App <noreply@verified-domain.com>')")
-if not MAIL_TO:
-    logger.error("MAIL_TO is not set")
+# above-the-fold CSS inlined into the landing page, see `flask build-critical`
+critical_css = CriticalCSS()
 
-# Log admin password status
-if app.config['ADMIN_PASSWORD'] == 'admin123':
-    logger.warning("Using default admin password 'admin123'. Set ADMIN_PASSWORD environment variable for production.")
-else:
-    logger.info("Admin password configured from environment variable.")
+# precompressed static siblings (see `flask precompress`) and on-the-fly compression of dynamic responses
+compression = Compression()
 
-csrf = CSRFProtect(app)
+# async views share one event loop per process instead of a new loop per request
+background_loop = BackgroundLoop()
 
-@app.errorhandler(CSRFError)
+# request, dependency, file I/O and template timings merged across workers, served at /metrics
+metrics = Metrics()
+
+# every route and CLI command of the site
+site = Blueprint('site', __name__, cli_group=None)
+
+@site.app_errorhandler(CSRFError)
 def handle_csrf_error(e):
     logger.error(f"CSRF failed: {e.description}")
+    metrics.inc('envision_rejections_total', reason='csrf')
     return jsonify({"success": False, "message": f"CSRF failed: {e.description}"}), 400
 
 # ----------------------
@@ -85,12 +102,19 @@ def hash_password(password):
 
 def verify_admin_password(password):
     """Verify admin password"""
-    stored_hash = hash_password(app.config['ADMIN_PASSWORD'])
+    stored_hash = hash_password(current_app.config['ADMIN_PASSWORD'])
     input_hash = hash_password(password)
     return stored_hash == input_hash
 
 def send_admin_access_alert(admin_name, ip_address, access_type, success=True):
-    """Send email alert for admin login attempts (security-focused)"""
+    """
+    Alert for admin login attempts (security-focused). Successful logins are
+    queued right away; failures are collected into a periodic digest.
+    """
+    if not success:
+        admin_alerts.record_failure(admin_name, ip_address, request.headers.get('User-Agent', 'Unknown'))
+        return
+
     try:
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         status = "SUCCESS" if success else "FAILED"
@@ -133,15 +157,15 @@ def send_admin_access_alert(admin_name, ip_address, access_type, success=True):
         """
         
         # Send to the same email as form submissions
-        if MAIL_TO:
-            send_resend(
-                to=MAIL_TO,
+        if current_app.config['MAIL_TO']:
+            mail_outbox.enqueue(
+                to=current_app.config['MAIL_TO'],
                 subject=subject,
                 html=html,
                 reply_to_email="security@envisionprinceton.com",
                 reply_to_name="Envision Security System"
             )
-            logger.info(f"Admin access alert sent: {admin_name} - {access_type} - {status}")
+            logger.info(f"Admin access alert queued: {admin_name} - {access_type} - {status}")
         
     except Exception as e:
         logger.error(f"Failed to send admin access alert: {e}")
@@ -159,6 +183,9 @@ def require_admin_auth(f):
     decorated_function.__name__ = f.__name__
     return decorated_function
 
+# cProfile traces of single requests, see /admin/profiles
+request_profiler = RequestProfiler(authorized=is_admin_authenticated)
+
 class AdminLoginForm(FlaskForm):
     name = StringField('Name', validators=[InputRequired(), Length(min=2, max=50)], render_kw={"placeholder": "Your Name"})
     password = PasswordField('Password', validators=[InputRequired()])
@@ -170,48 +197,8 @@ class AdminLoginForm(FlaskForm):
 
 SUBMISSION_TRACK_FILE = "submission_tracking.json"
 
-def load_submission_tracking():
-    """Load submission tracking data from file"""
-    try:
-        if os.path.exists(SUBMISSION_TRACK_FILE):
-            with open(SUBMISSION_TRACK_FILE, 'r') as f:
-                data = json.load(f)
-                logger.info(f"Loaded tracking data with {len(data)} entries")
-                # Clean up old entries (older than 30 days)
-                current_time = time.time()
-                cleaned_data = {}
-                for key, value in data.items():
-                    # Check if this is the new format with submissions array
-                    if 'submissions' in value:
-                        # New format: clean up old submissions within each entry
-                        submissions = value.get('submissions', [])
-                        recent_submissions = [s for s in submissions if current_time - s['timestamp'] < (30 * 24 * 60 * 60)]
-                        
-                        # Only keep entries that have recent submissions
-                        if recent_submissions:
-                            cleaned_value = value.copy()
-                            cleaned_value['submissions'] = recent_submissions
-                            cleaned_value['last_submission'] = max(s['timestamp'] for s in recent_submissions)
-                            cleaned_data[key] = cleaned_value
-                    else:
-                        # Old format: check timestamp directly (backward compatibility)
-                        if 'timestamp' in value and current_time - value['timestamp'] < (30 * 24 * 60 * 60):
-                            cleaned_data[key] = value
-                logger.info(f"Returning cleaned tracking data with {len(cleaned_data)} entries")
-                return cleaned_data
-        logger.warning("Tracking file does not exist")
-        return {}
-    except Exception as e:
-        logger.error(f"Error loading submission tracking: {e}")
-        return {}
-
-def save_submission_tracking(data):
-    """Save submission tracking data to file"""
-    try:
-        with open(SUBMISSION_TRACK_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-    except Exception as e:
-        logger.error(f"Error saving submission tracking: {e}")
+# opened in create_app(), see _open_stores()
+tracking_store = LocalProxy(lambda: current_app.extensions['tracking_store'])
 
 def check_duplicate_submission(name, email, ip):
     """
@@ -220,141 +207,131 @@ def check_duplicate_submission(name, email, ip):
     - 24-hour cooldown between every 2 submissions
     Returns (is_duplicate, message) tuple
     """
-    tracking_data = load_submission_tracking()
     current_time = time.time()
     
-    MAX_SUBMISSIONS = 4
-    TWO_WEEKS = 14 * 24 * 60 * 60  # 14 days in seconds
-    COOLDOWN_PERIOD = 24 * 60 * 60  # 24 hours in seconds
-    
     # normalize inputs for comparison
     normalized_name = name.strip().lower()
     normalized_email = email.strip().lower()
     
-    # Check submission limits for name
-    if normalized_name in tracking_data:
-        name_data = tracking_data[normalized_name]
-        submissions = name_data.get('submissions', [])
-        
-        # clean up old submissions (older than 2 weeks)
-        recent_submissions = [s for s in submissions if current_time - s['timestamp'] < TWO_WEEKS]
-        
-        # Check if max submissions reached
-        if len(recent_submissions) >= MAX_SUBMISSIONS:
-            oldest_submission = min(recent_submissions, key=lambda x: x['timestamp'])
-            time_until_reset = TWO_WEEKS - (current_time - oldest_submission['timestamp'])
-            days_until_reset = time_until_reset / (24 * 60 * 60)
-            
-            logger.warning(f"Submission limit exceeded - name '{name}' has submitted {len(recent_submissions)}/{MAX_SUBMISSIONS} times in the last 2 weeks from IP {ip}")
-            return True, f"The name '{name}' has reached the maximum number of submissions ({MAX_SUBMISSIONS}) for this 2-week period. Please wait {days_until_reset:.1f} days before submitting again."
-        
-        # Check cooldown period (24 hours between every 2 submissions)
-        if len(recent_submissions) >= 2:
-            # Sort submissions by timestamp (most recent first)
-            recent_submissions.sort(key=lambda x: x['timestamp'], reverse=True)
-            
-            # check if we're in a cooldown period (after every 2nd submission)
-            submission_pairs = len(recent_submissions) // 2
-            if submission_pairs > 0:
-                # check the most recent pair
-                last_pair_start = recent_submissions[submission_pairs * 2 - 1]['timestamp']
-                time_since_last_pair = current_time - last_pair_start
-                
-                if time_since_last_pair < COOLDOWN_PERIOD:
-                    time_until_cooldown_ends = COOLDOWN_PERIOD - time_since_last_pair
-                    hours_until_cooldown_ends = time_until_cooldown_ends / 3600
-                    
-                    logger.warning(f"Cooldown period active - name '{name}' submitted {len(recent_submissions)} times, cooldown ends in {hours_until_cooldown_ends:.1f} hours from IP {ip}")
-                    return True, f"Please wait {hours_until_cooldown_ends:.1f} hours before submitting again. There is a 24-hour cooldown period after every 2 submissions."
-    
-    # Check submission limits for email (same logic)
-    if normalized_email in tracking_data:
-        email_data = tracking_data[normalized_email]
-        submissions = email_data.get('submissions', [])
-        
-        # Clean up old submissions (older than 2 weeks)
-        recent_submissions = [s for s in submissions if current_time - s['timestamp'] < TWO_WEEKS]
-        
-        # Check if max submissions reached
-        if len(recent_submissions) >= MAX_SUBMISSIONS:
-            oldest_submission = min(recent_submissions, key=lambda x: x['timestamp'])
-            time_until_reset = TWO_WEEKS - (current_time - oldest_submission['timestamp'])
-            days_until_reset = time_until_reset / (24 * 60 * 60)
-            
-            logger.warning(f"Submission limit exceeded - email '{email}' has submitted {len(recent_submissions)}/{MAX_SUBMISSIONS} times in the last 2 weeks from IP {ip}")
-            return True, f"The email '{email}' has reached the maximum number of submissions ({MAX_SUBMISSIONS}) for this 2-week period. Please wait {days_until_reset:.1f} days before submitting again."
-        
-        # Check cooldown period (24 hours between every 2 submissions)
-        if len(recent_submissions) >= 2:
-            # Sort submissions by timestamp (most recent first)
-            recent_submissions.sort(key=lambda x: x['timestamp'], reverse=True)
-            
-            # Check if we're in a cooldown period (after every 2nd submission)
-            submission_pairs = len(recent_submissions) // 2
-            if submission_pairs > 0:
-                # Check the most recent pair
-                last_pair_start = recent_submissions[submission_pairs * 2 - 1]['timestamp']
-                time_since_last_pair = current_time - last_pair_start
-                
-                if time_since_last_pair < COOLDOWN_PERIOD:
-                    time_until_cooldown_ends = COOLDOWN_PERIOD - time_since_last_pair
-                    hours_until_cooldown_ends = time_until_cooldown_ends / 3600
-                    
-                    logger.warning(f"Cooldown period active - email '{email}' submitted {len(recent_submissions)} times, cooldown ends in {hours_until_cooldown_ends:.1f} hours from IP {ip}")
-                    return True, f"Please wait {hours_until_cooldown_ends:.1f} hours before submitting again. There is a 24-hour cooldown period after every 2 submissions."
-    
-    # Record this submission
-    submission_record = {
-        'timestamp': current_time,
-        'ip': ip,
-        'name': name,
-        'email': email
-    }
-    
-    # update tracking data for name
-    if normalized_name in tracking_data:
-        tracking_data[normalized_name]['submissions'].append(submission_record)
-        tracking_data[normalized_name]['last_submission'] = current_time
-        tracking_data[normalized_name]['last_ip'] = ip
-    else:
-        tracking_data[normalized_name] = {
-            'submissions': [submission_record],
-            'first_submission': current_time,
-            'last_submission': current_time,
-            'last_ip': ip,
-            'email': normalized_email,
-            'name': name
-        }
-    
-    # update tracking data for email
-    if normalized_email in tracking_data:
-        tracking_data[normalized_email]['submissions'].append(submission_record)
-        tracking_data[normalized_email]['last_submission'] = current_time
-        tracking_data[normalized_email]['last_ip'] = ip
-    else:
-        tracking_data[normalized_email] = {
-            'submissions': [submission_record],
-            'first_submission': current_time,
-            'last_submission': current_time,
-            'last_ip': ip,
-            'name': normalized_name,
+    with metrics.timer('envision_io_duration_seconds', op='tracking_write'), tracking_store.transaction() as txn:
+        message, counts, rings = _check_limits(txn, name, email, ip, current_time)
+        if message:
+            return True, message
+
+        # limit/cooldown state including this submission, for the admin view
+        state = {}
+        for kind, ring in rings.items():
+            ring.append(current_time)
+            limit_until, cooldown_until = submission_limiter.blocked_until(ring, current_time)
+            state[kind] = {'limit_until': limit_until, 'cooldown_until': cooldown_until}
+
+        # Record this submission
+        submission_record = {
+            'timestamp': current_time,
+            'ip': ip,
+            'name': name,
             'email': email
         }
-    
-    save_submission_tracking(tracking_data)
-    
+        txn.record_submission({
+            normalized_name: dict(state['name'], name=name, email=normalized_email),
+            normalized_email: dict(state['email'], name=normalized_name, email=email),
+        }, submission_record)
+
     # Log successful submission with count info
-    name_submissions = len([s for s in tracking_data[normalized_name]['submissions'] if current_time - s['timestamp'] < TWO_WEEKS])
-    logger.info(f"Submission recorded - name '{name}' (submission #{name_submissions}/{MAX_SUBMISSIONS} in last 2 weeks) from IP {ip}")
+    logger.info(f"Submission recorded - name '{name}' (submission #{counts['name'] + 1}/{submission_limiter.max_submissions} in last 2 weeks) from IP {ip}")
     
     return False, None
 
+def precheck_submission_limits(name, email, ip):
+    """
+    Same checks as check_duplicate_submission() without the write lock and
+    without recording anything. Returns (is_duplicate, message) tuple
+    """
+    with metrics.timer('envision_io_duration_seconds', op='tracking_read'), tracking_store.snapshot() as txn:
+        message, _, _ = _check_limits(txn, name, email, ip, time.time())
+    return message is not None, message
+
+def _check_limits(txn, name, email, ip, current_time):
+    """
+    Returns (message, counts, rings); message is None when both identities are
+    within the limits, rings hold each identity's recent history
+    """
+    since = current_time - submission_limiter.window
+    # the same limits apply to the name and to the email
+    counts, rings = {}, {}
+    for kind, value in (('name', name), ('email', email)):
+        history = txn.recent_submissions(value.strip().lower(), since, submission_limiter.max_submissions)
+        ring = rings[kind] = submission_limiter.ring_from_newest([s['timestamp'] for s in history])
+        decision = submission_limiter.check(ring, current_time)
+        if not decision.allowed:
+            return _limit_message(kind, value, decision, ip), counts, rings
+        counts[kind] = decision.count
+    return None, counts, rings
+
+def backfill_identity_state():
+    """Store limit/cooldown state for identities imported or recorded before it was kept"""
+    with tracking_store.transaction() as txn:
+        missing = txn.identities_missing_state()
+        for identity, last_submission in missing:
+            history = txn.recent_submissions(identity, last_submission - submission_limiter.window, submission_limiter.max_submissions)
+            ring = submission_limiter.ring_from_newest([s['timestamp'] for s in history])
+            txn.set_identity_state(identity, *submission_limiter.blocked_until(ring, last_submission))
+    if missing:
+        logger.info("Stored limit/cooldown state for %d tracked identities", len(missing))
+
+def _limit_message(kind, value, decision, ip):
+    """User-facing message (and warning log) for a blocked submission"""
+    max_submissions = submission_limiter.max_submissions
+    if decision.reason == 'limit':
+        days_until_reset = decision.retry_after / (24 * 60 * 60)
+        logger.warning(f"Submission limit exceeded - {kind} '{value}' has submitted {decision.count}/{max_submissions} times in the last 2 weeks from IP {ip}")
+        return f"The {kind} '{value}' has reached the maximum number of submissions ({max_submissions}) for this 2-week period. Please wait {days_until_reset:.1f} days before submitting again."
+
+    hours_until_cooldown_ends = decision.retry_after / 3600
+    logger.warning(f"Cooldown period active - {kind} '{value}' submitted {decision.count} times, cooldown ends in {hours_until_cooldown_ends:.1f} hours from IP {ip}")
+    return f"Please wait {hours_until_cooldown_ends:.1f} hours before submitting again. There is a 24-hour cooldown period after every 2 submissions."
+
+# ----------------------
+# Submission log
+# ----------------------
+
+LEGACY_RESPONSES_FILE = "responses.txt"
+
+# accepted submissions, one JSON record each, see /admin/submissions
+submission_log = LocalProxy(lambda: current_app.extensions['submission_log'])
+
+# per-role/day/domain counts, updated as submissions are logged
+submission_rollups = LocalProxy(lambda: current_app.extensions['submission_rollups'])
+
+def _open_stores(app):
+    """Open the tracking store, submission log and rollups, and run their one-time imports"""
+    if app.config['TRACKING_BACKEND'] == 'json':
+        app.extensions['tracking_store'] = create_tracking_store('json', SUBMISSION_TRACK_FILE)
+    else:
+        app.extensions['tracking_store'] = create_tracking_store(app.config['TRACKING_BACKEND'], app.config['TRACKING_DB_PATH'])
+        # one-time import of the legacy JSON file into the database
+        migrate_json_tracking(SUBMISSION_TRACK_FILE, app.extensions['tracking_store'])
+
+    app.extensions['submission_log'] = SubmissionLog(app.config['SUBMISSION_LOG_PATH'])
+    # the old tab-separated file is imported once with `flask import-responses`, not by every worker
+    if os.path.exists(LEGACY_RESPONSES_FILE) and not app.extensions['submission_log'].is_imported(os.path.abspath(LEGACY_RESPONSES_FILE)):
+        logger.warning("%s has not been imported into the submission log, run `flask import-responses`", LEGACY_RESPONSES_FILE)
+
+    app.extensions['submission_rollups'] = SubmissionRollups(app.config['ANALYTICS_DB_PATH'])
+
+    with app.app_context():
+        backfill_identity_state()
+        submission_rollups.catch_up(submission_log)
+
 def real_ip():
     return request.headers.get('X-Forwarded-For', request.remote_addr).split(',')[0].strip()
 
+def _rate_limited(request_limit):
+    metrics.inc('envision_rejections_total', reason='rate_limit')
+
 limiter = Limiter(
     key_func=real_ip,
-    app=app,
+    on_breach=_rate_limited,
 )
 
 # ----------------------
@@ -386,7 +363,7 @@ def send_resend(to, subject, html, reply_to_email=None, reply_to_name=None, bcc=
         raise ValueError("`subject` must not be empty")
     if not html:
         raise ValueError("`html` must not be empty")
-    if not MAIL_TO:
+    if not current_app.config['MAIL_TO']:
         raise ValueError("MAIL_TO is not configured")
 
     # build payload
@@ -409,9 +386,15 @@ def send_resend(to, subject, html, reply_to_email=None, reply_to_name=None, bcc=
         if bcc_list:
             payload["bcc"] = bcc_list
     
+    # the SDK pulls in requests, so it is imported on the first send rather than at startup
+    import resend
+    from resend.exceptions import ResendError
+    resend.api_key = current_app.config['RESEND_API_KEY']
+
     # send email
     try:
-        resp = resend.Emails.send(payload)  # SDK returns a dict, e.g. {"id": "..."}
+        with metrics.timer('envision_dependency_duration_seconds', dependency='resend'):
+            resp = resend.Emails.send(payload)  # SDK returns a dict, e.g. {"id": "..."}
     except ResendError as e:
         status = getattr(e, "status_code", None) or getattr(e, "status", None)
         body = getattr(e, "body", None) or getattr(e, "message", None) or str(e)
@@ -438,10 +421,19 @@ def send_resend(to, subject, html, reply_to_email=None, reply_to_name=None, bcc=
     logger.info("Resend accepted message id=%s to=%s subject=%s", msg_id, to_list, subject)
     return msg_id
 
+# form confirmations are spooled to disk and sent by a background worker, see /admin/outbox
+mail_outbox = MailOutbox(send=send_resend)
+
+# failed admin logins are batched into one digest email per window
+admin_alerts = AdminAlertDigest(outbox=mail_outbox)
+
 # ----------------------
 # reCAPTCHA
 # ----------------------
 
+# pooled keep-alive client with a local replay cache
+recaptcha_client = RecaptchaClient()
+
 def verify_recaptcha_v2(token, remote_ip=None):
     """
     Verify reCAPTCHA v2 token with Google's API.
@@ -453,93 +445,66 @@ def verify_recaptcha_v2(token, remote_ip=None):
     Returns:
         tuple: (success: bool, error_message: str or None)
     """
-    secret = app.config.get('RECAPTCHA_SECRET_KEY')
-    if not secret:
-        logger.error("RECAPTCHA_SECRET_KEY is not set.")
-        return False, "reCAPTCHA configuration error"
-
-    if not token:
-        logger.warning("reCAPTCHA verification attempted with empty token")
-        return False, "reCAPTCHA token is missing"
+    error = _recaptcha_request_error(token)
+    if error:
+        return error
 
     client_ip = remote_ip or real_ip()
     logger.info("Verifying reCAPTCHA: ip=%s token_len=%s", client_ip, len(token))
 
     try:
-        resp = requests.post(
-            "https://www.google.com/recaptcha/api/siteverify",
-            data={
-                'secret': secret,
-                'response': token,
-                'remoteip': client_ip,
-            },
-            timeout=10  # Increased timeout for better reliability
-        )
-        logger.info("reCAPTCHA API response: HTTP %s", resp.status_code)
+        with metrics.timer('envision_dependency_duration_seconds', dependency='recaptcha'):
+            return recaptcha_client.verify(current_app.config['RECAPTCHA_SECRET_KEY'], token, client_ip)
+    except Exception as e:
+        logger.exception("Unexpected error during reCAPTCHA verification: %s", str(e))
+        return False, "reCAPTCHA verification error"
 
-        if resp.status_code != 200:
-            logger.error("reCAPTCHA API non-200 response: %s", resp.text[:200])
-            return False, "reCAPTCHA service temporarily unavailable"
+async def verify_recaptcha_v2_async(token, remote_ip=None):
+    """Async version of verify_recaptcha_v2(), same arguments and return value"""
+    error = _recaptcha_request_error(token)
+    if error:
+        return error
 
-        data = resp.json()
-        logger.info("reCAPTCHA verification response: %s", data)
-        
-        success = bool(data.get('success'))
-        
-        if not success:
-            error_codes = data.get('error-codes', [])
-            error_messages = []
-            
-            for error_code in error_codes:
-                if error_code == 'missing-input-secret':
-                    error_messages.append("reCAPTCHA secret key is missing")
-                elif error_code == 'invalid-input-secret':
-                    error_messages.append("reCAPTCHA secret key is invalid")
-                elif error_code == 'missing-input-response':
-                    error_messages.append("reCAPTCHA response is missing")
-                elif error_code == 'invalid-input-response':
-                    error_messages.append("reCAPTCHA response is invalid")
-                elif error_code == 'bad-request':
-                    error_messages.append("reCAPTCHA request is malformed")
-                elif error_code == 'timeout-or-duplicate':
-                    error_messages.append("reCAPTCHA response has expired or been used")
-                else:
-                    error_messages.append(f"reCAPTCHA error: {error_code}")
-            
-            error_message = "; ".join(error_messages) if error_messages else "reCAPTCHA verification failed"
-            logger.warning("reCAPTCHA verification failed: %s", error_message)
-            return False, error_message
-        
-        logger.info("reCAPTCHA verification successful")
-        return True, None
-
-    except RequestException as e:
-        logger.exception("reCAPTCHA API request failed: %s", str(e))
-        return False, "reCAPTCHA service temporarily unavailable"
-    except ValueError as e:
-        logger.exception("reCAPTCHA API returned invalid JSON: %s", str(e))
-        return False, "reCAPTCHA service error"
+    client_ip = remote_ip or real_ip()
+    logger.info("Verifying reCAPTCHA: ip=%s token_len=%s", client_ip, len(token))
+
+    try:
+        with metrics.timer('envision_dependency_duration_seconds', dependency='recaptcha'):
+            return await recaptcha_client.verify_async(current_app.config['RECAPTCHA_SECRET_KEY'], token, client_ip)
     except Exception as e:
         logger.exception("Unexpected error during reCAPTCHA verification: %s", str(e))
         return False, "reCAPTCHA verification error"
 
+def _recaptcha_request_error(token):
+    """(False, message) when verification can't be attempted, otherwise None"""
+    if not current_app.config.get('RECAPTCHA_SECRET_KEY'):
+        logger.error("RECAPTCHA_SECRET_KEY is not set.")
+        return False, "reCAPTCHA configuration error"
+
+    if not token:
+        logger.warning("reCAPTCHA verification attempted with empty token")
+        return False, "reCAPTCHA token is missing"
+    return None
+
 # ----------------------
 # Form
 # ----------------------
 
+ROLE_CHOICES = [
+    ('', 'Please Select a Role'),
+    ('speaker', 'Speaker'),
+    ('volunteer', 'Volunteer'),
+    ('attendee', 'Attendee'),
+    ('partner-sponsor', 'Partner / Sponsor'),
+]
+
 class ContactForm(FlaskForm):
     name = StringField(validators=[InputRequired(), Length(min=2, max=80)], render_kw={"placeholder": "Full Name"})
     email_id = StringField(validators=[InputRequired(), Email(), Length(min=4, max=80)], render_kw={"placeholder": "Email"})
     affiliation = StringField(validators=[InputRequired(), Length(min=4, max=80)], render_kw={"placeholder": "Affiliation"})
     role = SelectField(
         "Role",
-        choices=[
-            ('', 'Please Select a Role'),
-            ('speaker', 'Speaker'),
-            ('volunteer', 'Volunteer'),
-            ('attendee', 'Attendee'),
-            ('partner-sponsor', 'Partner / Sponsor'),
-        ],
+        choices=ROLE_CHOICES,
         validators=[InputRequired()],
     )
     message = StringField(validators=[InputRequired(), Length(min=4, max=800)], render_kw={"placeholder": "Enter your message here..."}, widget=TextArea())
@@ -551,67 +516,68 @@ class ContactForm(FlaskForm):
 # Routes
 # ----------------------
 
-@app.route('/get-involved', methods=['POST'])
-@limiter.limit("5 per minute") 
-def get_involved():
-    ip = real_ip()
-    # get token sent by reCAPTCHA
-    token = request.form.get('g-recaptcha-response', '')
+def _log_form_request(ip, token):
     logger.info("POST /get-involved from %s; token_present=%s; user_agent=%s", 
                 ip, bool(token), request.headers.get('User-Agent', 'Unknown')[:100])
 
-    # verify reCAPTCHA
-    recaptcha_success, recaptcha_error = verify_recaptcha_v2(token, ip)
-    if not recaptcha_success:
-        logger.warning("reCAPTCHA verification failed for IP %s: %s", ip, recaptcha_error)
-        return jsonify({
-            "success": False,
-            "message": f"reCAPTCHA verification failed: {recaptcha_error}. Please try again."
-        }), 400
+def _recaptcha_failed(ip, recaptcha_error):
+    metrics.inc('envision_rejections_total', reason='recaptcha')
+    logger.warning("reCAPTCHA verification failed for IP %s: %s", ip, recaptcha_error)
+    return jsonify({
+        "success": False,
+        "message": f"reCAPTCHA verification failed: {recaptcha_error}. Please try again."
+    }), 400
+
+def _form_invalid(form):
+    metrics.inc('envision_rejections_total', reason='invalid_form')
+    return jsonify({
+    "success": False, 
+    "message": "Form validation failed, please check fields and try again.", 
+    "errors": form.errors
+    }), 400
+
+def _submission_fields(form):
+    """extract form data + sanitize"""
+    return {
+        'name': (form.name.data or "").strip(),
+        'email': (form.email_id.data or "").strip(),
+        'affiliation': (form.affiliation.data or "").strip(),
+        'role': (form.role.data or "").strip(),
+        'message': (form.message.data or "").strip(),
+    }
 
-    print("Form submission received")
-    form = ContactForm()
+def _duplicate_blocked(fields, ip, duplicate_message):
+    metrics.inc('envision_rejections_total', reason='duplicate')
+    logger.warning("Duplicate submission blocked: name=%s, email=%s, ip=%s", fields['name'], fields['email'], ip)
+    return jsonify({
+        "success": False,
+        "message": duplicate_message
+    }), 400
 
-    # form validation failure
-    if not form.validate_on_submit():
-        return jsonify({
-        "success": False, 
-        "message": "Form validation failed, please check fields and try again.", 
-        "errors": form.errors
-        }), 400
-    
-    # extract form data + sanitize
-    name = (form.name.data or "").strip()
-    email = (form.email_id.data or "").strip()
-    affiliation = (form.affiliation.data or "").strip()
-    role = (form.role.data or "").strip()
-    message = (form.message.data or "").strip()
+def _has_header_injection(fields):
+    return any(x in (fields['name'] + fields['email']) for x in ("\r", "\n"))
 
-    # Check for duplicate submissions
-    is_duplicate, duplicate_message = check_duplicate_submission(name, email, ip)
-    if is_duplicate:
-        logger.warning("Duplicate submission blocked: name=%s, email=%s, ip=%s", name, email, ip)
-        return jsonify({
-            "success": False,
-            "message": duplicate_message
-        }), 400
-
-    safe_name = escape(name or "")
-    safe_email = escape(email or "")
-    safe_affiliation = escape(affiliation or "")
-    safe_role = escape(role or "")
-    safe_message = escape(message or "")
-    safe_ip = escape(ip or "")
-
-    if any(x in (name + email) for x in ("\r", "\n")):
-        return jsonify({"success": False, "message": "Invalid input."}), 400
-
-    # append to responses.txt for logging
+def _log_submission(fields, ip):
+    """append to the submission log for the admin pages"""
+    try:
+        with metrics.timer('envision_io_duration_seconds', op='submission_log_append'):
+            submission_log.append(dict(fields, ts=time.time(), ip=ip, source="form"))
+    except Exception as e:
+        logger.exception("Failed to write to the submission log: %s", e)
+        return
     try:
-        with open("responses.txt", "a") as file:
-            file.write("\t".join([name, email, affiliation, role, message]) + "\n")
+        submission_rollups.catch_up(submission_log)
     except Exception as e:
-        logger.exception("Failed to write to responses.txt: %s", e)
+        # the next catch_up() applies it
+        logger.exception("Failed to update submission rollups: %s", e)
+
+def _queue_confirmation(fields):
+    """Queue the confirmation email; the outbox worker delivers it with retries. Raises OSError."""
+    safe_name = escape(fields['name'] or "")
+    safe_email = escape(fields['email'] or "")
+    safe_affiliation = escape(fields['affiliation'] or "")
+    safe_role = escape(fields['role'] or "")
+    safe_message = escape(fields['message'] or "")
 
     # build email
     custom_message = ""
@@ -649,46 +615,166 @@ def get_involved():
     <p style="font-size:small;color:gray;">This email was sent to {safe_email} from a form filled out on www.envisionprinceton.com. If you did not fill out the form, please ignore this email.</p>
     """
 
-    # send confirmation email
     subject = f"Envision Get Involved: {safe_name} [{safe_role}]"
-    try:
-        msg_id = send_resend(
-            to= safe_email,
-            subject=subject,
-            html=html,
-            reply_to_email="mpinero@princeton.edu",
-            reply_to_name="Envision Planning Team",
-            bcc = MAIL_TO 
-        )
-        
-        logger.info("Email sent successfully, message id: %s", msg_id)
-    
-    except EmailSendError as e:
-        logger.exception("EmailSendError: %s", e)
-        return jsonify({"success": False, "message": "Email service error, please try again."}), 500
+    msg_id = mail_outbox.enqueue(
+        to= safe_email,
+        subject=subject,
+        html=html,
+        reply_to_email="mpinero@princeton.edu",
+        reply_to_name="Envision Planning Team",
+        bcc = current_app.config['MAIL_TO'] 
+    )
+    logger.info("Email queued successfully, outbox id: %s", msg_id)
+    return msg_id
 
+def _queue_failed(e):
+    logger.exception("Failed to queue email: %s", e)
+    return jsonify({"success": False, "message": "Email service error, please try again."}), 500
+
+def _submitted():
     return jsonify({"success": True, "message": "Form submitted successfully!"})
-    
 
-@app.route('/', methods=['GET', 'POST'])
-def index():
+@limiter.limit("5 per minute") 
+def get_involved():
+    ip = real_ip()
+    # get token sent by reCAPTCHA
+    token = request.form.get('g-recaptcha-response', '')
+    _log_form_request(ip, token)
+
+    # verify reCAPTCHA
+    recaptcha_success, recaptcha_error = verify_recaptcha_v2(token, ip)
+    if not recaptcha_success:
+        return _recaptcha_failed(ip, recaptcha_error)
+
     form = ContactForm()
-    return render_template(
-        "index.html",
-        recaptcha_site_key= app.config['RECAPTCHA_SITE_KEY'],
-        ContactForm = form,
+
+    # form validation failure
+    if not form.validate_on_submit():
+        return _form_invalid(form)
+    fields = _submission_fields(form)
+
+    # Check for duplicate submissions
+    is_duplicate, duplicate_message = check_duplicate_submission(fields['name'], fields['email'], ip)
+    if is_duplicate:
+        return _duplicate_blocked(fields, ip, duplicate_message)
+
+    if _has_header_injection(fields):
+        metrics.inc('envision_rejections_total', reason='header_injection')
+        return jsonify({"success": False, "message": "Invalid input."}), 400
+
+    _log_submission(fields, ip)
+
+    try:
+        _queue_confirmation(fields)
+    except OSError as e:
+        return _queue_failed(e)
+
+    return _submitted()
+
+@limiter.limit("5 per minute") 
+async def get_involved_async():
+    """
+    Same responses as get_involved(), with the independent steps overlapped:
+    the reCAPTCHA call runs alongside a read-only limit check, and the
+    submission log append alongside the outbox write. Blocking file and
+    database work runs in threads so the event loop keeps serving other
+    submissions.
+    """
+    ip = real_ip()
+    token = request.form.get('g-recaptcha-response', '')
+    _log_form_request(ip, token)
+
+    form = ContactForm()
+    fields = _submission_fields(form) if form.validate_on_submit() else None
+
+    checks = [verify_recaptcha_v2_async(token, ip)]
+    if fields:
+        checks.append(asyncio.to_thread(precheck_submission_limits, fields['name'], fields['email'], ip))
+    results = await asyncio.gather(*checks)
+
+    recaptcha_success, recaptcha_error = results[0]
+    if not recaptcha_success:
+        return _recaptcha_failed(ip, recaptcha_error)
+    if fields is None:
+        return _form_invalid(form)
+
+    is_duplicate, duplicate_message = results[1]
+    if not is_duplicate:
+        # checked again under the write lock, then recorded
+        is_duplicate, duplicate_message = await asyncio.to_thread(check_duplicate_submission, fields['name'], fields['email'], ip)
+    if is_duplicate:
+        return _duplicate_blocked(fields, ip, duplicate_message)
+
+    if _has_header_injection(fields):
+        metrics.inc('envision_rejections_total', reason='header_injection')
+        return jsonify({"success": False, "message": "Invalid input."}), 400
+
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(_log_submission, fields, ip),
+            asyncio.to_thread(_queue_confirmation, fields),
+        )
+    except OSError as e:
+        return _queue_failed(e)
+
+    return _submitted()
+
+@site.record_once
+def _register_form_handler(state):
+    state.add_url_rule(
+        '/get-involved',
+        'get_involved',
+        get_involved_async if state.app.config['ASYNC_FORM_HANDLER'] else get_involved,
+        methods=['POST'],
+    )
+    
+
+def index_context(view=None):
+    view = view or lineup.current()
+    return dict(
+        recaptcha_site_key= current_app.config['RECAPTCHA_SITE_KEY'],
+        ContactForm = ContactForm(),
         formOff=0,
-        speakers=speakers,
-        team=team,
-        length_team=len(team),
-        length_active_speakers=len(speakers.active),
-        length_inactive_speakers=len(speakers.inactive),
-        team_slides=int((len(team) / 6) + 0.5) + 1,
+        lineup=view,
+        fragment_url=lambda name: url_for('site.fragment', name=name, v=_fragment_body(view, name).digest),
         registrationOpen = False  # Set to True if registration is open
     )
 
+# below-the-fold sections of index.html, fetched by the page as they come into view
+FRAGMENTS = {
+    'past-speakers': 'fragments/past_speakers.html',
+    'team': 'fragments/team.html',
+}
+
+def _render_fragment(view, name):
+    html = render_template(FRAGMENTS[name], lineup=view)
+    return minify_html(html) if current_app.config['MINIFY_HTML'] else html
+
+def _fragment_body(view, name):
+    return lineup.derived(view, f'fragment-{name}', lambda v: EncodedBody(_render_fragment(v, name), 'text/html'))
+
+@site.route('/fragments/<any("past-speakers", "team"):name>', methods=['GET'])
+def fragment(name):
+    body = _fragment_body(lineup.current(), name)
+    # the page links each fragment by its content digest, so that URL never changes
+    if request.args.get('v') == body.digest:
+        return body.response(max_age=365 * 24 * 3600, immutable=True)
+    return body.response()
+
+def render_index():
+    view = lineup.current()
+    # keyed by lineup version, so a render that raced a reload can't be served for the new data
+    return page_cache.render(f"index-{view.version}", "index.html", lambda: index_context(view))
+
+@site.route('/', methods=['GET', 'POST'])
+def index():
+    if request.method != 'GET':
+        # a POSTed form would be re-rendered with the submitted values, so skip the cache
+        return render_template("index.html", **index_context())
+    return render_index()
+
 '''
-@app.route("/noForm", methods=['GET', 'POST'])
+@site.route("/noForm", methods=['GET', 'POST'])
 def noForm():
     form = ContactForm()
     return render_template(
@@ -703,24 +789,74 @@ def noForm():
     )       
 '''
 
-@app.route("/schedule", methods=['GET'])
+@site.route("/schedule", methods=['GET'])
 def showSchedule():
-    return send_file('templates/EnvisionSchedule.pdf')
+    # the content-hashed copy when the manifest has one, with ETag/Last-Modified, 304s and
+    # byte ranges; always identity, PDF streams are compressed already
+    response = send_from_directory(current_app.static_folder, asset_manifest.resolve(current_app.config['SCHEDULE_PDF']))
+    if response.status_code == 200:
+        # lets PDF viewers fetch the pages they show first
+        response.accept_ranges = 'bytes'
+    # /schedule itself is not versioned, so clients revalidate after a short while
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['SCHEDULE_CACHE_MAX_AGE']
+    return response
+
+
+# ----------------------
+# API
+# ----------------------
+
+def _json_body(data):
+    return EncodedBody(json.dumps(data, ensure_ascii=False, separators=(',', ':')), 'application/json')
+
+def _photo_url(img):
+    return url_for('static', filename=img)
+
+def _speakers_document(view):
+    def speaker(s):
+        return {**s._asdict(), 'img': _photo_url(s.img)}
+    return _json_body({
+        'version': view.version,
+        'current': [speaker(s) for s in view.active_speakers],
+        'past': [speaker(s) for s in view.past_speakers],
+    })
+
+def _team_document(view):
+    return _json_body({
+        'version': view.version,
+        'group_photo': {'name': view.team_photo.name, 'img': _photo_url(view.team_photo.img)},
+        'members': [
+            {'name': m.name, 'role': m.role, 'img': _photo_url(m.img)}
+            for slide in view.team_slides for m in slide
+        ],
+    })
+
+@site.route("/api/speakers", methods=['GET'])
+def api_speakers():
+    view = lineup.current()
+    return lineup.derived(view, 'api-speakers', _speakers_document).response(current_app.config['API_CACHE_MAX_AGE'])
+
+@site.route("/api/team", methods=['GET'])
+def api_team():
+    view = lineup.current()
+    return lineup.derived(view, 'api-team', _team_document).response(current_app.config['API_CACHE_MAX_AGE'])
 
 
 # ----------------------
 # Admin
 # ----------------------
 
-@app.route("/admin", methods=['GET'])
+@site.route("/admin", methods=['GET'])
 def admin_redirect():
     """
     Redirect /admin to /admin/login
     """
     return redirect('/admin/login')
 
-@limiter.limit("3 per minute") 
-@app.route("/admin/login", methods=['GET', 'POST'])
+@site.route("/admin/login", methods=['GET', 'POST'])
+@limiter.limit("3 per minute")
 def admin_login():
     """
     Admin login route
@@ -821,7 +957,7 @@ def admin_login():
         logger.warning(f"Admin login form validation failed from IP {ip}: {form.errors}")
         return redirect('/admin/login?error=Form validation failed. Please try again.')
 
-@app.route("/admin/logout", methods=['POST'])
+@site.route("/admin/logout", methods=['POST'])
 def admin_logout():
     """
     Admin logout route
@@ -844,145 +980,505 @@ def admin_logout():
         
         return redirect('/admin/login')
 
-@app.route("/admin/rate-limit", methods=['GET'])
+RATE_LIMIT_PAGE_SIZE = 50
+
+@site.route("/admin/rate-limit", methods=['GET'])
 @require_admin_auth
 def view_rate_limiting():
     """
-    Admin route to view submission rate limiting data 
+    Admin route to view submission rate limiting data, one page at a time.
+    Filters: ?status=cooldown|limit, ?ip=; ?sort= one of IDENTITY_SORT_KEYS, ?order=asc|desc, ?page=
     """
     try:
         admin_name = session.get('admin_name', 'Unknown')
-        tracking_data = load_submission_tracking()
         current_time = time.time()
-        TWO_WEEKS = 14 * 24 * 60 * 60  # 14 days in seconds
+        filters = {
+            'status': request.args.get('status') if request.args.get('status') in ('cooldown', 'limit') else None,
+            'ip': (request.args.get('ip') or '').strip() or None,
+            'sort': request.args.get('sort') if request.args.get('sort') in IDENTITY_SORT_KEYS else 'last_submission',
+            'order': 'asc' if request.args.get('order') == 'asc' else 'desc',
+        }
+        page = max(1, request.args.get('page', 1, type=int))
         
-        # Debug logging
-        logger.info(f"Admin dashboard - tracking_data keys: {list(tracking_data.keys())}")
-        logger.info(f"Admin dashboard - total entries: {len(tracking_data)}")
+        rows, total = tracking_store.query_identities(
+            current_time,
+            status=filters['status'],
+            ip=filters['ip'],
+            sort=filters['sort'],
+            descending=filters['order'] == 'desc',
+            limit=RATE_LIMIT_PAGE_SIZE,
+            offset=(page - 1) * RATE_LIMIT_PAGE_SIZE,
+        )
+        format_time = lambda ts: datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
         
-        # Format data for display
+        # Format this page for display, the stored state answers the status questions
         formatted_data = []
-        for key, value in tracking_data.items():
-            # Get recent submissions (within 2 weeks)
-            submissions = value.get('submissions', [])
-            recent_submissions = [s for s in submissions if current_time - s['timestamp'] < TWO_WEEKS]
-            
-            # Calculate cooldown status
-            cooldown_status = "None"
-            if len(recent_submissions) >= 2:
-                recent_submissions.sort(key=lambda x: x['timestamp'], reverse=True)
-                submission_pairs = len(recent_submissions) // 2
-                if submission_pairs > 0:
-                    last_pair_start = recent_submissions[submission_pairs * 2 - 1]['timestamp']
-                    time_since_last_pair = current_time - last_pair_start
-                    cooldown_period = 24 * 60 * 60  # 24 hours
-                    
-                    if time_since_last_pair < cooldown_period:
-                        time_until_cooldown_ends = cooldown_period - time_since_last_pair
-                        hours_until_cooldown_ends = time_until_cooldown_ends / 3600
-                        cooldown_status = f"Active ({hours_until_cooldown_ends:.1f}h remaining)"
-                    else:
-                        cooldown_status = "Available"
-            
-            # Format submission history
-            submission_history = []
-            for submission in sorted(recent_submissions, key=lambda x: x['timestamp'], reverse=True):
-                submission_history.append({
-                    'timestamp': datetime.fromtimestamp(submission['timestamp']).strftime('%Y-%m-%d %H:%M:%S'),
-                    'ip': submission.get('ip', 'N/A'),
-                    'hours_ago': f"{(current_time - submission['timestamp']) / 3600:.1f}"
+        with tracking_store.snapshot() as txn:
+            for row in rows:
+                # within 2 weeks, most recent first
+                history = txn.recent_submissions(row['identity'], current_time - submission_limiter.window)
+                
+                cooldown_status = "None"
+                if (row['cooldown_until'] or 0) > current_time and (row['limit_until'] or 0) <= current_time:
+                    cooldown_status = f"Active ({(row['cooldown_until'] - current_time) / 3600:.1f}h remaining)"
+                elif (row['limit_until'] or 0) > current_time:
+                    cooldown_status = f"At limit ({(row['limit_until'] - current_time) / 86400:.1f}d remaining)"
+                elif len(history) >= submission_limiter.cooldown_every:
+                    cooldown_status = "Available"
+                
+                formatted_data.append({
+                    'identifier': row['identity'],
+                    'name': row['name'] or 'N/A',
+                    'email': row['email'] or 'N/A',
+                    'total_submissions': len(history),
+                    'max_submissions': submission_limiter.max_submissions,
+                    'cooldown_status': cooldown_status,
+                    'last_submission': format_time(row['last_submission']),
+                    'last_ip': row['last_ip'] or 'N/A',
+                    'hours_since_last': f"{(current_time - row['last_submission']) / 3600:.1f}",
+                    'submission_history': [
+                        {
+                            'timestamp': format_time(submission['timestamp']),
+                            'ip': submission.get('ip') or 'N/A',
+                            'hours_ago': f"{(current_time - submission['timestamp']) / 3600:.1f}",
+                        }
+                        for submission in history
+                    ],
                 })
-            
-            time_diff = current_time - value.get('last_submission', current_time)
-            hours_ago = time_diff / 3600
-            
-            formatted_data.append({
-                'identifier': key,
-                'name': value.get('name', 'N/A'),
-                'email': value.get('email', 'N/A'),
-                'total_submissions': len(recent_submissions),
-                'max_submissions': 4,
-                'cooldown_status': cooldown_status,
-                'last_submission': datetime.fromtimestamp(value.get('last_submission', current_time)).strftime('%Y-%m-%d %H:%M:%S'),
-                'last_ip': value.get('last_ip', 'N/A'),
-                'hours_since_last': f"{hours_ago:.1f}",
-                'submission_history': submission_history
-            })
-        
-        # Sort by last submission time (most recent first)
-        formatted_data.sort(key=lambda x: x['last_submission'], reverse=True)
-        
-        # Debug logging
-        logger.info(f"Admin dashboard - formatted_data entries: {len(formatted_data)}")
         
         # Create logout form for CSRF token
         logout_form = AdminLoginForm()
         
         return render_template('admin_tracking.html',
                              admin_name=admin_name,
-                             tracking_data=tracking_data,
                              formatted_data=formatted_data,
+                             stats=tracking_store.identity_stats(current_time),
+                             total=total,
+                             page=page,
+                             pages=max(1, -(-total // RATE_LIMIT_PAGE_SIZE)),
+                             filters=filters,
+                             query={k: v for k, v in filters.items() if v},
+                             sort_keys=IDENTITY_SORT_KEYS,
                              csrf_token=logout_form.csrf_token(),
                              active_page='tracking')
     except Exception as e:
         logger.error(f"Error retrieving submission data: {e}")
         return jsonify({"error": "Failed to retrieve submission data"}), 500
 
-@app.route("/admin/submissions", methods=['GET'])
+@site.route("/metrics", methods=['GET'])
+def metrics_endpoint():
+    """
+    Prometheus scrape target, merged across workers. Needs an admin session or
+    `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    token = current_app.config['METRICS_TOKEN']
+    authorization = request.headers.get('Authorization', '')
+    if not is_admin_authenticated() and not (token and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())):
+        return jsonify({"error": "Authentication required", "login_url": "/admin/login"}), 401
+    return metrics.render(), 200, {
+        'Content-Type': 'text/plain; version=0.0.4; charset=utf-8',
+        'Cache-Control': 'no-store',
+    }
+
+@site.route("/admin/outbox", methods=['GET'])
+@require_admin_auth
+def view_outbox():
+    """
+    Admin route to view the outbound email queue
+    """
+    try:
+        admin_name = session.get('admin_name', 'Unknown')
+        logout_form = AdminLoginForm()
+        
+        return render_template('admin_outbox.html',
+                             admin_name=admin_name,
+                             stats=mail_outbox.stats(),
+                             alert_stats=admin_alerts.stats(),
+                             pending=mail_outbox.messages('pending'),
+                             dead=mail_outbox.messages('dead'),
+                             sent=mail_outbox.messages('sent', limit=20),
+                             format_time=lambda ts: datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else '',
+                             csrf_token=logout_form.csrf_token(),
+                             active_page='outbox')
+    except Exception as e:
+        logger.error(f"Error retrieving outbox: {e}")
+        return jsonify({"error": "Failed to retrieve outbox"}), 500
+
+@site.route("/admin/outbox/<message_id>/retry", methods=['POST'])
+@require_admin_auth
+def retry_outbox_message(message_id):
+    """
+    Admin route to re-queue a dead-lettered email
+    """
+    if not message_id.isalnum():
+        return jsonify({"error": "Invalid message id"}), 400
+    if mail_outbox.retry(message_id):
+        logger.info(f"Admin {session.get('admin_name', 'Unknown')} re-queued email {message_id}")
+    return redirect('/admin/outbox')
+
+@site.route("/admin/profiles", methods=['GET'])
+@require_admin_auth
+def view_profiles():
+    """
+    Admin route to list saved request profiles, newest first
+    """
+    logout_form = AdminLoginForm()
+    return render_template('admin_profiles.html',
+                         admin_name=session.get('admin_name', 'Unknown'),
+                         profiles=request_profiler.profiles(),
+                         profile_header=PROFILE_HEADER,
+                         profile_query_arg=PROFILE_QUERY_ARG,
+                         sample_rate=current_app.config['PROFILE_SAMPLE_RATE'],
+                         keep=current_app.config['PROFILE_KEEP'],
+                         format_time=lambda ts: datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else '',
+                         csrf_token=logout_form.csrf_token(),
+                         active_page='profiles')
+
+@site.route("/admin/profiles/<profile_id>", methods=['GET'])
+@require_admin_auth
+def view_profile(profile_id):
+    """
+    Admin route to read one profile as a pstats report. ?sort=cumulative|tottime|calls
+    """
+    sort = request.args.get('sort', 'cumulative')
+    if sort not in ('cumulative', 'tottime', 'calls'):
+        sort = 'cumulative'
+    report = request_profiler.report(profile_id, sort=sort)
+    if report is None:
+        return jsonify({"error": "Profile not found"}), 404
+    logout_form = AdminLoginForm()
+    return render_template('admin_profile.html',
+                         admin_name=session.get('admin_name', 'Unknown'),
+                         profile_id=profile_id,
+                         report=report,
+                         sort=sort,
+                         csrf_token=logout_form.csrf_token(),
+                         active_page='profiles')
+
+@site.route("/admin/profiles/<profile_id>.prof", methods=['GET'])
+@require_admin_auth
+def download_profile(profile_id):
+    """
+    Admin route to download a raw pstats dump (python -m pstats, snakeviz)
+    """
+    path = request_profiler.profile_path(profile_id)
+    if path is None:
+        return jsonify({"error": "Profile not found"}), 404
+    return send_file(os.path.abspath(path), mimetype='application/octet-stream',
+                     as_attachment=True, download_name=f"{profile_id}.prof")
+
+SUBMISSIONS_PAGE_SIZE = 50
+
+def _parse_day(value, days=0):
+    """Timestamp of local midnight on a YYYY-MM-DD date (plus `days`), None if missing or invalid"""
+    try:
+        return (datetime.strptime(value, '%Y-%m-%d') + timedelta(days=days)).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def _buffered(chunks, size=16384):
+    """
+    Join a streamed template's many small pieces into writes of about `size`
+    bytes. Each piece is otherwise sent on its own, and small writes on a
+    keep-alive connection stall on delayed ACKs.
+    """
+    buffer, buffered = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer, buffered = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+@site.route("/admin/submissions", methods=['GET'])
 @require_admin_auth
 def view_all_submissions():
     """
-    Admin route to view all accepted form submissions with complete information
+    Admin route to view accepted form submissions, newest first, one page at a time.
+    Filters: ?role=, ?since= and ?until= (YYYY-MM-DD, inclusive); ?before= is the page cursor.
     """
     try:
         admin_name = session.get('admin_name', 'Unknown')
-        # Read responses.txt file
-        submissions = []
-        try:
-            with open("responses.txt", "r") as file:
-                for line_num, line in enumerate(file, 1):
-                    line = line.strip()
-                    if line and "\t" in line:
-                        parts = line.split("\t")
-                        if len(parts) >= 5:
-                            submission = {
-                                'line_number': line_num,
-                                'name': parts[0],
-                                'email': parts[1],
-                                'affiliation': parts[2],
-                                'role': parts[3],
-                                'message': parts[4] if len(parts) > 4 else '',
-                                'submission_time': 'Unknown'  # responses.txt doesn't store timestamps
-                            }
-                            submissions.append(submission)
-        except FileNotFoundError:
-            logger.warning("responses.txt file not found")
-        except Exception as e:
-            logger.error(f"Error reading responses.txt: {e}")
+        filters = {
+            'role': request.args.get('role') or None,
+            'since': request.args.get('since') or None,
+            'until': request.args.get('until') or None,
+            'limit': request.args.get('limit') or None,
+        }
+        limit = max(1, min(request.args.get('limit', SUBMISSIONS_PAGE_SIZE, type=int), 500))
+        page = submission_log.page(
+            before=request.args.get('before', type=int),
+            limit=limit,
+            role=filters['role'],
+            since=_parse_day(filters['since']),
+            until=_parse_day(filters['until'], days=1),
+        )
         
-        # Sort submissions by line number (most recent first)
-        submissions.sort(key=lambda x: x['line_number'], reverse=True)
+        # precomputed in the rollup store, see `flask rebuild-rollups`
+        submission_rollups.catch_up(submission_log)
+        today = datetime.now().date()
+        recent_days = submission_rollups.days(since=(today - timedelta(days=13)).isoformat())
+        daily_counts = [
+            (day, recent_days.get(day, 0))
+            for day in ((today - timedelta(days=offset)).isoformat() for offset in range(13, -1, -1))
+        ]
         
         # Create logout form for CSRF token
         logout_form = AdminLoginForm()
         
-        # Count submissions by role
-        role_counts = {}
-        for submission in submissions:
-            role = submission['role']
-            role_counts[role] = role_counts.get(role, 0) + 1
-        
-        return render_template('admin_submissions.html',
+        # rows are read from the log while the page streams out
+        return _buffered(stream_template('admin_submissions.html',
                              admin_name=admin_name,
-                             submissions=submissions,
-                             role_counts=role_counts,
+                             submissions=page,
+                             filters={k: v for k, v in filters.items() if v},
+                             total=len(submission_log),
+                             role_counts=submission_rollups.counts('role'),
+                             daily_counts=daily_counts,
+                             domain_counts=submission_rollups.counts('domain', limit=10),
+                             roles=[choice for choice in ROLE_CHOICES if choice[0]],
+                             log_path=submission_log.path,
+                             format_time=lambda ts: datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S') if ts else 'Unknown',
                              current_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                              csrf_token=logout_form.csrf_token(),
-                             active_page='submissions')
+                             active_page='submissions'))
     except Exception as e:
         logger.error(f"Error retrieving all submissions: {e}")
         return jsonify({"error": "Failed to retrieve submissions"}), 500
 
+SUBMISSION_EXPORT_FIELDS = ['seq', 'ts', 'submitted_at', 'ip', 'name', 'email', 'affiliation', 'role', 'message', 'source']
+TRACKING_EXPORT_FIELDS = ['identity', 'timestamp', 'submitted_at', 'ip', 'name', 'email']
+
+def _iso_time(ts):
+    return datetime.fromtimestamp(ts).isoformat(timespec='seconds') if ts else None
+
+@site.route("/admin/export/submissions.<any(csv, jsonl):fmt>", methods=['GET'])
+@require_admin_auth
+def export_submissions(fmt):
+    """Download the whole submission log, oldest first. ?gzip=1 for a .gz file"""
+    rows = (dict(record, submitted_at=_iso_time(record.get('ts'))) for record in submission_log.records())
+    logger.info("Submission export (%s) by admin '%s'", fmt, session.get('admin_name', 'Unknown'))
+    return export_response(rows, SUBMISSION_EXPORT_FIELDS, fmt, 'submissions', gzip=request.args.get('gzip') == '1')
+
+@site.route("/admin/export/tracking.<any(csv, jsonl):fmt>", methods=['GET'])
+@require_admin_auth
+def export_tracking(fmt):
+    """Download every tracked submission behind the rate limits, oldest first. ?gzip=1 for a .gz file"""
+    rows = (dict(row, submitted_at=_iso_time(row['timestamp'])) for row in tracking_store.iter_submissions())
+    logger.info("Tracking export (%s) by admin '%s'", fmt, session.get('admin_name', 'Unknown'))
+    return export_response(rows, TRACKING_EXPORT_FIELDS, fmt, 'submission_tracking', gzip=request.args.get('gzip') == '1')
+
+# ----------------------
+# CLI commands
+# ----------------------
+
+@site.cli.command("build-images")
+@click.option("--force", is_flag=True, help="Regenerate derivatives that already exist.")
+def build_images_command(force):
+    """Generate AVIF/WebP derivatives for speaker and team photos"""
+    generated, skipped = build_image_derivatives(current_app.static_folder, force=force)
+    click.echo(f"{generated} derivatives generated, {skipped} up to date")
+
+@site.cli.command("build-manifest")
+def build_manifest_command():
+    """Write content-hashed copies of static files and their manifest"""
+    written, total = build_asset_manifest(current_app.static_folder)
+    click.echo(f"{total} assets in manifest, {written} new hashed copies")
+
+@site.cli.command("build-critical")
+def build_critical_command():
+    """Extract the above-the-fold CSS of the landing page (run after build-manifest)"""
+    # the stylesheet URLs must come from the manifest as it is now on disk
+    asset_manifest.load(current_app.static_folder)
+    if not current_app.config['SECRET_KEY']:
+        # only the markup matters here, not the CSRF token rendered into it
+        current_app.config['SECRET_KEY'] = os.urandom(16).hex()
+    pages = {'index': (lambda: render_template('index.html', **index_context()), '/')}
+    for name, (critical, total) in build_critical_css(current_app, pages).items():
+        click.echo(f"{name}: {critical} of {total} bytes of CSS inlined")
+    click.echo("Restart the app to serve the new critical CSS")
+
+@site.cli.command("precompress")
+def precompress_command():
+    """Write .br and .gz siblings for text assets under static/"""
+    written = precompress_static(current_app.static_folder)
+    click.echo(f"{written} compressed files written")
+
+@site.cli.command("migrate-tracking")
+@click.argument("json_path", default=SUBMISSION_TRACK_FILE)
+def migrate_tracking_command(json_path):
+    """Import a submission_tracking.json file into the SQLite tracking store"""
+    if not isinstance(tracking_store, SQLiteTrackingStore):
+        raise click.UsageError("TRACKING_BACKEND is not sqlite")
+    imported = migrate_json_tracking(json_path, tracking_store)
+    click.echo(f"{imported} submissions imported from {json_path}")
+
+@site.cli.command("import-responses")
+@click.argument("txt_path", default=LEGACY_RESPONSES_FILE)
+def import_responses_command(txt_path):
+    """Import a legacy tab-separated responses.txt into the submission log"""
+    imported = import_legacy_responses(txt_path, submission_log)
+    click.echo(f"{imported} submissions imported from {txt_path}")
+
+@site.cli.command("rebuild-rollups")
+def rebuild_rollups_command():
+    """Recount the submission analytics by replaying the whole submission log"""
+    replayed = submission_rollups.rebuild(submission_log)
+    click.echo(f"{replayed} submissions replayed into {current_app.config['ANALYTICS_DB_PATH']}")
+
+@site.cli.command("outbox-drain")
+def outbox_drain_command():
+    """Send every due email in the outbox once (for cron instead of the worker thread)"""
+    mail_outbox.recover_expired()
+    attempted = mail_outbox.drain_once()
+    click.echo(f"{attempted} emails attempted, outbox: {mail_outbox.stats()}")
+
+@site.cli.command("build-static")
+@click.pass_context
+def build_static_command(ctx):
+    """Run every static build step in order"""
+    ctx.invoke(build_images_command)
+    ctx.invoke(build_manifest_command)
+    ctx.invoke(build_critical_command)
+    ctx.invoke(precompress_command)
+
+# ----------------------
+# App factory
+# ----------------------
+
+def _configure(app):
+    """Read the configuration from the environment (and .env)"""
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
+    app.config['RECAPTCHA_SECRET_KEY'] = os.getenv('RECAPTCHA_SECRET_KEY')
+    app.config['RECAPTCHA_SITE_KEY'] = os.getenv('RECAPTCHA_SITE_KEY')
+    app.config['RECAPTCHA_VERIFY_URL'] = os.getenv('RECAPTCHA_VERIFY_URL', RECAPTCHA_VERIFY_URL)
+    app.config['ADMIN_PASSWORD'] = os.getenv('ADMIN_PASSWORD')
+    app.config['RENDER_CACHE_ENABLED'] = os.getenv('RENDER_CACHE_ENABLED', '1') != '0'
+    app.config['COMPRESSION_MIN_SIZE'] = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+    app.config['ASYNC_FORM_HANDLER'] = os.getenv('ASYNC_FORM_HANDLER', '1') != '0'
+    # compile every template and render the landing page before the first request
+    app.config['TEMPLATE_WARMUP'] = os.getenv('TEMPLATE_WARMUP', '1') != '0'
+    # speakers.json and team.json, see lineup.py
+    app.config['LINEUP_DIR'] = os.getenv('LINEUP_DIR', os.path.join(app.root_path, 'data'))
+    app.config['LINEUP_CHECK_INTERVAL'] = float(os.getenv('LINEUP_CHECK_INTERVAL', '2'))
+    # how long clients may use /api/speakers and /api/team before revalidating
+    app.config['API_CACHE_MAX_AGE'] = int(os.getenv('API_CACHE_MAX_AGE', '60'))
+    # relative to the static folder, see `flask build-static`
+    app.config['SCHEDULE_PDF'] = os.getenv('SCHEDULE_PDF', 'EnvisionSchedule.pdf')
+    app.config['SCHEDULE_CACHE_MAX_AGE'] = int(os.getenv('SCHEDULE_CACHE_MAX_AGE', '300'))
+    # minify the cached landing page and its fragments
+    app.config['MINIFY_HTML'] = os.getenv('MINIFY_HTML', '1') != '0'
+    # inline the output of `flask build-critical` and load the full stylesheet asynchronously
+    app.config['CRITICAL_CSS'] = os.getenv('CRITICAL_CSS', '1') != '0'
+
+    app.config['RESEND_API_KEY'] = os.getenv('RESEND_API_KEY')
+    app.config['MAIL_TO'] = os.getenv('MAIL_TO')
+    app.config['MAIL_FROM'] = os.getenv('MAIL_FROM')
+    app.config['MAIL_SPOOL_DIR'] = os.getenv('MAIL_SPOOL_DIR', 'mail_spool')
+    # failed admin logins are batched into one digest email per window
+    app.config['ADMIN_ALERT_DIGEST_WINDOW'] = int(os.getenv('ADMIN_ALERT_DIGEST_WINDOW', '300'))
+
+    app.config['TRACKING_BACKEND'] = os.getenv('TRACKING_BACKEND', 'sqlite')
+    app.config['TRACKING_DB_PATH'] = os.getenv('TRACKING_DB_PATH', 'submission_tracking.db')
+    app.config['SUBMISSION_LOG_PATH'] = os.getenv('SUBMISSION_LOG_PATH', 'submissions.jsonl')
+    app.config['ANALYTICS_DB_PATH'] = os.getenv('ANALYTICS_DB_PATH', 'analytics.db')
+
+    # Limits are shared by every worker on the host through SQLite by default.
+    # Any limits storage URI works here, e.g. redis://host:6379 (needs the redis package).
+    app.config['RATELIMIT_STORAGE_URI'] = os.getenv('RATELIMIT_STORAGE_URI', 'sqlite:///rate_limits.db')
+    # fixed-window is one counter per key, moving-window is exact but stores one row per hit
+    app.config['RATELIMIT_STRATEGY'] = os.getenv('RATELIMIT_STRATEGY', 'fixed-window')
+
+    app.config['METRICS_DIR'] = os.getenv('METRICS_DIR', 'metrics_data')
+    # lets a scraper read /metrics without an admin session: Authorization: Bearer <token>
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+
+    app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR', 'profiles')
+    # fraction of all requests to profile, e.g. 0.01; admins can always ask with X-Profile: 1 or ?_profile=1
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+    app.config['PROFILE_KEEP'] = int(os.getenv('PROFILE_KEEP', '50'))
+
+def _check_config(app):
+    if not app.config['RESEND_API_KEY']:
+        logger.error("RESEND_API_KEY is not set")
+    if not app.config['MAIL_FROM']:
+        logger.error("MAIL_FROM is not set (e.g. 'Your App <noreply@verified-domain.com>')")
+    if not app.config['MAIL_TO']:
+        logger.error("MAIL_TO is not set")
+    if not os.path.exists(os.path.join(app.static_folder, app.config['SCHEDULE_PDF'])):
+        logger.warning("Schedule PDF not found: static/%s, /schedule will return 404", app.config['SCHEDULE_PDF'])
+
+    # Log admin password status
+    if app.config['ADMIN_PASSWORD'] == 'admin123':
+        logger.warning("Using default admin password 'admin123'. Set ADMIN_PASSWORD environment variable for production.")
+    else:
+        logger.info("Admin password configured from environment variable.")
+
+def warm_up(app):
+    """Compile every template and render the cached landing page, so the first visitor waits for neither"""
+    for name in app.jinja_env.list_templates(extensions=['html']):
+        app.jinja_env.get_template(name)
+    # the page embeds a CSRF token, which needs the secret key; build steps
+    # (`flask build-static` and friends) must run without runtime secrets
+    if not app.config['SECRET_KEY']:
+        logger.warning("SECRET_KEY is not set, skipping the landing page warm-up render")
+        return
+    with app.test_request_context('/'):
+        render_index()
+
+def create_app(config=None):
+    """
+    Build the site. Configuration comes from the environment (and .env);
+    `config` overrides it. The extensions above are module-level, so build
+    one app per process.
+    """
+    from pathlib import Path
+    load_dotenv(dotenv_path=Path(__file__).with_name(".env"))
+
+    app = Flask(__name__)
+    _configure(app)
+    if config:
+        app.config.update(config)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(levelname)s:%(name)s:%(message)s"
+    )
+    # httpx logs every request it makes at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    _check_config(app)
+
+    csrf.init_app(app)
+    page_cache.enabled = app.config['RENDER_CACHE_ENABLED']
+    page_cache.transform = minify_html if app.config['MINIFY_HTML'] else None
+    responsive_images.init_app(app)
+    lineup.init_app(app)
+    asset_manifest.init_app(app)
+    critical_css.init_app(app)
+    compression.init_app(app)
+    background_loop.init_app(app)
+    metrics.init_app(app)
+    request_profiler.init_app(app)
+    _open_stores(app)
+    limiter.init_app(app)
+    mail_outbox.init_app(app)
+    admin_alerts.init_app(app)
+    recaptcha_client.init_app(app)
+    app.register_blueprint(site)
+
+    if app.config['TEMPLATE_WARMUP']:
+        warm_up(app)
+    return app
+
+def __getattr__(name):
+    # `flask_app:app` (gunicorn, `flask --app flask_app`, scripts) builds the app on first use
+    if name == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # RUN APP
 if __name__ == '__main__':
-    app.run( debug=True, host="127.0.0.1", port=5001)
\ No newline at end of file
+    create_app().run( debug=True, host="127.0.0.1", port=5001)
\ No newline at end of file
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import logging
+import os
+import re
+
+from flask import url_for
+from markupsafe import Markup, escape
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Responsive image derivatives
+# ----------------------
+
+# source folders (relative to the static folder) that get resized derivatives
+IMAGE_SOURCE_DIRS = ("assets/speakers", "assets/team")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+IMAGE_WIDTHS = (160, 320, 480, 640, 960, 1440)
+# preferred format first, it is listed first in <picture>
+IMAGE_FORMATS = (("avif", "AVIF", {"quality": 55}), ("webp", "WEBP", {"quality": 78, "method": 6}))
+
+DERIVED_DIR = "derived"
+IMAGE_MANIFEST = "derived/images.json"
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _target_widths(source_width):
+    """Widths to generate for a source image, never upscaling"""
+    widths = [w for w in IMAGE_WIDTHS if w < source_width]
+    if len(widths) < len(IMAGE_WIDTHS):
+        widths.append(source_width)
+    return widths
+
+
+def build_image_derivatives(static_folder, force=False):
+    """
+    Generate AVIF/WebP derivatives of every speaker and team photo and write the
+    manifest used by `responsive_img`. Derivatives are named after the hash of
+    their source file, so unchanged photos are skipped on later builds.
+
+    Returns a (generated, skipped) tuple of derivative counts.
+    """
+    from PIL import Image, ImageOps, features
+
+    formats = [f for f in IMAGE_FORMATS if features.check(f[0])]
+    missing = {f[0] for f in IMAGE_FORMATS} - {f[0] for f in formats}
+    if missing:
+        logger.warning("Pillow has no support for %s, skipping those formats", ", ".join(sorted(missing)))
+
+    os.makedirs(os.path.join(static_folder, DERIVED_DIR), exist_ok=True)
+    manifest = {}
+    generated = skipped = 0
+
+    for source_dir in IMAGE_SOURCE_DIRS:
+        source_root = os.path.join(static_folder, source_dir)
+        if not os.path.isdir(source_root):
+            continue
+        for filename in sorted(os.listdir(source_root)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            source_path = os.path.join(source_root, filename)
+            logical_name = f"{source_dir}/{filename}"
+            source_hash = _file_hash(source_path)[:12]
+            stem = re.sub(r"[^A-Za-z0-9_.-]+", "-", os.path.splitext(filename)[0])
+
+            with Image.open(source_path) as opened:
+                image = ImageOps.exif_transpose(opened)
+                image.load()
+            width, height = image.size
+
+            variants = {}
+            for ext, pil_format, options in formats:
+                variants[ext] = []
+                for target_width in _target_widths(width):
+                    relative = f"{DERIVED_DIR}/{stem}-{source_hash}-{target_width}.{ext}"
+                    output_path = os.path.join(static_folder, relative)
+                    variants[ext].append([target_width, relative])
+                    if os.path.exists(output_path) and not force:
+                        skipped += 1
+                        continue
+
+                    target_height = max(1, round(height * target_width / width))
+                    resized = image if target_width == width else image.resize((target_width, target_height), Image.LANCZOS)
+                    if resized.mode not in ("RGB", "RGBA"):
+                        resized = resized.convert("RGBA" if "A" in resized.getbands() else "RGB")
+
+                    tmp_path = output_path + ".tmp"
+                    resized.save(tmp_path, pil_format, **options)
+                    os.replace(tmp_path, output_path)
+                    generated += 1
+
+            manifest[logical_name] = {
+                "hash": source_hash,
+                "width": width,
+                "height": height,
+                "variants": variants,
+            }
+
+    manifest_path = os.path.join(static_folder, IMAGE_MANIFEST)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    logger.info("Image derivatives: %d generated, %d up to date, %d sources", generated, skipped, len(manifest))
+    return generated, skipped
+
+
+class ResponsiveImages:
+    """
+    Renders <picture> elements with AVIF/WebP `srcset`s for photos listed in the
+    derivative manifest. Photos without derivatives fall back to a plain <img>.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        manifest_path = os.path.join(app.static_folder, IMAGE_MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            logger.warning("Image manifest not found, run `flask build-images` to generate it")
+        except Exception as e:
+            logger.error(f"Error loading image manifest: {e}")
+        app.jinja_env.globals["responsive_img"] = self.render
+
+    def render(self, filename, class_="", sizes="100vw", alt="", loading="lazy", fetchpriority=None, style=""):
+        """
+        Return the markup for one photo; `filename` is relative to the static
+        folder. Pass loading="eager" (and fetchpriority="high") for photos
+        that are on screen when the page or section first shows.
+        """
+        filename = filename.lstrip("/")
+        attrs = f'class="{escape(class_)}" alt="{escape(alt)}"'
+        if style:
+            attrs += f' style="{escape(style)}"'
+        attrs += f' loading="{escape(loading)}" decoding="async"'
+        if fetchpriority:
+            attrs += f' fetchpriority="{escape(fetchpriority)}"'
+
+        entry = self.manifest.get(filename)
+        if not entry:
+            return Markup(f'<img {attrs} src="{url_for("static", filename=filename)}">')
+
+        sources = []
+        for ext, variants in entry["variants"].items():
+            srcset = ", ".join(f'{url_for("static", filename=path)} {width}w' for width, path in variants)
+            sources.append(f'<source type="image/{ext}" srcset="{srcset}" sizes="{escape(sizes)}">')
+
+        # display: contents keeps the <img> as the layout box the stylesheet targets
+        return Markup(
+            '<picture style="display: contents;">'
+            + "".join(sources)
+            + f'<img {attrs} src="{url_for("static", filename=filename)}">'
+            + "</picture>"
+        )
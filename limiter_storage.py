@@ -0,0 +1,167 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from limits.storage import MovingWindowSupport, Storage
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Shared rate limit storage
+# ----------------------
+
+LIMITS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS counters_expires_at ON counters (expires_at);
+
+CREATE TABLE IF NOT EXISTS events (
+    key TEXT NOT NULL,
+    atime REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_key_atime ON events (key, atime);
+CREATE INDEX IF NOT EXISTS events_expires_at ON events (expires_at);
+"""
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """
+    `limits` storage in a local SQLite file, so every gunicorn worker on the
+    host counts against the same limits without running Redis or memcached.
+
+        RATELIMIT_STORAGE_URI = "sqlite:///rate_limits.db"    # relative to the working directory
+        RATELIMIT_STORAGE_URI = "sqlite:////var/lib/envision/rate_limits.db"
+
+    Supports the fixed-window and moving-window strategies. Each hit is one
+    short write transaction (BEGIN IMMEDIATE), which is what makes a
+    check-and-increment atomic across processes. Expired rows are swept at
+    most once per CLEANUP_INTERVAL seconds per process.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    CLEANUP_INTERVAL = 60
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        prefix = "sqlite:///"
+        if not uri.startswith(prefix) or len(uri) == len(prefix):
+            raise ValueError(f"Expected sqlite:///<path>, got {uri!r}")
+        self.path = uri[len(prefix):]
+        self.timeout = float(options.get("timeout", 10))
+        self._local = threading.local()
+        self._last_cleanup = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._connection().executescript(LIMITS_SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        # connections must not cross a fork, the limiter may be set up before gunicorn forks
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _write(self, fn):
+        """Run fn(conn, now) in a write transaction and return its result"""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            result = fn(conn, now)
+            if now - self._last_cleanup > self.CLEANUP_INTERVAL:
+                conn.execute("DELETE FROM counters WHERE expires_at <= ?", (now,))
+                conn.execute("DELETE FROM events WHERE expires_at <= ?", (now,))
+                self._last_cleanup = now
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---- fixed window ----
+
+    def incr(self, key, expiry, amount=1):
+        def incr(conn, now):
+            conn.execute(
+                "INSERT INTO counters (key, count, expires_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET"
+                " count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END,"
+                " expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END",
+                (key, amount, now + expiry, now, now),
+            )
+            return conn.execute("SELECT count FROM counters WHERE key = ?", (key,)).fetchone()[0]
+        return self._write(incr)
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT count FROM counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT expires_at FROM counters WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else now
+
+    # ---- moving window ----
+
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+
+        def acquire(conn, now):
+            in_window = conn.execute(
+                "SELECT COUNT(*) FROM events WHERE key = ? AND atime >= ?", (key, now - expiry)
+            ).fetchone()[0]
+            if in_window + amount > limit:
+                return False
+            conn.execute("DELETE FROM events WHERE key = ? AND atime < ?", (key, now - expiry))
+            conn.executemany(
+                "INSERT INTO events (key, atime, expires_at) VALUES (?, ?, ?)",
+                [(key, now, now + expiry)] * amount,
+            )
+            return True
+        return self._write(acquire)
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, in_window = self._connection().execute(
+            "SELECT MIN(atime), COUNT(*) FROM events WHERE key = ? AND atime >= ?", (key, now - expiry)
+        ).fetchone()
+        return (oldest if in_window else now), in_window
+
+    # ---- housekeeping ----
+
+    def check(self):
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        def reset(conn, now):
+            cleared = conn.execute("DELETE FROM counters").rowcount
+            return cleared + conn.execute("DELETE FROM events").rowcount
+        return self._write(reset)
+
+    def clear(self, key):
+        def clear(conn, now):
+            conn.execute("DELETE FROM counters WHERE key = ?", (key,))
+            conn.execute("DELETE FROM events WHERE key = ?", (key,))
+        self._write(clear)
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Speaker and team data
+# ----------------------
+
+SPEAKERS_FILE = "speakers.json"
+TEAM_FILE = "team.json"
+
+# team members per slide, index.html shows them in two rows of three
+TEAM_SLIDE_SIZE = 6
+
+Speaker = namedtuple("Speaker", "name organization short_org bio img link")
+TeamMember = namedtuple("TeamMember", "name img role")
+
+# everything index.html needs, computed once per version of the data files
+LineupView = namedtuple("LineupView", "version active_speakers past_speakers team_photo team_slides team_slide_count")
+
+
+def _static_path(img, static_folder):
+    """Photo path relative to the static folder, as responsive_img() and url_for('static') expect"""
+    img = img.lstrip("/")
+    if static_folder and not os.path.exists(os.path.join(static_folder, img)):
+        logger.warning("Lineup photo not found: %s", img)
+    return img
+
+
+def build_view(speakers, team, static_folder=None, version=None):
+    """
+    Turn the raw speaker and team lists into a LineupView. Speakers are listed
+    oldest first in the data file and shown newest first, split into this
+    year's (active) and past speakers. The first team entry is the group photo.
+    """
+    active, past = [], []
+    for i, entry in enumerate(reversed(speakers)):
+        try:
+            speaker = Speaker(
+                name=entry["name"],
+                organization=entry.get("organization", ""),
+                short_org=entry.get("short_org", ""),
+                bio=entry.get("bio", ""),
+                img=_static_path(entry["img"], static_folder),
+                link=entry.get("link", ""),
+            )
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"speaker #{len(speakers) - i}: missing or invalid {e}") from None
+        (active if entry.get("active") else past).append(speaker)
+
+    members = []
+    for i, entry in enumerate(team):
+        try:
+            members.append(TeamMember(entry["name"], _static_path(entry["img"], static_folder), entry.get("role", "")))
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"team member #{i + 1}: missing or invalid {e}") from None
+    if not members:
+        raise ValueError("team list is empty, the first entry must be the group photo")
+
+    team_photo, members = members[0], members[1:]
+    team_slides = tuple(tuple(members[start:start + TEAM_SLIDE_SIZE]) for start in range(0, len(members), TEAM_SLIDE_SIZE))
+    return LineupView(
+        version=version,
+        active_speakers=tuple(active),
+        past_speakers=tuple(past),
+        team_photo=team_photo,
+        team_slides=team_slides,
+        # the group photo is the first slide
+        team_slide_count=len(team_slides) + 1,
+    )
+
+
+class Lineup:
+    """
+    Speakers and team from LINEUP_DIR/speakers.json and team.json, as a
+    precomputed LineupView.
+
+    The files are checked at most every LINEUP_CHECK_INTERVAL seconds and
+    reloaded when their mtime or size changes, without a restart. The new view
+    is built completely before it replaces the old one, so requests never see
+    a half-loaded lineup; if the files don't parse (e.g. mid-edit), the old
+    view stays in place and the error is logged. `on_reload` callbacks run
+    after every swap, e.g. to drop cached pages.
+
+        view = lineup.current()
+    """
+
+    def __init__(self, app=None):
+        self._view = None
+        self._stamp = None
+        self._next_check = 0
+        self._lock = threading.Lock()
+        self._callbacks = []
+        # values built from one version of the view, see derived()
+        self._derived = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("LINEUP_DIR", os.path.join(app.root_path, "data"))
+        app.config.setdefault("LINEUP_CHECK_INTERVAL", 2)
+        self.directory = app.config["LINEUP_DIR"]
+        self.check_interval = app.config["LINEUP_CHECK_INTERVAL"]
+        self.static_folder = app.static_folder
+        app.extensions["lineup"] = self
+        # unlike a reload, a broken file at startup is an error
+        self._stamp = self._file_stamp()
+        self._view = self._load()
+        self._next_check = time.monotonic() + self.check_interval
+
+    def on_reload(self, callback):
+        self._callbacks.append(callback)
+        return callback
+
+    def _paths(self):
+        return [os.path.join(self.directory, name) for name in (SPEAKERS_FILE, TEAM_FILE)]
+
+    def _file_stamp(self):
+        stamp = []
+        for path in self._paths():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                stamp.append(None)
+            else:
+                stamp.append((st.st_mtime_ns, st.st_size))
+        return tuple(stamp)
+
+    def _load(self):
+        raw = []
+        for path in self._paths():
+            with open(path, "rb") as f:
+                raw.append(f.read())
+        speakers, team = (json.loads(data) for data in raw)
+        # content hash, so every worker agrees on the version and a touch alone changes nothing
+        version = hashlib.sha1(b"\0".join(raw)).hexdigest()[:12]
+        view = build_view(speakers, team, self.static_folder, version)
+        logger.info("Lineup loaded: version %s, %d current speakers, %d past, %d team members",
+                    version, len(view.active_speakers), len(view.past_speakers),
+                    sum(len(slide) for slide in view.team_slides))
+        return view
+
+    def current(self):
+        """The current view, reloading first if the files changed since the last check"""
+        now = time.monotonic()
+        if now >= self._next_check and self._lock.acquire(blocking=False):
+            # one thread checks, the others keep serving the current view
+            try:
+                self._next_check = now + self.check_interval
+                self._reload_if_changed()
+            finally:
+                self._lock.release()
+        return self._view
+
+    def derived(self, view, key, build):
+        """build(view), computed once per lineup version, e.g. a serialized API response"""
+        derived = self._derived
+        value = derived.get((view.version, key))
+        if value is None:
+            value = derived[(view.version, key)] = build(view)
+        return value
+
+    def _reload_if_changed(self):
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        # remembered even on failure, so a broken file is reported once, not on every check
+        self._stamp = stamp
+        try:
+            view = self._load()
+        except (OSError, ValueError, TypeError) as e:
+            logger.error("Lineup reload failed, still serving version %s: %s", self._view.version, e)
+            return
+        if view.version == self._view.version:
+            return
+        self._derived = {}
+        self._view = view
+        for callback in self._callbacks:
+            try:
+                callback(view)
+            except Exception:
+                logger.exception("Lineup reload callback failed")
@@ -0,0 +1,337 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import before_render_template, g, request, template_rendered
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Prometheus-style metrics
+# ----------------------
+
+# seconds, from a cache hit to a slow upstream call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+METRICS = {
+    "envision_http_request_duration_seconds": ("histogram", "Time to handle a request, by route, method and status"),
+    "envision_dependency_duration_seconds": ("histogram", "Outbound calls (resend, recaptcha), by outcome"),
+    "envision_io_duration_seconds": ("histogram", "Submission log and tracking store reads and writes"),
+    "envision_template_render_seconds": ("histogram", "Template render time, by template"),
+    "envision_rejections_total": ("counter", "Form and login requests turned away, by reason"),
+}
+
+
+# totals of workers that have exited, see Metrics.collect()
+RETIRED_SNAPSHOT = "retired.json"
+
+
+def _snapshot_pid(filename):
+    """pid from a `<pid>-<token>.json` snapshot name, or None"""
+    try:
+        return int(filename.split("-", 1)[0].split(".", 1)[0])
+    except ValueError:
+        return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for key, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """
+    In-process counters and histograms, shared across gunicorn workers
+    through a directory of per-process snapshots.
+
+    Each process keeps its own numbers in memory and writes them to
+    METRICS_DIR/<pid>-<token>.json at most every METRICS_FLUSH_INTERVAL seconds
+    (and at exit); the random token keeps a restarted worker that reuses a pid
+    from overwriting the old worker's file. A scrape of /metrics merges every
+    file in the directory, after folding the snapshots of processes that no
+    longer exist into retired.json, so totals never go backwards when workers
+    restart. Clear the directory when the app is redeployed to start from zero.
+
+        metrics.inc("envision_rejections_total", reason="duplicate")
+        with metrics.timer("envision_dependency_duration_seconds", dependency="resend"):
+            ...
+    """
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.buckets = DEFAULT_BUCKETS
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._dirty = False
+        self._flusher = None
+        self._pid = os.getpid()
+        self._token = uuid.uuid4().hex[:12]
+        self._local = threading.local()
+        atexit.register(self.flush)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_DIR", "metrics_data")
+        app.config.setdefault("METRICS_FLUSH_INTERVAL", 5)
+        self.app = app
+        self.directory = app.config["METRICS_DIR"]
+        self.flush_interval = app.config["METRICS_FLUSH_INTERVAL"]
+        os.makedirs(self.directory, exist_ok=True)
+        app.extensions["metrics"] = self
+
+        app.before_request(self._start_request)
+        app.after_request(self._record_status)
+        app.teardown_request(self._finish_request)
+        before_render_template.connect(self._start_render, app)
+        template_rendered.connect(self._finish_render, app)
+
+    # ---- recording ----
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            self._counters[key] = self._counters.get(key, 0) + amount
+            self._dirty = True
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._check_fork()
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # per-bucket (not cumulative) counts, then sum and count
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            histogram[i] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+            self._dirty = True
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the duration of the block; `outcome` is "ok", or "error" when it raises"""
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, outcome=outcome, **labels)
+
+    # ---- request / template hooks ----
+
+    def _start_request(self):
+        g._metrics_start = time.perf_counter()
+        self._ensure_flusher()
+
+    def _record_status(self, response):
+        g._metrics_status = response.status_code
+        return response
+
+    def _finish_request(self, exc):
+        # teardown runs after the response has been sent, streamed bodies included
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return
+        rule = request.url_rule
+        self.observe(
+            "envision_http_request_duration_seconds",
+            time.perf_counter() - start,
+            route=rule.rule if rule is not None else "unmatched",
+            method=request.method,
+            status=g.pop("_metrics_status", 500),
+        )
+
+    def _start_render(self, sender, template, context, **extra):
+        stack = getattr(self._local, "renders", None)
+        if stack is None:
+            stack = self._local.renders = []
+        stack.append(time.perf_counter())
+
+    def _finish_render(self, sender, template, context, **extra):
+        stack = getattr(self._local, "renders", None)
+        if stack:
+            self.observe("envision_template_render_seconds", time.perf_counter() - stack.pop(),
+                         template=template.name or "string")
+
+    # ---- cross-process snapshots ----
+
+    def _snapshot_path(self):
+        return os.path.join(self.directory, f"{os.getpid()}-{self._token}.json")
+
+    def flush(self):
+        """Write this process's numbers to its snapshot file"""
+        with self._lock:
+            self._check_fork()
+            if not self._dirty:
+                return
+            snapshot = {
+                "counters": [[name, labels, value] for (name, labels), value in self._counters.items()],
+                "histograms": [[name, labels, values] for (name, labels), values in self._histograms.items()],
+                "buckets": list(self.buckets),
+            }
+            self._dirty = False
+        path = self._snapshot_path()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    def _check_fork(self):
+        # called with the lock held; what was recorded before a fork belongs to the parent
+        if self._pid != os.getpid():
+            self._counters, self._histograms = {}, {}
+            self._dirty = False
+            self._pid = os.getpid()
+            self._token = uuid.uuid4().hex[:12]
+
+    def _ensure_flusher(self):
+        """Start this process's flush thread if it is not running (e.g. after a fork)"""
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            self._check_fork()
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._run_flusher, name="metrics-flush", daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Writing the metrics snapshot failed")
+
+    def _read_snapshot(self, filename):
+        try:
+            with open(os.path.join(self.directory, filename)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return snapshot if snapshot.get("buckets") == list(self.buckets) else None
+
+    @staticmethod
+    def _merge(snapshot, counters, histograms):
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, values in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.get(key)
+            histograms[key] = values if merged is None else [a + b for a, b in zip(merged, values)]
+
+    def _retire_dead_snapshots(self):
+        """
+        Fold the snapshots of exited processes into retired.json and delete them.
+        retired.json lists what it already holds, so a crash between writing it
+        and deleting a snapshot never counts that snapshot twice.
+        """
+        with open(os.path.join(self.directory, ".retire.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                retired = self._read_snapshot(RETIRED_SNAPSHOT) or {"counters": [], "histograms": [], "folded": []}
+                files = set(os.listdir(self.directory))
+                folded = [name for name in retired.get("folded", []) if name in files]
+                dead = [
+                    name for name in files
+                    if name.endswith(".json") and name != RETIRED_SNAPSHOT and name not in folded
+                    and _snapshot_pid(name) is not None and not _pid_alive(_snapshot_pid(name))
+                ]
+                if dead:
+                    counters, histograms = {}, {}
+                    self._merge(retired, counters, histograms)
+                    for name in dead:
+                        snapshot = self._read_snapshot(name)
+                        if snapshot is not None:
+                            self._merge(snapshot, counters, histograms)
+                    retired = {
+                        "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+                        "histograms": [[name, labels, values] for (name, labels), values in histograms.items()],
+                        "buckets": list(self.buckets),
+                        "folded": folded + dead,
+                    }
+                    path = os.path.join(self.directory, RETIRED_SNAPSHOT)
+                    with open(path + ".tmp", "w") as f:
+                        json.dump(retired, f)
+                    os.replace(path + ".tmp", path)
+                for name in retired.get("folded", []):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except FileNotFoundError:
+                        pass
+                return set(retired.get("folded", []))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def collect(self):
+        """Merged (counters, histograms) over every process's snapshot and the retired totals"""
+        self.flush()
+        folded = self._retire_dead_snapshots()
+        counters, histograms = {}, {}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json") or filename in folded:
+                continue
+            snapshot = self._read_snapshot(filename)
+            if snapshot is not None:
+                self._merge(snapshot, counters, histograms)
+        return counters, histograms
+
+    def render(self):
+        """Prometheus text exposition format"""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for (metric, labels), values in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), values):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {values[-1]}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,90 @@
+import re
+
+# ----------------------
+# CSS / JS / HTML minification
+# ----------------------
+#
+# Deliberately conservative: only changes that cannot alter how the page renders
+# or behaves (comments, indentation, collapsible whitespace), so the output never
+# needs to be checked by hand.
+
+CSS_TOKEN_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|(\s+)""", re.S)
+# whitespace around these never matters; `+`, `~` and `:` are left alone (calc(), descendant :hover)
+CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css):
+    """Strip comments and collapse whitespace, leaving strings untouched"""
+    def squeeze(text):
+        return CSS_PUNCTUATION_RE.sub(r"\1", re.sub(r" {2,}", " ", text))
+
+    parts, pending = [], []
+    pos = 0
+    for match in CSS_TOKEN_RE.finditer(css):
+        pending.append(css[pos:match.start()])
+        string, comment, space = match.groups()
+        if string:
+            parts.append(squeeze("".join(pending)))
+            parts.append(string)
+            pending = []
+        else:
+            pending.append(" ")
+        pos = match.end()
+    pending.append(css[pos:])
+    parts.append(squeeze("".join(pending)))
+    return "".join(parts).replace(";}", "}").strip()
+
+
+# a comment that is alone on its line(s); it must not run past its own */
+JS_BLOCK_COMMENT_RE = re.compile(r"^[ \t]*/\*(?:(?!\*/).)*\*/[ \t]*$", re.S | re.M)
+
+
+def minify_js(js):
+    """
+    Drop indentation, blank lines and whole-line comments. Line breaks are kept,
+    so automatic semicolon insertion behaves exactly as before. Scripts with
+    template literals are returned unchanged, since those may span lines.
+    """
+    if "`" in js:
+        return js
+    js = JS_BLOCK_COMMENT_RE.sub("", js)
+    lines = []
+    for line in js.splitlines():
+        line = line.strip()
+        if line and not line.startswith("//"):
+            lines.append(line)
+    return "\n".join(lines)
+
+
+RAW_TEXT_RE = re.compile(r"(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)", re.S | re.I)
+# keeps conditional comments and the like
+HTML_COMMENT_RE = re.compile(r"<!--(?!\[if|<!|>)(?!\s*\[).*?-->", re.S)
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _collapse(html):
+    # a run of whitespace renders as a single space, so keep one: a newline if there was one
+    html = HTML_COMMENT_RE.sub("", html)
+    return WHITESPACE_RE.sub(lambda m: "\n" if "\n" in m.group(0) else " ", html)
+
+
+def minify_html(html):
+    """
+    Remove comments and collapse whitespace outside <pre> and <textarea>, and
+    minify inline <script> and <style> contents. Whitespace between tags is
+    collapsed, never removed, so inline layout is unchanged.
+    """
+    parts = []
+    pos = 0
+    for match in RAW_TEXT_RE.finditer(html):
+        parts.append(_collapse(html[pos:match.start()]))
+        open_tag, tag, content, close_tag = match.groups()
+        tag = tag.lower()
+        if tag == "script" and "src=" not in open_tag and "application/ld+json" not in open_tag:
+            content = minify_js(content)
+        elif tag == "style":
+            content = minify_css(content)
+        parts.append(WHITESPACE_RE.sub(" ", open_tag) + content + close_tag)
+        pos = match.end()
+    parts.append(_collapse(html[pos:]))
+    return "".join(parts)
@@ -0,0 +1,281 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+
+from flask import current_app
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Durable outbound mail queue
+# ----------------------
+
+OUTBOX_STATES = ("pending", "inflight", "sent", "dead")
+
+
+class PermanentSendError(Exception):
+    """Raised by a send function when retrying the message can never succeed"""
+
+
+class MailOutbox:
+    """
+    On-disk spool of outbound emails, drained by a background thread.
+
+    Messages are JSON files that move between state directories with atomic
+    renames, so several gunicorn workers can drain the same spool without
+    sending a message twice:
+
+        pending/   <next attempt time>-<id>.json, waiting to be sent
+        inflight/  claimed by a worker, returned to pending/ if its lease expires
+        sent/      the most recent deliveries, kept for the admin view
+        dead/      gave up after MAIL_OUTBOX_MAX_ATTEMPTS attempts
+
+    Failed sends are retried with exponential backoff and jitter.
+    """
+
+    def __init__(self, send=None, app=None):
+        self.send = send
+        self.spool_dir = None
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("MAIL_SPOOL_DIR", "mail_spool")
+        app.config.setdefault("MAIL_OUTBOX_MAX_ATTEMPTS", 8)
+        app.config.setdefault("MAIL_OUTBOX_BASE_DELAY", 30)
+        app.config.setdefault("MAIL_OUTBOX_MAX_DELAY", 60 * 60)
+        app.config.setdefault("MAIL_OUTBOX_POLL_INTERVAL", 5)
+        app.config.setdefault("MAIL_OUTBOX_LEASE", 5 * 60)
+        app.config.setdefault("MAIL_OUTBOX_KEEP_SENT", 200)
+        app.config.setdefault("MAIL_OUTBOX_WORKER", True)
+        self.app = app
+        self.spool_dir = app.config["MAIL_SPOOL_DIR"]
+        for state in OUTBOX_STATES + ("tmp",):
+            os.makedirs(os.path.join(self.spool_dir, state), exist_ok=True)
+        app.extensions["mail_outbox"] = self
+        if app.config["MAIL_OUTBOX_WORKER"]:
+            app.before_request(self.ensure_worker)
+
+    # ---- paths / files ----
+
+    def _path(self, state, filename=""):
+        return os.path.join(self.spool_dir, state, filename)
+
+    def _write(self, state, filename, message):
+        # write to tmp/ first so readers never see a partial file
+        tmp_path = self._path("tmp", filename)
+        with open(tmp_path, "w") as f:
+            json.dump(message, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(state, filename))
+
+    def _read(self, state, filename):
+        with open(self._path(state, filename)) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _filename(message):
+        return f"{int(message['next_attempt_at']):012d}-{message['id']}.json"
+
+    # ---- producer ----
+
+    def enqueue(self, **payload):
+        """
+        Queue one email; `payload` holds the keyword arguments for the send
+        function. Returns the message id once the message is safely on disk.
+        """
+        now = time.time()
+        message = {
+            "id": uuid.uuid4().hex,
+            "created_at": now,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "last_error": None,
+            "payload": payload,
+        }
+        self._write("pending", self._filename(message), message)
+        logger.info("Queued email id=%s subject=%s", message["id"], payload.get("subject"))
+        self._wakeup.set()
+        return message["id"]
+
+    # ---- consumer ----
+
+    def ensure_worker(self):
+        """Start this process's drain thread if it is not running (e.g. after a fork)"""
+        if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="mail-outbox", daemon=True)
+            self._thread_pid = os.getpid()
+            self._thread.start()
+            logger.info("Mail outbox worker started in pid %s", self._thread_pid)
+
+    def _run(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    self.recover_expired()
+                    self.drain_once()
+            except Exception:
+                logger.exception("Mail outbox worker iteration failed")
+            self._wakeup.wait(self.app.config["MAIL_OUTBOX_POLL_INTERVAL"])
+            self._wakeup.clear()
+
+    def recover_expired(self):
+        """Return messages whose worker died mid-send to pending/"""
+        lease = current_app.config["MAIL_OUTBOX_LEASE"]
+        now = time.time()
+        for filename in os.listdir(self._path("inflight")):
+            path = self._path("inflight", filename)
+            try:
+                if now - os.path.getmtime(path) > lease:
+                    os.rename(path, self._path("pending", filename))
+                    logger.warning("Recovered expired in-flight email %s", filename)
+            except FileNotFoundError:
+                continue
+
+    def drain_once(self):
+        """Send every message that is due. Returns the number of messages attempted."""
+        attempted = 0
+        now = time.time()
+        # file names start with the next attempt time, so sorted order is due order
+        for filename in sorted(os.listdir(self._path("pending"))):
+            if not filename.endswith(".json"):
+                continue
+            if int(filename.split("-", 1)[0]) > now:
+                break
+            inflight_path = self._path("inflight", filename)
+            try:
+                os.rename(self._path("pending", filename), inflight_path)
+                # the lease runs from the claim; rename keeps the mtime from when the message was queued
+                os.utime(inflight_path)
+            except FileNotFoundError:
+                continue  # claimed by another worker
+            attempted += 1
+            self._deliver(filename)
+        return attempted
+
+    def _deliver(self, filename):
+        try:
+            message = self._read("inflight", filename)
+            if not isinstance(message, dict) or not isinstance(message.get("payload"), dict):
+                raise ValueError("not an outbox message")
+        except FileNotFoundError:
+            logger.warning("In-flight email %s disappeared before delivery, skipping", filename)
+            return
+        except (ValueError, OSError) as e:
+            # left in inflight/, lease recovery would bring it back in front of every later message
+            self._dead_letter_unreadable(filename, e)
+            return
+        message["attempts"] = message.get("attempts", 0) + 1
+        try:
+            result = self.send(**message["payload"])
+        except Exception as e:
+            message["last_error"] = f"{type(e).__name__}: {e}"
+            permanent = isinstance(e, (PermanentSendError, ValueError))
+            if permanent or message["attempts"] >= current_app.config["MAIL_OUTBOX_MAX_ATTEMPTS"]:
+                message["failed_at"] = time.time()
+                self._write("dead", f"{message['id']}.json", message)
+                logger.error("Email %s dead-lettered after %d attempts: %s", message["id"], message["attempts"], message["last_error"])
+            else:
+                delay = min(
+                    current_app.config["MAIL_OUTBOX_MAX_DELAY"],
+                    current_app.config["MAIL_OUTBOX_BASE_DELAY"] * 2 ** (message["attempts"] - 1),
+                )
+                message["next_attempt_at"] = time.time() + delay * random.uniform(0.8, 1.2)
+                self._write("pending", self._filename(message), message)
+                logger.warning("Email %s attempt %d failed, retrying in %.0fs: %s", message["id"], message["attempts"], delay, message["last_error"])
+        else:
+            message["sent_at"] = time.time()
+            message["result"] = result
+            # the body is not needed once delivered
+            message["payload"].pop("html", None)
+            self._write("sent", f"{int(message['sent_at']):012d}-{message['id']}.json", message)
+            self._trim_sent()
+        try:
+            os.remove(self._path("inflight", filename))
+        except FileNotFoundError:
+            # only if the send outlived the lease and another worker recovered the message
+            logger.warning("Email %s was recovered from inflight/ while being sent", message["id"])
+
+    def _dead_letter_unreadable(self, filename, error):
+        """Move a truncated or corrupt in-flight file to dead/, keeping its raw contents"""
+        path = self._path("inflight", filename)
+        message_id = filename[:-len(".json")].split("-", 1)[-1]
+        try:
+            created_at = os.path.getmtime(path)
+            with open(path, errors="replace") as f:
+                raw = f.read()
+        except OSError:
+            created_at, raw = time.time(), None
+        message = {
+            "id": message_id,
+            "created_at": created_at,
+            "attempts": 0,
+            "last_error": f"Unreadable message: {type(error).__name__}: {error}",
+            "failed_at": time.time(),
+            "payload": {},
+            # nothing to send, retry() refuses these
+            "corrupt": True,
+            "raw": raw,
+        }
+        self._write("dead", f"{message_id}.json", message)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        logger.error("Email %s dead-lettered, unreadable: %s", message_id, message["last_error"])
+
+    def _trim_sent(self):
+        sent = sorted(os.listdir(self._path("sent")))
+        for filename in sent[:-current_app.config["MAIL_OUTBOX_KEEP_SENT"]]:
+            try:
+                os.remove(self._path("sent", filename))
+            except FileNotFoundError:
+                pass
+
+    # ---- admin ----
+
+    def retry(self, message_id):
+        """Move a dead-lettered message back to pending/ with a fresh attempt count"""
+        filename = f"{message_id}.json"
+        try:
+            message = self._read("dead", filename)
+        except FileNotFoundError:
+            return False
+        if message.get("corrupt"):
+            return False
+        message.update(attempts=0, next_attempt_at=time.time(), last_error=None)
+        message.pop("failed_at", None)
+        self._write("pending", self._filename(message), message)
+        os.remove(self._path("dead", filename))
+        self._wakeup.set()
+        return True
+
+    def messages(self, state, limit=50):
+        """The newest `limit` messages in one state directory, newest first"""
+        result = []
+        for filename in sorted(os.listdir(self._path(state)), reverse=True)[:limit]:
+            try:
+                message = self._read(state, filename)
+            except (FileNotFoundError, ValueError):
+                continue
+            message["payload"].pop("html", None)
+            result.append(message)
+        return result
+
+    def stats(self):
+        counts = {state: len(os.listdir(self._path(state))) for state in OUTBOX_STATES}
+        counts["worker_alive"] = self._thread is not None and self._thread.is_alive() and self._thread_pid == os.getpid()
+        return counts
@@ -0,0 +1,186 @@
+import cProfile
+import inspect
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+
+from flask import current_app, g, request
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# On-demand request profiling
+# ----------------------
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_ARG = "_profile"
+
+# <created, ms>-<hex id>
+PROFILE_ID_RE = re.compile(r"^\d{13}-[0-9a-f]{8}$")
+
+
+class RequestProfiler:
+    """
+    cProfile traces of single requests, kept in PROFILE_DIR for the admin pages.
+
+    A request is profiled when an admin asks for it, with an `X-Profile: 1`
+    header or `?_profile=1` (the response then carries `X-Profile-Id`), or at
+    random for a PROFILE_SAMPLE_RATE fraction of all other traffic. Each trace
+    is a pstats dump (<id>.prof, readable with pstats or snakeviz) next to a
+    small JSON file describing the request. Only the newest PROFILE_KEEP
+    traces are kept.
+
+    The profiler covers the thread that handles the request, from
+    before_request until the response is sent. At most one request per
+    process is profiled at a time; others run unprofiled. `async def` views
+    run on the BackgroundLoop thread, where the profiler can't see them, so
+    they are never profiled; an admin who asks gets an `X-Profile: skipped`
+    header instead of a trace of the request thread waiting.
+    """
+
+    def __init__(self, app=None, authorized=None):
+        self.authorized = authorized or (lambda: False)
+        self.directory = None
+        self._active = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PROFILE_DIR", "profiles")
+        app.config.setdefault("PROFILE_SAMPLE_RATE", 0.0)
+        app.config.setdefault("PROFILE_KEEP", 50)
+        self.app = app
+        self.directory = app.config["PROFILE_DIR"]
+        os.makedirs(self.directory, exist_ok=True)
+        app.extensions["request_profiler"] = self
+        app.before_request(self._start)
+        app.after_request(self._tag_response)
+        app.teardown_request(self._finish)
+
+    # ---- hooks ----
+
+    def _trigger(self):
+        if request.endpoint in (None, "static") or request.path.startswith("/admin/profiles"):
+            return None
+        asked = request.headers.get(PROFILE_HEADER) == "1" or request.args.get(PROFILE_QUERY_ARG) == "1"
+        if asked and self.authorized():
+            return "admin"
+        rate = self.app.config["PROFILE_SAMPLE_RATE"]
+        if rate and random.random() < rate:
+            return "sampled"
+        return None
+
+    @staticmethod
+    def _is_async_view():
+        view = current_app.view_functions.get(request.endpoint)
+        return view is not None and inspect.iscoroutinefunction(inspect.unwrap(view))
+
+    def _start(self):
+        trigger = self._trigger()
+        if trigger is None:
+            return
+        if self._is_async_view():
+            if trigger == "admin":
+                g._profile_skipped = "async view, runs on the event loop thread"
+            return
+        if not self._active.acquire(blocking=False):
+            return
+        profile = cProfile.Profile()
+        profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        g._profile = (profile, trigger, time.perf_counter(), profile_id)
+        profile.enable()
+
+    def _tag_response(self, response):
+        skipped = g.pop("_profile_skipped", None)
+        if skipped is not None:
+            response.headers[PROFILE_HEADER] = f"skipped ({skipped})"
+            logger.info("Not profiling %s %s: %s", request.method, request.path, skipped)
+        state = g.get("_profile")
+        if state is not None:
+            g._profile_status = response.status_code
+            if state[1] == "admin":
+                response.headers["X-Profile-Id"] = state[3]
+        return response
+
+    def _finish(self, exc):
+        state = g.pop("_profile", None)
+        if state is None:
+            return
+        profile, trigger, start, profile_id = state
+        profile.disable()
+        self._active.release()
+        try:
+            self._save(profile, {
+                "id": profile_id,
+                "created_at": time.time(),
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "endpoint": request.endpoint,
+                "status": g.pop("_profile_status", 500),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+                "trigger": trigger,
+                "pid": os.getpid(),
+            })
+        except Exception:
+            logger.exception("Saving the request profile failed")
+
+    # ---- storage ----
+
+    def _path(self, profile_id, ext):
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+    def _save(self, profile, meta):
+        profile.dump_stats(self._path(meta["id"], "prof"))
+        with open(self._path(meta["id"], "json"), "w") as f:
+            json.dump(meta, f)
+        logger.info("Profiled %s %s (%s, %.1f ms) as %s",
+                    meta["method"], meta["path"], meta["trigger"], meta["duration_ms"], meta["id"])
+        self._trim()
+
+    def _ids(self):
+        """Saved profile ids, newest first"""
+        ids = [name[:-5] for name in os.listdir(self.directory) if name.endswith(".json")]
+        return sorted((i for i in ids if PROFILE_ID_RE.match(i)), reverse=True)
+
+    def _trim(self):
+        for profile_id in self._ids()[self.app.config["PROFILE_KEEP"]:]:
+            for ext in ("json", "prof"):
+                try:
+                    os.remove(self._path(profile_id, ext))
+                except FileNotFoundError:
+                    pass  # another worker trimmed it first
+
+    def profiles(self):
+        """Metadata of every saved profile, newest first"""
+        result = []
+        for profile_id in self._ids():
+            try:
+                with open(self._path(profile_id, "json")) as f:
+                    result.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return result
+
+    def profile_path(self, profile_id):
+        """Path of a saved .prof file, None for unknown or malformed ids"""
+        if not PROFILE_ID_RE.match(profile_id or ""):
+            return None
+        path = self._path(profile_id, "prof")
+        return path if os.path.exists(path) else None
+
+    def report(self, profile_id, sort="cumulative", limit=60):
+        """pstats text report of a saved profile, None when it does not exist"""
+        path = self.profile_path(profile_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
@@ -0,0 +1,200 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# reCAPTCHA verification client
+# ----------------------
+
+RECAPTCHA_VERIFY_URL = "https://www.google.com/recaptcha/api/siteverify"
+
+RECAPTCHA_ERROR_MESSAGES = {
+    'missing-input-secret': "reCAPTCHA secret key is missing",
+    'invalid-input-secret': "reCAPTCHA secret key is invalid",
+    'missing-input-response': "reCAPTCHA response is missing",
+    'invalid-input-response': "reCAPTCHA response is invalid",
+    'bad-request': "reCAPTCHA request is malformed",
+    'timeout-or-duplicate': "reCAPTCHA response has expired or been used",
+}
+
+
+class RecaptchaClient:
+    """
+    reCAPTCHA siteverify client that keeps its HTTPS connections alive between
+    submissions and rejects replayed tokens locally.
+
+    Tokens are single-use and expire after two minutes, so the hash of every
+    token sent for verification is remembered for RECAPTCHA_REPLAY_TTL seconds.
+    A token seen again in that time is rejected without calling Google. When
+    Google gives no definitive answer (transport error, timeout, non-200), the
+    token is forgotten again, so the user's retry is verified normally.
+    RECAPTCHA_VERIFY_URL can point at a local stand-in for load tests.
+
+    `verify_async()` does the same on an httpx.AsyncClient when httpx is
+    installed, and falls back to running `verify()` in a thread otherwise.
+    """
+
+    def __init__(self, app=None):
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._async_client = None
+        self._async_client_loop = None
+        self._seen = OrderedDict()
+        self._seen_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RECAPTCHA_VERIFY_URL', RECAPTCHA_VERIFY_URL)
+        app.config.setdefault('RECAPTCHA_TIMEOUT', 10)
+        app.config.setdefault('RECAPTCHA_POOL_SIZE', 10)
+        app.config.setdefault('RECAPTCHA_REPLAY_TTL', 120)
+        app.config.setdefault('RECAPTCHA_REPLAY_CACHE_SIZE', 10000)
+        self.verify_url = app.config['RECAPTCHA_VERIFY_URL']
+        self.timeout = app.config['RECAPTCHA_TIMEOUT']
+        self.pool_size = app.config['RECAPTCHA_POOL_SIZE']
+        self.replay_ttl = app.config['RECAPTCHA_REPLAY_TTL']
+        self.replay_cache_size = app.config['RECAPTCHA_REPLAY_CACHE_SIZE']
+        app.extensions['recaptcha'] = self
+
+    @property
+    def session(self):
+        """Keep-alive session shared by every request thread in this process"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def _get_async_client(self):
+        """Keep-alive async client for the running event loop, or None without httpx"""
+        try:
+            import httpx
+        except ImportError:
+            return None
+        loop = asyncio.get_running_loop()
+        # an AsyncClient's connections belong to the loop that opened them
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    def is_replay(self, token):
+        """Remember `token` and report whether it was already seen within the TTL"""
+        token_hash = hashlib.sha256(token.encode()).digest()
+        now = time.monotonic()
+        with self._seen_lock:
+            # entries share one TTL, so insertion order is expiry order
+            while self._seen:
+                oldest_hash, expires_at = next(iter(self._seen.items()))
+                if expires_at > now and len(self._seen) < self.replay_cache_size:
+                    break
+                self._seen.popitem(last=False)
+            if token_hash in self._seen:
+                return True
+            self._seen[token_hash] = now + self.replay_ttl
+            return False
+
+    def forget(self, token):
+        """Undo is_replay() for a token Google never gave a verdict on"""
+        with self._seen_lock:
+            self._seen.pop(hashlib.sha256(token.encode()).digest(), None)
+
+    def verify(self, secret, token, remote_ip):
+        """Returns (success, error_message)"""
+        from requests.exceptions import RequestException
+
+        if self.is_replay(token):
+            logger.warning("reCAPTCHA token replay rejected locally: ip=%s", remote_ip)
+            return False, RECAPTCHA_ERROR_MESSAGES['timeout-or-duplicate']
+
+        try:
+            resp = self.session.post(
+                self.verify_url,
+                data={
+                    'secret': secret,
+                    'response': token,
+                    'remoteip': remote_ip,
+                },
+                timeout=self.timeout,
+            )
+            if resp.status_code != 200:
+                logger.error("reCAPTCHA API non-200 response: HTTP %s %s", resp.status_code, resp.text[:200])
+                self.forget(token)
+                return False, "reCAPTCHA service temporarily unavailable"
+            data = resp.json()
+        except RequestException as e:
+            logger.exception("reCAPTCHA API request failed: %s", str(e))
+            self.forget(token)
+            return False, "reCAPTCHA service temporarily unavailable"
+        except ValueError as e:
+            logger.exception("reCAPTCHA API returned invalid JSON: %s", str(e))
+            self.forget(token)
+            return False, "reCAPTCHA service error"
+
+        return self.interpret(data)
+
+    async def verify_async(self, secret, token, remote_ip):
+        """Returns (success, error_message)"""
+        client = self._get_async_client()
+        if client is None:
+            return await asyncio.to_thread(self.verify, secret, token, remote_ip)
+
+        import httpx
+
+        if self.is_replay(token):
+            logger.warning("reCAPTCHA token replay rejected locally: ip=%s", remote_ip)
+            return False, RECAPTCHA_ERROR_MESSAGES['timeout-or-duplicate']
+
+        try:
+            resp = await client.post(
+                self.verify_url,
+                data={
+                    'secret': secret,
+                    'response': token,
+                    'remoteip': remote_ip,
+                },
+            )
+            if resp.status_code != 200:
+                logger.error("reCAPTCHA API non-200 response: HTTP %s %s", resp.status_code, resp.text[:200])
+                self.forget(token)
+                return False, "reCAPTCHA service temporarily unavailable"
+            data = resp.json()
+        except httpx.HTTPError as e:
+            logger.exception("reCAPTCHA API request failed: %s", str(e))
+            self.forget(token)
+            return False, "reCAPTCHA service temporarily unavailable"
+        except ValueError as e:
+            logger.exception("reCAPTCHA API returned invalid JSON: %s", str(e))
+            self.forget(token)
+            return False, "reCAPTCHA service error"
+
+        return self.interpret(data)
+
+    @staticmethod
+    def interpret(data):
+        """Turn a siteverify response body into (success, error_message)"""
+        if data.get('success'):
+            logger.info("reCAPTCHA verification successful: hostname=%s", data.get('hostname'))
+            return True, None
+
+        error_codes = data.get('error-codes', [])
+        error_messages = [RECAPTCHA_ERROR_MESSAGES.get(code, f"reCAPTCHA error: {code}") for code in error_codes]
+        error_message = "; ".join(error_messages) if error_messages else "reCAPTCHA verification failed"
+        logger.warning("reCAPTCHA verification failed: codes=%s", error_codes)
+        return False, error_message
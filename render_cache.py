@@ -0,0 +1,61 @@
+import logging
+import threading
+
+from flask import current_app, render_template
+from flask_wtf.csrf import generate_csrf
+
+logger = logging.getLogger("envision")
+
+
+class RenderCache:
+    """
+    Process-wide cache for pages whose only per-request content is the CSRF token.
+
+    The page is rendered once, split around the token that was embedded in it and
+    stored as a list of static chunks. Later requests just join the chunks with
+    their own token. A lock makes concurrent requests on a cold cache wait for the
+    single in-flight render instead of rendering the template in parallel.
+
+    `transform`, if set, post-processes the body once when it is cached (e.g.
+    minify_html); it must leave the CSRF token intact.
+    """
+
+    def __init__(self, enabled=True, transform=None):
+        self.enabled = enabled
+        self.transform = transform
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def render(self, key, template_name, get_context):
+        """
+        Render `template_name` for the current request, using the cached body for
+        `key` when available. `get_context` is only called when the template is
+        actually rendered. The template must only vary per request through the
+        CSRF token.
+        """
+        token = generate_csrf()
+        # debug mode reloads templates on change, so always render there
+        if not self.enabled or current_app.debug:
+            return render_template(template_name, **get_context())
+
+        chunks = self._entries.get(key)
+        if chunks is None:
+            with self._lock:
+                chunks = self._entries.get(key)
+                if chunks is None:
+                    body = render_template(template_name, **get_context())
+                    if self.transform:
+                        body = self.transform(body)
+                    chunks = tuple(body.split(token))
+                    self._entries[key] = chunks
+                    logger.info("Render cache filled: key=%s size=%d bytes", key, len(body))
+                    return body
+        return token.join(chunks)
+
+    def invalidate(self, key=None):
+        """Drop one cached page, or every page when `key` is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
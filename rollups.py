@@ -0,0 +1,142 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Submission analytics rollups
+# ----------------------
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def rollup_keys(record):
+    """The (dimension, key) counters one submission adds to"""
+    ts = record.get("ts")
+    email = (record.get("email") or "").strip().lower()
+    return (
+        ("total", ""),
+        ("role", record.get("role") or "unknown"),
+        ("day", datetime.fromtimestamp(ts).strftime("%Y-%m-%d") if ts else "unknown"),
+        ("domain", email.rsplit("@", 1)[1] if "@" in email else "unknown"),
+    )
+
+
+class SubmissionRollups:
+    """
+    Running submission counts per role, per day and per email domain, kept in
+    SQLite so every worker reads the same numbers.
+
+    The counters follow the submission log by sequence number: `catch_up()`
+    applies every record appended since the last call, in the same transaction
+    that advances the stored position. Calling it after each append keeps the
+    counts current at write time, and a record whose update was lost (a crash
+    between the two writes) is picked up by the next call. Reads are single
+    indexed lookups regardless of how many submissions there are.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        # highest position this process knows is applied, to skip the write lock when nothing is new
+        self._applied_hint = 0
+        with self._connection() as conn:
+            conn.executescript(ROLLUP_SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        # connections must not cross a fork, the store is opened before gunicorn --preload forks
+        if conn is None or self._local.pid != os.getpid():
+            # autocommit mode, transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    # ---- writers ----
+
+    def catch_up(self, log):
+        """Apply the records appended to `log` since the last call. Returns how many were applied."""
+        if len(log) <= self._applied_hint:
+            return 0
+        return self._apply(log, rebuild=False)
+
+    def rebuild(self, log):
+        """Recount everything from the start of `log`. Returns the number of records replayed."""
+        return self._apply(log, rebuild=True)
+
+    def _apply(self, log, rebuild):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if rebuild:
+                conn.execute("DELETE FROM rollups")
+                applied = 0
+            else:
+                applied = self._applied(conn)
+
+            counts = Counter()
+            position = applied
+            for record in log.records(start=applied):
+                counts.update(rollup_keys(record))
+                position = record["seq"] + 1
+
+            conn.executemany(
+                "INSERT INTO rollups (dimension, key, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (dimension, key) DO UPDATE SET count = count + excluded.count",
+                [(dimension, key, count) for (dimension, key), count in counts.items()],
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('applied_through', ?)", (str(position),))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._applied_hint = position
+        if rebuild or position - applied > 1:
+            logger.info("Submission rollups applied %d records (through #%d)", position - applied, position)
+        return position - applied
+
+    @staticmethod
+    def _applied(conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'applied_through'").fetchone()
+        return int(row[0]) if row else 0
+
+    # ---- readers ----
+
+    def total(self):
+        row = self._connection().execute("SELECT count FROM rollups WHERE dimension = 'total'").fetchone()
+        return row[0] if row else 0
+
+    def counts(self, dimension, limit=None):
+        """{key: count} for one dimension, largest first"""
+        rows = self._connection().execute(
+            "SELECT key, count FROM rollups WHERE dimension = ? ORDER BY count DESC, key LIMIT ?",
+            (dimension, -1 if limit is None else limit),
+        )
+        return dict(rows.fetchall())
+
+    def days(self, since):
+        """{YYYY-MM-DD: count} for days on or after the `since` date string, oldest first"""
+        rows = self._connection().execute(
+            "SELECT key, count FROM rollups WHERE dimension = 'day' AND key >= ? AND key != 'unknown' ORDER BY key",
+            (since,),
+        )
+        return dict(rows.fetchall())
@@ -0,0 +1,151 @@
+from array import array
+from collections import namedtuple
+
+# ----------------------
+# Windowed submission limits
+# ----------------------
+
+MAX_SUBMISSIONS = 4
+LIMIT_WINDOW = 14 * 24 * 60 * 60  # 14 days in seconds
+COOLDOWN_PERIOD = 24 * 60 * 60  # 24 hours in seconds
+COOLDOWN_EVERY = 2  # cooldown starts after every 2nd submission
+
+
+class TimeRing:
+    """
+    Fixed-capacity ring of timestamps kept in chronological order, backed by a
+    flat array of doubles. Appending past capacity overwrites the oldest entry.
+    """
+
+    __slots__ = ("_buf", "_start", "_len")
+
+    def __init__(self, capacity, timestamps=()):
+        self._buf = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._len = 0
+        for ts in timestamps:
+            self.append(ts)
+
+    def append(self, ts):
+        capacity = len(self._buf)
+        if self._len < capacity:
+            self._buf[(self._start + self._len) % capacity] = ts
+            self._len += 1
+        else:
+            self._buf[self._start] = ts
+            self._start = (self._start + 1) % capacity
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        """i-th oldest timestamp; negative indexes count from the newest"""
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("TimeRing index out of range")
+        return self._buf[(self._start + i) % len(self._buf)]
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self[i]
+
+
+LimitDecision = namedtuple("LimitDecision", "allowed reason retry_after count")
+
+
+class SubmissionLimiter:
+    """
+    Sliding-window limit shared by the name and email checks and the admin view:
+    at most `max_submissions` per `window`, plus a `cooldown` that starts after
+    every `cooldown_every`-th submission in the window.
+
+    Only the newest `max_submissions` timestamps can affect a decision, so each
+    identity's history is held in a TimeRing of that size and every check is
+    O(max_submissions) with no sorting.
+    """
+
+    def __init__(self, max_submissions=MAX_SUBMISSIONS, window=LIMIT_WINDOW, cooldown=COOLDOWN_PERIOD, cooldown_every=COOLDOWN_EVERY):
+        self.max_submissions = max_submissions
+        self.window = window
+        self.cooldown = cooldown
+        self.cooldown_every = cooldown_every
+        # decisions that allow a submission only differ by count, so they are shared
+        self._allowed = [LimitDecision(True, None, 0, count) for count in range(max_submissions)]
+
+    def ring(self, timestamps=()):
+        """Ring for a chronological (oldest first) iterable of timestamps"""
+        return TimeRing(self.max_submissions, timestamps)
+
+    def ring_from_newest(self, timestamps):
+        """Ring for a newest-first sequence, as returned by the tracking store"""
+        return self.ring(reversed(timestamps[:self.max_submissions]))
+
+    def check(self, ring, now):
+        """
+        Decide whether one more submission is allowed at `now`.
+
+        Returns a LimitDecision; `reason` is "limit" or "cooldown" when blocked and
+        `retry_after` is the number of seconds until the next submission is allowed.
+        """
+        first_recent = self._first_recent(ring, now)
+        count = ring._len - first_recent
+
+        if count >= self.max_submissions:
+            return LimitDecision(False, "limit", self.window - (now - ring[first_recent]), count)
+
+        if count >= self.cooldown_every:
+            remaining = self._cooldown_remaining(ring, now, count)
+            if remaining > 0:
+                return LimitDecision(False, "cooldown", remaining, count)
+
+        return self._allowed[count]
+
+    def cooldown_remaining(self, ring, now):
+        """Seconds left in the current cooldown, 0 when there is none"""
+        return self._cooldown_remaining(ring, now, ring._len - self._first_recent(ring, now))
+
+    def _first_recent(self, ring, now):
+        # entries are chronological, so the expired ones are a prefix;
+        # this runs on every check, so it reads the ring's buffer directly
+        buf, start, length = ring._buf, ring._start, ring._len
+        capacity = len(buf)
+        oldest_allowed = now - self.window
+        first_recent = 0
+        while first_recent < length and buf[(start + first_recent) % capacity] <= oldest_allowed:
+            first_recent += 1
+        return first_recent
+
+    def _cooldown_remaining(self, ring, now, count):
+        pairs = count // self.cooldown_every
+        if pairs == 0:
+            return 0
+        # the submission that started the latest cooldown, counted from the newest
+        since_start = now - ring._buf[(ring._start + ring._len - pairs * self.cooldown_every) % len(ring._buf)]
+        return max(0, self.cooldown - since_start)
+
+    def blocked_until(self, ring, now):
+        """
+        (limit_until, cooldown_until) for a history whose newest submission is at
+        or before `now`, 0 for either that doesn't apply. Until a newer submission
+        is recorded, `check()` at any later time `t` blocks for the limit while
+        t < limit_until and otherwise for a cooldown while t < cooldown_until, so
+        both can be stored and simply compared with the clock.
+
+        While at the limit any cooldown is hidden behind it, but the oldest
+        submission expiring moves the cooldown to a newer pair, so the cooldown
+        is taken as of the moment the limit ends.
+        """
+        if len(ring) == self.max_submissions and ring[0] + self.window > now:
+            limit_until = ring[0] + self.window
+            remaining = self.cooldown_remaining(ring, limit_until)
+            return limit_until, limit_until + remaining if remaining > 0 else 0
+        remaining = self.cooldown_remaining(ring, now)
+        return 0, now + remaining if remaining > 0 else 0
+
+    def count(self, ring, now):
+        """Number of submissions still inside the window"""
+        return len(ring) - self._first_recent(ring, now)
+
+
+submission_limiter = SubmissionLimiter()
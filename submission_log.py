@@ -0,0 +1,347 @@
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("envision")
+
+# ----------------------
+# Append-only submission log
+# ----------------------
+
+# one little-endian uint64 byte offset per record
+INDEX_ENTRY = struct.Struct("<Q")
+
+# records read per backwards step when a role filter may skip most of them
+TAIL_BLOCK = 256
+
+
+class SubmissionLog:
+    """
+    Accepted /get-involved submissions as JSON lines, plus a sidecar index of
+    8-byte offsets so record `n` is one seek away in both files.
+
+        submissions.jsonl       {"ts": ..., "ip": ..., "name": ..., ...}\\n per record
+        submissions.jsonl.idx   offset of record n at byte 8 * n
+
+    JSON escapes tabs and newlines, so a message can never break a row. Appends
+    take an flock on the data file. The data file is the source of truth: an
+    index that is missing, truncated or behind (a crash between the two writes)
+    is caught up from the data file on the next append or `repair()`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.meta_path = path + ".meta.json"
+
+    # ---- writer ----
+
+    @contextmanager
+    def _locked(self):
+        # opened per call: an flock on a descriptor inherited across fork() would be shared
+        with open(self.path, "ab+") as data, open(self.index_path, "ab+") as index:
+            fcntl.flock(data, fcntl.LOCK_EX)
+            try:
+                self._catch_up(data, index)
+                yield data, index
+            finally:
+                fcntl.flock(data, fcntl.LOCK_UN)
+
+    def append(self, record):
+        """Append one record (a JSON-serializable dict). Returns its sequence number."""
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+        with self._locked() as (data, index):
+            offset = data.seek(0, os.SEEK_END)
+            data.write(line)
+            data.flush()
+            os.fsync(data.fileno())
+            seq = index.seek(0, os.SEEK_END) // INDEX_ENTRY.size
+            index.write(INDEX_ENTRY.pack(offset))
+            index.flush()
+        return seq
+
+    def extend(self, records):
+        """Append many records under one lock, fsyncing once. Returns the number appended."""
+        with self._locked() as (data, index):
+            return self._write_records(data, index, records)
+
+    @staticmethod
+    def _write_records(data, index, records):
+        # caller holds the lock
+        count = 0
+        offset = data.seek(0, os.SEEK_END)
+        index.seek(0, os.SEEK_END)
+        for record in records:
+            line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+            data.write(line)
+            index.write(INDEX_ENTRY.pack(offset))
+            offset += len(line)
+            count += 1
+        data.flush()
+        os.fsync(data.fileno())
+        index.flush()
+        return count
+
+    def repair(self):
+        """Bring the index up to date with the data file"""
+        with self._locked():
+            pass
+
+    def _catch_up(self, data, index):
+        index_size = index.seek(0, os.SEEK_END)
+        if index_size % INDEX_ENTRY.size:
+            index_size -= index_size % INDEX_ENTRY.size
+            index.truncate(index_size)
+
+        # end of the last indexed record
+        indexed_end = 0
+        if index_size:
+            index.seek(index_size - INDEX_ENTRY.size)
+            (last_offset,) = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+            data.seek(last_offset)
+            indexed_end = last_offset + len(data.readline())
+
+        data_size = data.seek(0, os.SEEK_END)
+        if data_size == indexed_end:
+            return
+
+        added = 0
+        data.seek(indexed_end)
+        offset = indexed_end
+        index.seek(index_size)
+        for line in data:
+            if not line.endswith(b"\n"):
+                # torn write from a crash mid-append, the record was never acknowledged
+                data.truncate(offset)
+                logger.warning("Dropped %d bytes of a partial record at the end of %s", len(line), self.path)
+                break
+            index.write(INDEX_ENTRY.pack(offset))
+            offset += len(line)
+            added += 1
+        index.flush()
+        if added:
+            logger.warning("Indexed %d submission log records missing from %s", added, self.index_path)
+
+    # ---- readers ----
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.index_path) // INDEX_ENTRY.size
+        except FileNotFoundError:
+            return 0
+
+    def offset(self, seq):
+        with open(self.index_path, "rb") as index:
+            index.seek(seq * INDEX_ENTRY.size)
+            entry = index.read(INDEX_ENTRY.size)
+        if len(entry) != INDEX_ENTRY.size:
+            raise IndexError(seq)
+        return INDEX_ENTRY.unpack(entry)[0]
+
+    def get(self, seq):
+        """Record number `seq` (0 is the oldest), with its `seq` added"""
+        if seq < 0:
+            seq += len(self)
+        if seq < 0:
+            raise IndexError(seq)
+        offset = self.offset(seq)
+        with open(self.path, "rb") as data:
+            data.seek(offset)
+            return self._decode(seq, data.readline())
+
+    def records(self, start=0, stop=None):
+        """Records `start` up to `stop`, oldest first, read sequentially after one seek"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        with open(self.path, "rb") as data:
+            data.seek(self.offset(start))
+            for seq in range(start, stop):
+                yield self._decode(seq, data.readline())
+
+    def page(self, before=None, limit=50, role=None, since=None, until=None):
+        """Newest-first page of records older than sequence number `before`, see LogPage"""
+        return LogPage(self, before, limit, role, since, until)
+
+    @staticmethod
+    def _decode(seq, line):
+        record = json.loads(line)
+        record["seq"] = seq
+        return record
+
+    # ---- one-time imports ----
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def is_imported(self, source):
+        return source in self._read_meta().get("imported", {})
+
+    def import_once(self, source, records):
+        """
+        Append `records()` unless `source` was imported before. The check, the
+        append and the mark happen under the append lock, so concurrent callers
+        (e.g. several workers starting at once) import the source exactly once.
+
+        Returns the number of records imported.
+        """
+        with self._locked() as (data, index):
+            if self.is_imported(source):
+                return 0
+            if data.seek(0, os.SEEK_END):
+                logger.warning("Submission log is not empty, imported records are appended after the existing ones")
+            count = self._write_records(data, index, records())
+            self.mark_imported(source, count)
+        return count
+
+    def mark_imported(self, source, count):
+        meta = self._read_meta()
+        meta.setdefault("imported", {})[source] = {"at": time.time(), "records": count}
+        with open(self.meta_path + ".tmp", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(self.meta_path + ".tmp", self.meta_path)
+
+
+class LogPage:
+    """
+    One page of a SubmissionLog, newest first, read from the tail.
+
+    Only the index is mapped and only the records on (or skipped to fill) the
+    page are read, so page 1 costs the same however long the log is. `since`
+    and `until` (timestamps, `until` exclusive) are binary searches over the
+    index, relying on records being appended in time order; imported legacy
+    records without a timestamp sort first. `role` is matched against the raw
+    JSON before a record is decoded.
+
+    Iterate to get the records. Afterwards `next_before` is the cursor for the
+    following page, or None on the last page.
+    """
+
+    def __init__(self, log, before, limit, role, since, until):
+        self.log = log
+        self.before = before
+        self.limit = limit
+        self.role = role
+        self.since = since
+        self.until = until
+        self.next_before = None
+
+    def __iter__(self):
+        self.next_before = None
+        try:
+            index_file = open(self.log.index_path, "rb")
+        except FileNotFoundError:
+            return
+        with index_file, open(self.log.path, "rb") as data:
+            count = os.fstat(index_file.fileno()).st_size // INDEX_ENTRY.size
+            if not count:
+                return
+            with mmap.mmap(index_file.fileno(), count * INDEX_ENTRY.size, access=mmap.ACCESS_READ) as index:
+                yield from self._scan(index, count, data)
+
+    def _scan(self, index, count, data):
+        offset = lambda seq: INDEX_ENTRY.unpack_from(index, seq * INDEX_ENTRY.size)[0]
+
+        hi = count if self.before is None else max(0, min(self.before, count))
+        lo_bound = 0
+        if self.until is not None:
+            hi = min(hi, self._bisect(offset, data, count, self.until))
+        if self.since is not None:
+            lo_bound = self._bisect(offset, data, count, self.since)
+
+        needle = None
+        if self.role:
+            needle = b'"role":' + json.dumps(self.role, ensure_ascii=False).encode()
+        block = max(self.limit, TAIL_BLOCK) if needle else self.limit
+
+        returned = 0
+        while hi > lo_bound:
+            lo = max(lo_bound, hi - block)
+            data.seek(offset(lo))
+            if hi < count:
+                chunk = data.read(offset(hi) - offset(lo))
+            else:
+                # the last record ends at the next newline, not at EOF, if an append is in progress
+                chunk = b"".join(data.readline() for _ in range(hi - lo))
+            lines = chunk.split(b"\n")
+            for i in range(hi - lo - 1, -1, -1):
+                if needle is not None and needle not in lines[i]:
+                    continue
+                record = self.log._decode(lo + i, lines[i])
+                if self.role and record.get("role") != self.role:
+                    continue
+                if returned == self.limit:
+                    # there is at least one more matching record
+                    self.next_before = lo + i + 1
+                    return
+                returned += 1
+                yield record
+            hi = lo
+
+    @staticmethod
+    def _bisect(offset, data, count, ts):
+        """First sequence number whose record has a timestamp >= `ts`"""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            data.seek(offset(mid))
+            if (json.loads(data.readline()).get("ts") or 0) < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+
+def parse_legacy_responses(lines):
+    """
+    Records from the tab-separated `responses.txt` format, parsed the way the
+    old admin view did: lines with fewer than five fields are skipped and extra
+    fields are ignored. The legacy file has no timestamps or IPs.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line or "\t" not in line:
+            continue
+        parts = line.split("\t")
+        if len(parts) < 5:
+            continue
+        yield {
+            "ts": None,
+            "ip": None,
+            "name": parts[0],
+            "email": parts[1],
+            "affiliation": parts[2],
+            "role": parts[3],
+            "message": parts[4],
+            "source": "responses.txt",
+        }
+
+
+def import_legacy_responses(txt_path, log):
+    """
+    Copy a legacy `responses.txt` into the submission log. Safe to call
+    repeatedly and concurrently, the file is only imported once.
+
+    Returns the number of records imported.
+    """
+    source = os.path.abspath(txt_path)
+    if not os.path.exists(txt_path):
+        return 0
+
+    def records():
+        with open(txt_path, encoding="utf-8", errors="replace") as f:
+            return list(parse_legacy_responses(f))
+
+    imported = log.import_once(source, records)
+    if imported:
+        logger.info("Imported %d legacy submissions from %s", imported, txt_path)
+    return imported
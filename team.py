@@ -1,47 +0,0 @@
-class Team():
-    def __init__(self, name, img, role):
-        self.name = name
-        self.img = img
-        self.role = role
-
-
-team = [
-
-    Team(
-        "The 2025-2026 Envision Team",
-        "/assets/team/team_shot26.JPG",
-        " "
-    ),
-    Team(
-        "Mohemeen Ahmed",
-        "/assets/team/ahmed26.jpg",
-        "Co-Director"
-    ),
-    Team(
-        "Eden Reinfurt",
-        "/assets/team/reinfurt.JPG",
-        "Co-Director"
-    ),
-    Team(
-        "Mayank Sengupta",
-        "/assets/team/sengupta26.jpg",
-        "Outreach"
-    ),
-    Team(
-        "Miguel Piñero-Jacome",
-        "/assets/team/pinero26.jpg",
-        "Website"
-    ),
-    Team(
-        "Sidak Singh",
-        "/assets/team/singh26.jpg",
-        "Design"
-    ),
-    Team(
-        "Cynthia Lee",
-        "/assets/team/lee26.jpg",
-        "Marketing & Media"
-    ),
-     
-
-]
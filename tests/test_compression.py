@@ -0,0 +1,57 @@
+import gzip
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compression import Compression
+
+CSS = b"body { color: #222; }\n" * 200
+
+
+@pytest.fixture
+def static_folder(tmp_path):
+    return tmp_path
+
+
+@pytest.fixture
+def client(static_folder):
+    app = Flask(__name__, static_folder=str(static_folder), static_url_path="/static")
+    Compression(app)
+    return app.test_client()
+
+
+def write(path, content, mtime):
+    path.write_bytes(content)
+    os.utime(path, (mtime, mtime))
+
+
+def test_fresh_sibling_is_served(static_folder, client):
+    write(static_folder / "style.css", CSS, 1000)
+    write(static_folder / "style.css.gz", gzip.compress(CSS), 1000)
+
+    resp = client.get("/static/style.css", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resp.data) == CSS
+
+
+def test_stale_sibling_is_ignored(static_folder, client):
+    # the source was replaced after `flask precompress` last ran
+    write(static_folder / "style.css.gz", gzip.compress(b"body { color: red; }"), 1000)
+    write(static_folder / "style.css", CSS, 2000)
+
+    resp = client.get("/static/style.css", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert "Content-Encoding" not in resp.headers
+    assert resp.data == CSS
+
+
+def test_orphaned_sibling_is_not_served(static_folder, client):
+    write(static_folder / "style.css.gz", gzip.compress(CSS), 1000)
+
+    assert client.get("/static/style.css", headers={"Accept-Encoding": "gzip"}).status_code == 404
+    assert client.get("/static/style.css").status_code == 404
@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import RETIRED_SNAPSHOT, Metrics
+
+COUNTER = ("envision_rejections_total", (("reason", "duplicate"),))
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def write_snapshot(directory, filename, metrics, value):
+    snapshot = {
+        "counters": [["envision_rejections_total", [["reason", "duplicate"]], value]],
+        "histograms": [],
+        "buckets": list(metrics.buckets),
+    }
+    with open(os.path.join(directory, filename), "w") as f:
+        json.dump(snapshot, f)
+
+
+def test_exited_workers_are_retired_without_losing_counts(tmp_path):
+    app = Flask(__name__)
+    app.config["METRICS_DIR"] = str(tmp_path)
+    metrics = Metrics(app)
+    metrics.inc("envision_rejections_total", reason="duplicate")
+
+    pid = dead_pid()
+    write_snapshot(tmp_path, f"{pid}-aaaaaaaaaaaa.json", metrics, 5)
+    # a worker that restarted with the same pid writes its own file
+    write_snapshot(tmp_path, f"{pid}-bbbbbbbbbbbb.json", metrics, 2)
+
+    counters, _ = metrics.collect()
+    assert counters[COUNTER] == 8
+    assert not any(name.startswith(f"{pid}-") for name in os.listdir(tmp_path))
+    assert RETIRED_SNAPSHOT in os.listdir(tmp_path)
+
+    # later scrapes keep the retired totals
+    metrics.inc("envision_rejections_total", reason="duplicate")
+    counters, _ = metrics.collect()
+    assert counters[COUNTER] == 9
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from outbox import MailOutbox
+
+LEASE = 60
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config.update(MAIL_SPOOL_DIR=str(tmp_path), MAIL_OUTBOX_WORKER=False, MAIL_OUTBOX_LEASE=LEASE)
+    return app
+
+
+def test_message_older_than_lease_is_not_recovered_while_sending(app, tmp_path):
+    sent = []
+    outbox = MailOutbox(app=app)
+
+    def send(**payload):
+        # another worker's drain runs while this one is still sending
+        outbox.recover_expired()
+        sent.append(payload)
+        return "ok"
+
+    outbox.send = send
+    with app.app_context():
+        outbox.enqueue(to="a@example.com", subject="hi", html="<p>hi</p>")
+        # the message waited in pending/ for longer than the lease
+        (path,) = (tmp_path / "pending").iterdir()
+        old = time.time() - 2 * LEASE
+        os.utime(path, (old, old))
+
+        assert outbox.drain_once() == 1
+        assert outbox.drain_once() == 0
+
+    assert len(sent) == 1
+    assert os.listdir(tmp_path / "pending") == []
+    assert os.listdir(tmp_path / "inflight") == []
+    assert len(os.listdir(tmp_path / "sent")) == 1
+
+
+def test_deliver_tolerates_recovered_inflight_file(app, tmp_path):
+    outbox = MailOutbox(app=app)
+
+    def send(**payload):
+        # the lease expired mid-send and the message was moved back
+        for filename in os.listdir(tmp_path / "inflight"):
+            os.rename(tmp_path / "inflight" / filename, tmp_path / "pending" / filename)
+        return "ok"
+
+    outbox.send = send
+    with app.app_context():
+        outbox.enqueue(to="a@example.com", subject="hi", html="<p>hi</p>")
+        assert outbox.drain_once() == 1
+
+    assert len(os.listdir(tmp_path / "sent")) == 1
@@ -0,0 +1,562 @@
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("envision")
+
+# submissions older than this are dropped from every backend
+TRACKING_RETENTION = 30 * 24 * 60 * 60  # 30 days in seconds
+
+# ----------------------
+# Backend interface
+# ----------------------
+
+
+class TrackingStore:
+    """
+    Storage for per-identity submission history used by the duplicate-submission
+    checks. An identity is a normalized name or email.
+
+    Reads and writes that must be atomic go through `transaction()`:
+
+        with store.transaction() as txn:
+            history = txn.recent_submissions(identity, since, limit)
+            txn.record_submission({identity: {"name": ..., "email": ...}}, record)
+
+    `record` is a dict with `timestamp`, `ip`, `name` and `email` keys, and
+    submissions are always returned newest first.
+
+    `snapshot()` gives the same read methods without taking the write lock, for
+    checks that are repeated inside a transaction before anything is recorded.
+
+    Each identity also stores `limit_until` and `cooldown_until` (see
+    SubmissionLimiter.blocked_until()), passed in the identity dict of
+    `record_submission()`. `query_identities()` filters and sorts on them for
+    the admin view without replaying any history.
+    """
+
+    def transaction(self):
+        raise NotImplementedError
+
+    def snapshot(self):
+        raise NotImplementedError
+
+    def load_all(self):
+        """Every tracked identity in the legacy `submission_tracking.json` layout"""
+        raise NotImplementedError
+
+    def iter_submissions(self):
+        """Every tracked submission as a dict with an `identity` key, oldest first"""
+        raise NotImplementedError
+
+    def query_identities(self, now, status=None, ip=None, sort='last_submission', descending=True, limit=50, offset=0):
+        """
+        One page of identities as (rows, total matching). `status` is "limit"
+        for identities at the limit at `now`, or "cooldown" for ones blocked
+        only by a cooldown; `ip` matches any
+        tracked submission from that address. Rows are dicts of the identity's
+        stored fields, `sort` is one of IDENTITY_SORT_KEYS.
+        """
+        raise NotImplementedError
+
+    def identity_stats(self, now):
+        """Counts of tracked, cooling-down and at-limit identities at `now`"""
+        raise NotImplementedError
+
+
+IDENTITY_SORT_KEYS = ('last_submission', 'first_submission', 'cooldown_until', 'limit_until', 'identity')
+
+
+def _identity_entry(meta, record):
+    return {
+        'submissions': [],
+        'first_submission': record['timestamp'],
+        'last_submission': record['timestamp'],
+        'last_ip': record['ip'],
+        'name': meta.get('name'),
+        'email': meta.get('email'),
+        'limit_until': 0,
+        'cooldown_until': 0,
+    }
+
+
+# fields every identity row has, for entries written before some of them existed
+IDENTITY_DEFAULTS = {
+    'submissions': [],
+    'first_submission': 0,
+    'last_submission': 0,
+    'last_ip': None,
+    'name': None,
+    'email': None,
+    'limit_until': 0,
+    'cooldown_until': 0,
+}
+
+
+def _blocked(entry, status, now):
+    """Same status rules as the SQL in SQLiteTrackingStore, the limit takes precedence"""
+    at_limit = (entry.get('limit_until') or 0) > now
+    if status == 'limit':
+        return at_limit
+    return not at_limit and (entry.get('cooldown_until') or 0) > now
+
+
+# ----------------------
+# JSON file backend
+# ----------------------
+
+
+class JSONTrackingStore(TrackingStore):
+    """
+    The original single-file backend. Every transaction parses and rewrites the
+    whole file, serialized across workers with an flock on a sidecar lock file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load_all(self):
+        """Load submission tracking data from file"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                    logger.info(f"Loaded tracking data with {len(data)} entries")
+                    return _prune_legacy_data(data, time.time())
+            logger.warning("Tracking file does not exist")
+            return {}
+        except Exception as e:
+            logger.error(f"Error loading submission tracking: {e}")
+            return {}
+
+    def save_all(self, data):
+        """Save submission tracking data to file"""
+        try:
+            with open(self.path + ".tmp", 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            logger.error(f"Error saving submission tracking: {e}")
+
+    def iter_submissions(self):
+        # the whole file is parsed anyway, this backend can't stream
+        rows = [
+            dict(submission, identity=identity)
+            for identity, entry in self.load_all().items()
+            for submission in entry.get('submissions', [])
+        ]
+        rows.sort(key=lambda row: row['timestamp'])
+        return iter(rows)
+
+    def query_identities(self, now, status=None, ip=None, sort='last_submission', descending=True, limit=50, offset=0):
+        rows = [
+            dict(IDENTITY_DEFAULTS, **entry, identity=identity)
+            for identity, entry in self.load_all().items()
+            if (status is None or _blocked(entry, status, now))
+            and (ip is None or any(s.get('ip') == ip for s in entry.get('submissions', [])))
+        ]
+        rows.sort(key=lambda row: row.get(sort) or 0, reverse=descending)
+        return rows[offset:offset + limit], len(rows)
+
+    def identity_stats(self, now):
+        data = self.load_all()
+        return {
+            'identities': len(data),
+            'cooldown': sum(_blocked(entry, 'cooldown', now) for entry in data.values()),
+            'limit': sum(_blocked(entry, 'limit', now) for entry in data.values()),
+        }
+
+    @contextmanager
+    def transaction(self):
+        with open(self.path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                txn = _JSONTransaction(self.load_all())
+                yield txn
+                if txn.dirty:
+                    self.save_all(txn.data)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def snapshot(self):
+        # save_all() replaces the file atomically, so an unlocked read is consistent
+        yield _JSONTransaction(self.load_all())
+
+
+class _JSONTransaction:
+    def __init__(self, data):
+        self.data = data
+        self.dirty = False
+
+    def recent_submissions(self, identity, since, limit=None):
+        submissions = self.data.get(identity, {}).get('submissions', [])
+        recent = sorted((s for s in submissions if s['timestamp'] >= since), key=lambda s: s['timestamp'], reverse=True)
+        return recent[:limit] if limit else recent
+
+    def record_submission(self, identities, record):
+        for identity, meta in identities.items():
+            entry = self.data.get(identity)
+            if entry is None:
+                entry = self.data[identity] = _identity_entry(meta, record)
+            entry.setdefault('submissions', []).append(dict(record))
+            entry['last_submission'] = record['timestamp']
+            entry['last_ip'] = record['ip']
+            entry['limit_until'] = meta.get('limit_until') or 0
+            entry['cooldown_until'] = meta.get('cooldown_until') or 0
+        self.dirty = True
+
+    def identities_missing_state(self):
+        """(identity, last_submission) for identities recorded without limit/cooldown state"""
+        return [
+            (identity, entry['last_submission'])
+            for identity, entry in self.data.items()
+            if 'submissions' in entry and 'limit_until' not in entry
+        ]
+
+    def set_identity_state(self, identity, limit_until, cooldown_until):
+        self.data[identity].update(limit_until=limit_until, cooldown_until=cooldown_until)
+        self.dirty = True
+
+
+def _prune_legacy_data(data, current_time):
+    """Drop submissions older than the retention period from a JSON tracking dict"""
+    cleaned_data = {}
+    for key, value in data.items():
+        # Check if this is the new format with submissions array
+        if 'submissions' in value:
+            # New format: clean up old submissions within each entry
+            submissions = value.get('submissions', [])
+            recent_submissions = [s for s in submissions if current_time - s['timestamp'] < TRACKING_RETENTION]
+
+            # Only keep entries that have recent submissions
+            if recent_submissions:
+                cleaned_value = value.copy()
+                cleaned_value['submissions'] = recent_submissions
+                cleaned_value['last_submission'] = max(s['timestamp'] for s in recent_submissions)
+                cleaned_data[key] = cleaned_value
+        else:
+            # Old flat format (one submission per identity): convert it to the current shape,
+            # limit/cooldown state is left out so backfill_identity_state() computes it
+            if 'timestamp' in value and current_time - value['timestamp'] < TRACKING_RETENTION:
+                submission = {k: value.get(k) for k in ('timestamp', 'ip', 'name', 'email')}
+                cleaned_data[key] = {
+                    'submissions': [submission],
+                    'first_submission': value['timestamp'],
+                    'last_submission': value['timestamp'],
+                    'last_ip': value.get('ip'),
+                    'name': value.get('name'),
+                    'email': value.get('email'),
+                }
+    return cleaned_data
+
+
+# ----------------------
+# SQLite backend
+# ----------------------
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    identity TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    ip TEXT,
+    name TEXT,
+    email TEXT
+);
+CREATE INDEX IF NOT EXISTS submissions_identity_timestamp ON submissions (identity, timestamp);
+CREATE INDEX IF NOT EXISTS submissions_timestamp ON submissions (timestamp);
+
+CREATE TABLE IF NOT EXISTS identities (
+    identity TEXT PRIMARY KEY,
+    name TEXT,
+    email TEXT,
+    first_submission REAL NOT NULL,
+    last_submission REAL NOT NULL,
+    last_ip TEXT,
+    limit_until REAL,
+    cooldown_until REAL
+);
+CREATE INDEX IF NOT EXISTS identities_last_submission ON identities (last_submission);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# run after SQLITE_SCHEMA, once any columns missing from older databases are added
+SQLITE_INDEXES = """
+CREATE INDEX IF NOT EXISTS submissions_ip ON submissions (ip);
+CREATE INDEX IF NOT EXISTS identities_limit_until ON identities (limit_until);
+CREATE INDEX IF NOT EXISTS identities_cooldown_until ON identities (cooldown_until);
+"""
+
+# identities blocked at a given time, the limit takes precedence over a cooldown
+SQLITE_STATUS_FILTERS = {
+    'limit': "limit_until > ?",
+    'cooldown': "cooldown_until > ? AND COALESCE(limit_until, 0) <= ?",
+}
+
+# columns added to `identities` after the first release, NULL until backfilled
+SQLITE_ADDED_COLUMNS = {
+    'limit_until': 'REAL',
+    'cooldown_until': 'REAL',
+}
+
+
+class SQLiteTrackingStore(TrackingStore):
+    """
+    SQLite backend in WAL mode. Limit checks are indexed range queries on
+    (identity, timestamp), and `transaction()` takes the database write lock up
+    front (BEGIN IMMEDIATE) so a check and the insert that follows it are atomic
+    across gunicorn workers.
+    """
+
+    # how often (in seconds) a write also deletes rows past the retention period
+    PRUNE_INTERVAL = 60 * 60
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._last_prune = 0
+        with self._connection() as conn:
+            conn.executescript(SQLITE_SCHEMA)
+            columns = {row['name'] for row in conn.execute("PRAGMA table_info(identities)")}
+            for column, column_type in SQLITE_ADDED_COLUMNS.items():
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE identities ADD COLUMN {column} {column_type}")
+            conn.executescript(SQLITE_INDEXES)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        # connections must not cross a fork, the store is opened before gunicorn --preload forks
+        if conn is None or self._local.pid != os.getpid():
+            # autocommit mode, transactions are opened explicitly
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield _SQLiteTransaction(conn)
+            if time.time() - self._last_prune > self.PRUNE_INTERVAL:
+                self._prune(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def snapshot(self):
+        conn = self._connection()
+        # a deferred read transaction never blocks (or waits for) writers in WAL mode
+        conn.execute("BEGIN")
+        try:
+            yield _SQLiteTransaction(conn)
+        finally:
+            conn.execute("ROLLBACK")
+
+    def _prune(self, conn):
+        cutoff = time.time() - TRACKING_RETENTION
+        deleted = conn.execute("DELETE FROM submissions WHERE timestamp < ?", (cutoff,)).rowcount
+        conn.execute("DELETE FROM identities WHERE last_submission < ?", (cutoff,))
+        self._last_prune = time.time()
+        if deleted:
+            logger.info("Pruned %d tracked submissions older than the retention period", deleted)
+
+    def load_all(self):
+        conn = self._connection()
+        cutoff = time.time() - TRACKING_RETENTION
+        data = {}
+        for row in conn.execute("SELECT * FROM identities WHERE last_submission >= ?", (cutoff,)):
+            data[row['identity']] = {
+                'submissions': [],
+                'first_submission': row['first_submission'],
+                'last_submission': row['last_submission'],
+                'last_ip': row['last_ip'],
+                'name': row['name'],
+                'email': row['email'],
+            }
+        rows = conn.execute(
+            "SELECT identity, timestamp, ip, name, email FROM submissions WHERE timestamp >= ? ORDER BY timestamp",
+            (cutoff,),
+        )
+        for row in rows:
+            entry = data.get(row['identity'])
+            if entry is not None:
+                entry['submissions'].append({'timestamp': row['timestamp'], 'ip': row['ip'], 'name': row['name'], 'email': row['email']})
+        return data
+
+    def iter_submissions(self):
+        # own connection, so a slow consumer never holds a statement open on the thread's shared one
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(
+                "SELECT identity, timestamp, ip, name, email FROM submissions WHERE timestamp >= ? ORDER BY timestamp",
+                (time.time() - TRACKING_RETENTION,),
+            )
+            for row in rows:
+                yield dict(row)
+        finally:
+            conn.close()
+
+    def query_identities(self, now, status=None, ip=None, sort='last_submission', descending=True, limit=50, offset=0):
+        # both end up in the SQL text, so only known names get through
+        if sort not in IDENTITY_SORT_KEYS:
+            raise ValueError(f"Unknown sort key {sort!r}")
+        if status is not None and status not in SQLITE_STATUS_FILTERS:
+            raise ValueError(f"Unknown status {status!r}")
+        where, params = ["last_submission >= ?"], [now - TRACKING_RETENTION]
+        if status is not None:
+            where.append(SQLITE_STATUS_FILTERS[status])
+            params += [now] * SQLITE_STATUS_FILTERS[status].count("?")
+        if ip is not None:
+            where.append("identity IN (SELECT identity FROM submissions WHERE ip = ?)")
+            params.append(ip)
+        conn = self._connection()
+        where_sql = " AND ".join(where)
+        total = conn.execute(f"SELECT COUNT(*) FROM identities WHERE {where_sql}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM identities WHERE {where_sql}"
+            f" ORDER BY COALESCE({sort}, 0) {'DESC' if descending else 'ASC'}, identity LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return [dict(row) for row in rows], total
+
+    def identity_stats(self, now):
+        conn = self._connection()
+        count = lambda sql, *params: conn.execute(sql, params).fetchone()[0]
+        return {
+            'identities': count("SELECT COUNT(*) FROM identities WHERE last_submission >= ?", now - TRACKING_RETENTION),
+            'cooldown': count(f"SELECT COUNT(*) FROM identities WHERE {SQLITE_STATUS_FILTERS['cooldown']}", now, now),
+            'limit': count(f"SELECT COUNT(*) FROM identities WHERE {SQLITE_STATUS_FILTERS['limit']}", now),
+        }
+
+    def is_migrated(self, source):
+        row = self._connection().execute("SELECT value FROM meta WHERE key = ?", (f"migrated:{source}",)).fetchone()
+        return row is not None
+
+    def import_legacy_data(self, data, source):
+        """
+        Import a dict in either `submission_tracking.json` layout: entries with a
+        `submissions` list, or old entries holding a single `timestamp`. Each
+        source is only imported once.
+
+        Returns the number of submissions imported.
+        """
+        imported = 0
+        with self.transaction() as txn:
+            if txn.conn.execute("SELECT 1 FROM meta WHERE key = ?", (f"migrated:{source}",)).fetchone():
+                return 0
+            for identity, value in data.items():
+                if 'submissions' in value:
+                    submissions = value.get('submissions') or []
+                elif 'timestamp' in value:
+                    submissions = [{'timestamp': value['timestamp'], 'ip': value.get('ip'), 'name': value.get('name'), 'email': value.get('email')}]
+                else:
+                    continue
+                meta = {'name': value.get('name'), 'email': value.get('email')}
+                for submission in sorted(submissions, key=lambda s: s['timestamp']):
+                    record = {
+                        'timestamp': submission['timestamp'],
+                        'ip': submission.get('ip') or value.get('last_ip') or value.get('ip'),
+                        'name': submission.get('name'),
+                        'email': submission.get('email'),
+                    }
+                    txn.record_submission({identity: meta}, record)
+                    imported += 1
+            txn.conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                (f"migrated:{source}", str(time.time())),
+            )
+        logger.info("Imported %d tracked submissions from %s", imported, source)
+        return imported
+
+
+class _SQLiteTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def recent_submissions(self, identity, since, limit=None):
+        rows = self.conn.execute(
+            "SELECT timestamp, ip, name, email FROM submissions"
+            " WHERE identity = ? AND timestamp >= ? ORDER BY timestamp DESC LIMIT ?",
+            (identity, since, limit if limit else -1),
+        )
+        return [dict(row) for row in rows]
+
+    def record_submission(self, identities, record):
+        for identity, meta in identities.items():
+            self.conn.execute(
+                "INSERT INTO submissions (identity, timestamp, ip, name, email) VALUES (?, ?, ?, ?, ?)",
+                (identity, record['timestamp'], record['ip'], record['name'], record['email']),
+            )
+            self.conn.execute(
+                "INSERT INTO identities (identity, name, email, first_submission, last_submission, last_ip, limit_until, cooldown_until)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (identity) DO UPDATE SET"
+                " first_submission = MIN(first_submission, excluded.first_submission),"
+                " last_submission = MAX(last_submission, excluded.last_submission),"
+                " last_ip = CASE WHEN excluded.last_submission >= last_submission THEN excluded.last_ip ELSE last_ip END,"
+                " limit_until = excluded.limit_until,"
+                " cooldown_until = excluded.cooldown_until",
+                (identity, meta.get('name'), meta.get('email'), record['timestamp'], record['timestamp'], record['ip'],
+                 meta.get('limit_until'), meta.get('cooldown_until')),
+            )
+
+    def identities_missing_state(self):
+        """(identity, last_submission) for identities recorded without limit/cooldown state"""
+        rows = self.conn.execute("SELECT identity, last_submission FROM identities WHERE limit_until IS NULL OR cooldown_until IS NULL")
+        return [tuple(row) for row in rows]
+
+    def set_identity_state(self, identity, limit_until, cooldown_until):
+        self.conn.execute(
+            "UPDATE identities SET limit_until = ?, cooldown_until = ? WHERE identity = ?",
+            (limit_until, cooldown_until, identity),
+        )
+
+
+# ----------------------
+# Factory / migration
+# ----------------------
+
+TRACKING_BACKENDS = {
+    'json': JSONTrackingStore,
+    'sqlite': SQLiteTrackingStore,
+}
+
+
+def create_tracking_store(backend, path):
+    try:
+        store_class = TRACKING_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Unknown tracking backend {backend!r}, expected one of {sorted(TRACKING_BACKENDS)}")
+    return store_class(path)
+
+
+def migrate_json_tracking(json_path, store):
+    """
+    Copy a `submission_tracking.json` file (old or new layout) into a SQLite
+    store. Safe to call repeatedly, the file is only imported once.
+
+    Returns the number of submissions imported.
+    """
+    if not os.path.exists(json_path) or store.is_migrated(os.path.abspath(json_path)):
+        return 0
+    with open(json_path) as f:
+        data = json.load(f)
+    return store.import_legacy_data(data, os.path.abspath(json_path))